@@ -0,0 +1,5 @@
+"""
+benchmarks
+
+Performance benchmarks for clubhouse-py. Run a benchmark with `python -m benchmarks.<name>`.
+"""
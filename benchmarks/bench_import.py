@@ -0,0 +1,92 @@
+"""
+bench_import.py
+
+Import time of the library, measured with `python -X importtime` in fresh interpreters.
+
+    $ python -m benchmarks.bench_import
+    $ python -m benchmarks.bench_import --budget 10 --runs 20 --verbose
+
+Exits with 1 when the median import time of a module is over its budget,
+or when importing it loads a module that must stay lazy (HTTP libraries, asyncio),
+so CI can enforce both. Modules are byte-compiled first, as they are once installed.
+"""
+
+import os
+import sys
+import argparse
+import compileall
+import subprocess
+from . import harness
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds, cumulative import time of the module and everything it imports.
+BUDGETS = {
+    "clubhouse.clubhouse": 10.0,
+}
+
+# Loaded on first use only.
+LAZY_MODULES = ("requests", "aiohttp", "asyncio", "concurrent.futures", "uuid", "secrets")
+
+def import_times(module):
+    """ (str) -> dict of (int, int)
+
+    Import `module` in a fresh interpreter and return
+    {module name: (self microseconds, cumulative microseconds)} of everything it imported.
+    Modules loaded at interpreter startup (by `site`) are left out.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT, env.get("PYTHONPATH"))))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, cumulative, name = line[len("import time:"):].split("|")
+        if not self_time.strip().isdigit():
+            continue
+        name = name.strip()
+        if name == "site":
+            times = {}
+            continue
+        times[name] = (int(self_time), int(cumulative))
+    return times
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="import time budget of clubhouse-py")
+    parser.add_argument("--module", action="append", help="module to measure (default: the budgeted ones)")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, help="budget in milliseconds for every measured module")
+    parser.add_argument("--verbose", action="store_true", help="show the slowest imports")
+    args = parser.parse_args()
+
+    compileall.compile_dir(os.path.join(ROOT, "clubhouse"), quiet=1)
+    failures = []
+    for module in args.module or BUDGETS:
+        budget = args.budget if args.budget is not None else BUDGETS.get(module, 10.0)
+        runs = [import_times(module) for _ in range(args.runs + 1)][1:]
+        latencies = [times[module][1] / 1e6 for times in runs]
+        print(harness.Result(f"import_{module}", latencies, sum(latencies), unit="import"))
+        median_ms = harness.percentile(latencies, 0.5) * 1e3
+        if median_ms > budget:
+            failures.append(f"{module}: {median_ms:.2f} ms > {budget:.2f} ms")
+        loaded = [name for name in LAZY_MODULES if name in runs[-1]]
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)}")
+        if args.verbose:
+            slowest = sorted(runs[-1].items(), key=lambda item: item[1][0], reverse=True)[:15]
+            for name, (self_time, cumulative) in slowest:
+                print(f"    {name:40} self {self_time / 1e3:7.2f} ms  cumulative {cumulative / 1e3:7.2f} ms")
+
+    for failure in failures:
+        print(f"[-] Over budget: {failure}")
+    if failures:
+        sys.exit(1)
+    print("[*] Import time within budget")
+
+if __name__ == "__main__":
+    main()
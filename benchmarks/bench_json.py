@@ -0,0 +1,80 @@
+"""
+bench_json.py
+
+Decode/encode throughput of every installed JSON backend.
+
+    $ python -m benchmarks.bench_json
+    $ python -m benchmarks.bench_json --payload recorded_get_channels.json
+"""
+
+import time
+import argparse
+from clubhouse.codec import BACKENDS, get_codec
+from .payloads import make_channels, make_user
+
+def default_payloads():
+    """ () -> dict of bytes
+
+    Synthetic payloads shaped like the largest responses.
+    """
+    codec = get_codec("json")
+    followers = {
+        "success": True,
+        "users": [make_user(i) for i in range(50)],
+        "next": 2,
+        "count": 500000,
+    }
+    return {
+        "get_channels": codec.dumps(make_channels(100, 50)),
+        "get_followers": codec.dumps(followers),
+        "get_club_members": codec.dumps({**followers, "users": [make_user(i) for i in range(200)]}),
+    }
+
+def timeit(func, arg, min_time=0.5):
+    """ (callable, object, float) -> float
+
+    Return the mean seconds per call.
+    """
+    count = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        func(arg)
+        count += 1
+        elapsed = time.perf_counter() - start
+    return elapsed / count
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--payload", action="append", default=[], help="recorded JSON response file")
+    parser.add_argument("--min-time", type=float, default=0.5)
+    args = parser.parse_args()
+
+    payloads = default_payloads()
+    for path in args.payload:
+        with open(path, "rb") as payload_file:
+            payloads[path] = payload_file.read()
+
+    codecs = []
+    for name in BACKENDS:
+        try:
+            codecs.append(get_codec(name))
+        except ImportError:
+            print(f"[!] {name} is not installed")
+    print(f"[*] Default backend: {get_codec().name}")
+
+    for label, body in payloads.items():
+        print(f"[*] {label} ({len(body) / 1024:.0f} KiB)")
+        value = get_codec("json").loads(body)
+        baseline = timeit(get_codec("json").loads, body, args.min_time)
+        for codec in codecs:
+            decode = timeit(codec.loads, body, args.min_time)
+            encode = timeit(codec.dumps, value, args.min_time)
+            print(
+                f"    {codec.name:8} decode {decode * 1e3:8.3f} ms ({len(body) / decode / 1e6:7.1f} MB/s)"
+                f"   encode {encode * 1e3:8.3f} ms   x{baseline / decode:.1f} vs json"
+            )
+
+if __name__ == "__main__":
+    main()
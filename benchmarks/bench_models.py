@@ -0,0 +1,56 @@
+"""
+bench_models.py
+
+Memory used by a channel snapshot held as raw dicts vs. slotted models,
+nested users and clubs included.
+
+    $ python -m benchmarks.bench_models --channels 5000 --users 50
+"""
+
+import gc
+import json
+import argparse
+import tracemalloc
+from clubhouse.models import Channel
+from .payloads import make_channels
+
+def measure(build, body):
+    """ (callable, str) -> (int, int)
+
+    Return (retained bytes, peak bytes) of `build(body)`.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build(body)
+    gc.collect()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return retained, peak
+
+def build_raw(body):
+    """ (str) -> list of dict """
+    return json.loads(body)['channels']
+
+def build_models(body):
+    """ (str) -> list of Channel """
+    return Channel.from_list(json.loads(body)['channels'])
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--channels", type=int, default=5000)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    body = json.dumps(make_channels(args.channels, args.users))
+    print(f"[*] {args.channels} channels x {args.users} users ({len(body) / 1e6:.1f} MB of JSON)")
+    results = {}
+    for name, build in (("raw dict", build_raw), ("models", build_models)):
+        retained, peak = measure(build, body)
+        results[name] = retained
+        print(f"    {name:10} retained {retained / 1e6:8.1f} MB   peak {peak / 1e6:8.1f} MB")
+    print(f"[*] models use {results['models'] / results['raw dict']:.0%} of the raw dict memory")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+bench_startup.py
+
+Time from launching `clubhouse browse` to its first prompt, against the local mock server.
+
+    $ python -m benchmarks.bench_startup
+    $ python -m benchmarks.bench_startup --runs 20 --budget login=0.5 --budget browse=1.5
+
+Exits with 1 when the median of a scenario is over its budget, so CI can enforce it.
+
+    login:
+        - no saved account; the first prompt asks for a phone number.
+    browse:
+        - saved account; the waitlist status, the profile and the channel list
+          are fetched and rendered before the prompt.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import configparser
+from clubhouse.mockserver import MockServer
+from . import harness
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "login": "Please enter your phone number",
+    "browse": "Enter channel_name",
+}
+
+# Median seconds to the first prompt.
+BUDGETS = {
+    "login": 1.0,
+    "browse": 2.0,
+}
+
+def time_to_prompt(command, prompt, cwd, env, timeout=30):
+    """ (list of str, str, str, dict, float) -> float
+
+    Start `command` and return the seconds until `prompt` is printed.
+    """
+    marker = prompt.encode()
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        command, cwd=cwd, env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    timer = threading.Timer(timeout, proc.kill)
+    timer.start()
+    try:
+        output = b""
+        while marker not in output:
+            chunk = proc.stdout.read1(65536)
+            if not chunk:
+                raise Exception(f"The CLI exited before its prompt: {output[-500:]!r}")
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        timer.cancel()
+        proc.kill()
+        proc.wait()
+        proc.stdout.close()
+        proc.stdin.close()
+
+def prepare(scenario, directory, server):
+    """ (str, str, MockServer) -> dict
+
+    Set up the working directory of a scenario and return the environment of the CLI.
+    """
+    if scenario == "browse":
+        config = configparser.ConfigParser()
+        config["Account"] = {"user_device": "BENCHMARK", "user_id": "1", "user_token": "benchmark"}
+        with open(os.path.join(directory, "setting.ini"), "w") as config_file:
+            config.write(config_file)
+    env = dict(os.environ)
+    env["CLUBHOUSE_API_URL"] = server.url
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, (ROOT, env.get("PYTHONPATH"))))
+    # Keep the persistent cache out of the user's config directory.
+    env["XDG_CONFIG_HOME"] = env["APPDATA"] = directory
+    return env
+
+def main():
+    """ Run the benchmark. """
+    parser = argparse.ArgumentParser(description="time to the first prompt of the CLI")
+    parser.add_argument("--only", action="append", choices=sorted(SCENARIOS))
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency in seconds")
+    parser.add_argument("--budget", action="append", default=[], metavar="SCENARIO=SECONDS",
+                        help="override the budget of a scenario")
+    args = parser.parse_args()
+
+    budgets = dict(BUDGETS)
+    for budget in args.budget:
+        scenario, _, seconds = budget.partition("=")
+        budgets[scenario] = float(seconds)
+
+    command = [sys.executable, "-u", "-m", "clubhouse.cli", "browse"]
+    failures = []
+    with MockServer(latency=args.latency) as server:
+        for scenario in args.only or SCENARIOS:
+            with tempfile.TemporaryDirectory() as directory:
+                env = prepare(scenario, directory, server)
+                # The first run warms the OS file cache and, for browse, the response cache.
+                time_to_prompt(command, SCENARIOS[scenario], directory, env)
+                latencies = [time_to_prompt(command, SCENARIOS[scenario], directory, env) for _ in range(args.runs)]
+            result = harness.Result(f"startup_{scenario}", latencies, sum(latencies), unit="run")
+            print(result)
+            median = harness.percentile(latencies, 0.5)
+            if median > budgets[scenario]:
+                failures.append(f"{scenario}: {median:.3f} s > {budgets[scenario]:.3f} s")
+
+    for failure in failures:
+        print(f"[-] Over budget: {failure}")
+    if failures:
+        sys.exit(1)
+    print("[*] Startup within budget")
+
+if __name__ == "__main__":
+    main()
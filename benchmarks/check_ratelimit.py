@@ -0,0 +1,61 @@
+"""
+check_ratelimit.py
+
+Checks the adaptive rate of `clubhouse.ratelimit.RateLimiter` without a server.
+A client sending below its rate must keep that rate, however long it runs, and a
+client held back by its bucket may raise it only up to the default `max_rate`.
+
+    $ python -m benchmarks.check_ratelimit
+    $ python -m benchmarks.check_ratelimit --rate 20 --requests 40
+
+Exits with 1 when the rate moved while idle, or went over its cap.
+"""
+
+import sys
+import time
+import argparse
+from clubhouse.ratelimit import RateLimiter, MAX_RATE_FACTOR
+
+
+class Response:
+    """ Successful response, as seen by the limiter. """
+    status_code = 200
+    headers = {}
+
+
+def main():
+    """ Run the checks. """
+    parser = argparse.ArgumentParser(description="adaptive rate of RateLimiter")
+    parser.add_argument("--rate", type=float, default=50.0)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    failures = []
+
+    # Idle: one request at a time, at half the rate, never waits for a token.
+    limiter = RateLimiter(rate=args.rate, burst=2, increase=1.0)
+    for _ in range(args.requests // 10):
+        limiter.run("get_profile", "GET", Response)
+        time.sleep(2 / args.rate)
+    idle_rate = limiter.rates_snapshot()["get_profile"]
+    print(f"[*] idle: {args.requests // 10} requests, rate {args.rate:g} -> {idle_rate:g}")
+    if idle_rate != args.rate:
+        failures.append(f"rate changed while idle: {idle_rate:g}")
+
+    # Busy: back to back, held back by the bucket, so the rate rises up to its cap.
+    limiter = RateLimiter(rate=args.rate, burst=2, increase=1.0)
+    for _ in range(args.requests):
+        limiter.run("get_profile", "GET", Response)
+    busy_rate = limiter.rates_snapshot()["get_profile"]
+    max_rate = args.rate * MAX_RATE_FACTOR
+    print(f"[*] busy: {args.requests} requests, rate {args.rate:g} -> {busy_rate:g} (max {max_rate:g})")
+    if not args.rate < busy_rate <= max_rate:
+        failures.append(f"rate under load out of ({args.rate:g}, {max_rate:g}]: {busy_rate:g}")
+
+    for failure in failures:
+        print(f"[-] {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+harness.py
+
+Timing, memory and baseline helpers shared by the benchmarks.
+"""
+
+import os
+import sys
+import json
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+def peak_rss_mb():
+    """ () -> float
+
+    Peak resident set size of this process in MB, or None where it is unavailable.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+def percentile(values, fraction):
+    """ (list of float, float) -> float """
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, max(0, round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+class Result:
+    """
+    Result Class
+
+    Latencies of one benchmark. `ops` counts the operations done (records, requests, ...)
+    so the throughput is reported per operation even when one timed call does many of them.
+    """
+
+    def __init__(self, name, latencies, elapsed, ops=None, unit="req"):
+        """ (Result, str, list of float, float, int, str) -> NoneType """
+        self.name = name
+        self.latencies = latencies
+        self.elapsed = elapsed
+        self.ops = ops if ops is not None else len(latencies)
+        self.unit = unit
+        self.peak_rss_mb = peak_rss_mb()
+
+    def to_dict(self):
+        """ (Result) -> dict """
+        return {
+            "p50_ms": percentile(self.latencies, 0.50) * 1e3,
+            "p99_ms": percentile(self.latencies, 0.99) * 1e3,
+            "ops_per_sec": self.ops / self.elapsed if self.elapsed else 0.0,
+            "unit": self.unit,
+            "peak_rss_mb": self.peak_rss_mb,
+        }
+
+    def __str__(self):
+        data = self.to_dict()
+        rss = f"{data['peak_rss_mb']:8.1f} MB" if data["peak_rss_mb"] is not None else "       n/a"
+        return (
+            f"{self.name:28} p50 {data['p50_ms']:9.3f} ms  p99 {data['p99_ms']:9.3f} ms"
+            f"  {data['ops_per_sec']:11.1f} {self.unit}/s  rss {rss}"
+        )
+
+
+def run(name, func, iterations=100, warmup=5, ops_per_call=1, unit="req", min_time=0.0):
+    """ (str, callable, int, int, int, str, float) -> Result
+
+    Call `func()` `iterations` times (or until `min_time` seconds passed) and time every call.
+    """
+    for _ in range(warmup):
+        func()
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < iterations or time.perf_counter() - start < min_time:
+        call_start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    return Result(name, latencies, elapsed, len(latencies) * ops_per_call, unit)
+
+def save_baseline(label, results):
+    """ (str, list of Result) -> str
+
+    Write results to baselines/<label>.json and return the path.
+    """
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    path = os.path.join(BASELINE_DIR, f"{label}.json")
+    with open(path, "w") as baseline_file:
+        json.dump({result.name: result.to_dict() for result in results}, baseline_file, indent=2, sort_keys=True)
+    return path
+
+def compare_baseline(label, results, tolerance=0.25):
+    """ (str, list of Result, float) -> list of str
+
+    Compare with baselines/<label>.json and return the regressions above `tolerance`.
+    """
+    path = os.path.join(BASELINE_DIR, f"{label}.json")
+    with open(path) as baseline_file:
+        baseline = json.load(baseline_file)
+    regressions = []
+    for result in results:
+        old = baseline.get(result.name)
+        if not old:
+            continue
+        new = result.to_dict()
+        if new["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append(f"{result.name}: p50 {old['p50_ms']:.3f} -> {new['p50_ms']:.3f} ms")
+        if new["ops_per_sec"] < old["ops_per_sec"] * (1 - tolerance):
+            regressions.append(
+                f"{result.name}: {old['ops_per_sec']:.1f} -> {new['ops_per_sec']:.1f} {result.unit}/s"
+            )
+    return regressions
@@ -0,0 +1,7 @@
+"""
+payloads.py
+
+Synthetic API payloads, generated like the ones served by `clubhouse.mockserver`.
+"""
+
+from clubhouse.mockserver import make_user, make_channel, make_channels # pylint: disable=unused-import
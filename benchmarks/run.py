@@ -0,0 +1,163 @@
+"""
+run.py
+
+Benchmark suite for the client hot paths, run against the local mock server.
+
+    $ python -m benchmarks.run
+    $ python -m benchmarks.run --latency 0.02 --only get_followers_paging
+    $ python -m benchmarks.run --save 304.0.1
+    $ python -m benchmarks.run --compare 304.0.1   # exits with 1 on regressions
+"""
+
+import io
+import sys
+import argparse
+import contextlib
+from clubhouse.clubhouse import Clubhouse
+from clubhouse.codec import get_codec
+from clubhouse.mockserver import MockServer, make_channel, make_channels
+from clubhouse.transport import RequestsTransport
+from clubhouse.room import RoomState
+from . import harness
+
+BENCHMARKS = {}
+
+def benchmark(func):
+    """ Register a benchmark under the name of the function. """
+    BENCHMARKS[func.__name__] = func
+    return func
+
+def _import_cli():
+    """ () -> module
+
+    The CLI renders with rich, which it only imports when rendering.
+    """
+    try:
+        import rich # pylint: disable=import-outside-toplevel,unused-import
+        from clubhouse.cli import ui # pylint: disable=import-outside-toplevel
+    except ImportError as exc:
+        print(f"[!] Skipping CLI benchmarks ({exc})")
+        return None
+    return ui
+
+
+class Context:
+    """ Shared state of a benchmark run. """
+
+    def __init__(self, server, args):
+        """ (Context, MockServer, argparse.Namespace) -> NoneType """
+        self.server = server
+        self.args = args
+        self.client = Clubhouse(user_id=1, user_token="benchmark", user_device="benchmark", api_url=server.url)
+        self.cli = _import_cli()
+        self.channel = next(iter(server.state.channels))
+
+
+@benchmark
+def get_channels_render(ctx):
+    """ get_channels() + print_channel_list() rendering. """
+    if ctx.cli is None:
+        return None
+    def func():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ctx.cli.print_channel_list(ctx.client)
+    return harness.run("get_channels_render", func, ctx.args.iterations // 5 or 1)
+
+@benchmark
+def print_users(ctx):
+    """ print_users() with N speakers, each needing a profile. """
+    if ctx.cli is None:
+        return None
+    channel_info = make_channel(0, max(ctx.args.speakers, 25))
+    for user in channel_info["users"][:ctx.args.speakers]:
+        user["is_speaker"] = True
+    def func():
+        with contextlib.redirect_stdout(io.StringIO()):
+            ctx.cli.print_users(channel_info, 1, ctx.client)
+    return harness.run(f"print_users_{ctx.args.speakers}_speakers", func, ctx.args.iterations // 5 or 1)
+
+@benchmark
+def get_followers_paging(ctx):
+    """ Records per second through iter_followers(). """
+    total = ctx.server.state.num_followers
+    def func():
+        count = sum(1 for _ in ctx.client.iter_followers(1, page_size=50))
+        assert count == total
+    return harness.run("get_followers_paging", func, 5, warmup=1, ops_per_call=total, unit="rec")
+
+@benchmark
+def active_ping(ctx):
+    """ Overhead of one active_ping() per room. """
+    return harness.run("active_ping", lambda: ctx.client.active_ping(ctx.channel), ctx.args.iterations)
+
+@benchmark
+def get_channel(ctx):
+    """ One get_channel() round trip. """
+    return harness.run("get_channel", lambda: ctx.client.get_channel(ctx.channel), ctx.args.iterations)
+
+@benchmark
+def json_decode(ctx):
+    """ Decoding a get_channels() payload with the default codec. """
+    codec = get_codec()
+    body = get_codec("json").dumps(make_channels(ctx.args.channels))
+    return harness.run(f"json_decode_{codec.name}", lambda: codec.loads(body), ctx.args.iterations, unit="doc")
+
+@benchmark
+def room_state_events(ctx):
+    """ Join/raise/promote/leave deltas and top-N queries on a 5k listener room. """
+    room = RoomState.from_channel(make_channel(0, 5000))
+    def func():
+        for user_id in range(10**6, 10**6 + 100):
+            room.apply({"action": "join_channel", "user_profile": {"user_id": user_id}})
+            room.apply({"action": "raise_hands", "user_id": user_id})
+            room.apply({"action": "add_speaker", "user_id": user_id})
+            room.top(25)
+            room.apply({"action": "leave_channel", "user_id": user_id})
+    return harness.run("room_state_events", func, ctx.args.iterations, ops_per_call=500, unit="event")
+
+@benchmark
+def header_construction(ctx):
+    """ Building a client and its per-instance headers. """
+    transport = RequestsTransport()
+    def func():
+        Clubhouse(user_id=1, user_token="benchmark", user_device="benchmark", transport=transport)
+    return harness.run("header_construction", func, ctx.args.iterations * 10, unit="op")
+
+
+def main():
+    """ Run the benchmark suite. """
+    parser = argparse.ArgumentParser(description="clubhouse-py benchmark suite")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="run only these benchmarks")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="server latency in seconds")
+    parser.add_argument("--channels", type=int, default=200)
+    parser.add_argument("--speakers", type=int, default=30)
+    parser.add_argument("--followers", type=int, default=5000)
+    parser.add_argument("--save", metavar="LABEL", help="save results to baselines/LABEL.json")
+    parser.add_argument("--compare", metavar="LABEL", help="compare with baselines/LABEL.json")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before failing")
+    args = parser.parse_args()
+
+    server = MockServer(latency=args.latency, num_channels=args.channels, num_followers=args.followers)
+    results = []
+    with server:
+        ctx = Context(server, args)
+        for name in args.only or BENCHMARKS:
+            result = BENCHMARKS[name](ctx)
+            if result is not None:
+                print(result)
+                results.append(result)
+        ctx.client.close()
+
+    if args.save:
+        print(f"[*] Saved {harness.save_baseline(args.save, results)}")
+    if args.compare:
+        regressions = harness.compare_baseline(args.compare, results, args.tolerance)
+        for regression in regressions:
+            print(f"[-] Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"[*] No regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+stress_headers.py
+
+Many authenticated clients in one process, against the local mock server.
+Every client sends requests from a shared thread pool over a shared transport,
+and the server checks that each request carries the headers of the client that
+sent it (`CH-UserID`, `Authorization`, `CH-DeviceId`, `Cookie`), and that uploads
+are sent as multipart without the JSON `Content-Type`.
+
+    $ python -m benchmarks.stress_headers
+    $ python -m benchmarks.stress_headers --clients 200 --threads 64 --requests 20000
+
+Exits with 1 when a request carried another client's headers, or when
+`Clubhouse.HEADERS` (the class-level template) was changed.
+"""
+
+import os
+import sys
+import random
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from clubhouse.clubhouse import Clubhouse
+from clubhouse.transport import RequestsTransport
+from clubhouse.mockserver import MockServer, MockHandler
+
+
+class CheckingHandler(MockHandler):
+    """ MockHandler recording requests whose headers belong to another client. """
+
+    def _dispatch(self):
+        user_id = self.headers.get("CH-UserID")
+        expected = {
+            "Authorization": f"Token token-{user_id}",
+            "CH-DeviceId": f"DEVICE-{user_id}",
+        }
+        errors = [
+            f"{key}={self.headers.get(key)!r}" for key, value in expected.items()
+            if self.headers.get(key) != value
+        ]
+        cookie = self.headers.get("Cookie")
+        known_cookie = self.server.cookies.setdefault(user_id, cookie)
+        if cookie != known_cookie:
+            errors.append(f"Cookie={cookie!r}")
+        content_type = self.headers.get("Content-Type") or ""
+        if self.path.endswith("/update_photo") and not content_type.startswith("multipart/form-data"):
+            errors.append(f"update_photo Content-Type={content_type!r}")
+        if errors:
+            with self.server.errors_lock:
+                self.server.errors.append(f"{self.command} {self.path} as CH-UserID={user_id}: {', '.join(errors)}")
+        super()._dispatch()
+
+
+def main():
+    """ Run the stress test. """
+    parser = argparse.ArgumentParser(description="headers of concurrent clients in one process")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    template = dict(Clubhouse.HEADERS)
+    with tempfile.TemporaryDirectory() as directory, MockServer() as server:
+        server.RequestHandlerClass = CheckingHandler
+        server.cookies = {}
+        server.errors = []
+        server.errors_lock = threading.Lock()
+
+        photo = os.path.join(directory, "photo.jpg")
+        with open(photo, "wb") as photo_file:
+            photo_file.write(b"\xff\xd8\xff\xd9")
+
+        # One connection pool shared by every client, as in a worker holding many sessions.
+        transport = RequestsTransport()
+        clients = [
+            Clubhouse(f"{user_id}", f"token-{user_id}", f"device-{user_id}", transport=transport, api_url=server.url)
+            for user_id in range(1, args.clients + 1)
+        ]
+        calls = (
+            lambda client: client.me(),
+            lambda client: client.get_profile(random.randint(1, 1000)),
+            lambda client: client.get_channels(),
+            lambda client: client.update_photo(photo),
+        )
+
+        def work(_):
+            client = random.choice(clients)
+            result = random.choice(calls)(client)
+            if not result.get("success"):
+                return f"{client}: {result}"
+            return None
+
+        with ThreadPoolExecutor(args.threads) as executor:
+            failed = [error for error in executor.map(work, range(args.requests)) if error]
+        transport.close()
+        errors = server.errors
+
+    failures = errors + failed
+    if Clubhouse.HEADERS != template:
+        failures.append(f"Clubhouse.HEADERS changed: {dict(Clubhouse.HEADERS)}")
+    for failure in failures[:20]:
+        print(f"[-] {failure}")
+    print(f"[*] {args.requests} requests from {args.clients} clients on {args.threads} threads: "
+          f"{len(errors)} with another client's headers, {len(failed)} failed")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
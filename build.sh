@@ -2,4 +2,4 @@
 
 rm -rf build/ dist/
 rm *.pyc
-python3 -OO -m PyInstaller --onefile ./cli.py
+python3 -OO -m PyInstaller --onefile --collect-submodules clubhouse ./cli.py
@@ -0,0 +1,155 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+cache.py
+
+In-memory TTL + LRU cache for responses of read-only endpoints.
+"""
+
+import json
+import time
+import threading
+from collections import OrderedDict
+from .endpoints import cache_ttls, cache_invalidations
+
+MISS = object()
+
+class ResponseCache:
+    """
+    ResponseCache Class
+
+    Caches successful responses of slowly-changing endpoints.
+
+        maxsize:
+            - maximum number of cached responses. The least recently used one is evicted first.
+        ttls:
+            - {endpoint: seconds}. Only endpoints listed here are cached.
+        invalidates:
+            - {mutating endpoint: (cached endpoints, ...)}. Calling the mutating endpoint
+              drops every cached response of the listed endpoints.
+
+    Cached responses are shared between callers, so do not modify them in place.
+    Responses are kept per user, so one cache can be shared by clients of different accounts.
+    """
+
+    # Both are declared per endpoint in `clubhouse.endpoints`.
+    TTLS = cache_ttls()
+    INVALIDATES = cache_invalidations()
+
+    def __init__(self, maxsize=1024, ttls=None, invalidates=None):
+        """ (ResponseCache, int, dict, dict) -> NoneType """
+        self.maxsize = maxsize
+        self.ttls = dict(self.TTLS if ttls is None else ttls)
+        self.invalidates = dict(self.INVALIDATES if invalidates is None else invalidates)
+        self.hits = {}
+        self.misses = {}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def is_cacheable(self, endpoint):
+        """ (ResponseCache, str) -> bool """
+        return endpoint in self.ttls
+
+    @staticmethod
+    def make_key(endpoint, query=None, data=None, user_id=None):
+        """ (str, str, dict, str) -> tuple
+
+        Build a cache key from the request parameters and the user sending it.
+        """
+        if data is not None:
+            data = json.dumps(data, sort_keys=True, default=str)
+        return (endpoint, query, data, user_id)
+
+    def get(self, key):
+        """ (ResponseCache, tuple) -> dict
+
+        Return the cached response, or `MISS` when it is absent or expired.
+        """
+        endpoint = key[0]
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits[endpoint] = self.hits.get(endpoint, 0) + 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+            return MISS
+
+    def lookup(self, key):
+        """ (ResponseCache, tuple) -> (dict, bool)
+
+        Return the cached response (or `MISS`) and whether it is fresh.
+        Entries of this cache are dropped on expiry, so they are never stale.
+        """
+        value = self.get(key)
+        return value, value is not MISS
+
+    def etag(self, key):
+        """ (ResponseCache, tuple) -> str
+
+        ETags are not kept in memory.
+        """
+        return None
+
+    def touch(self, key):
+        """ (ResponseCache, tuple) -> NoneType """
+
+    def set(self, key, value, etag=None):
+        """ (ResponseCache, tuple, dict, str) -> NoneType
+
+        Cache a response. Failed responses are never cached.
+        """
+        if not isinstance(value, dict) or not value.get("success", True):
+            return
+        expires = time.monotonic() + self.ttls[key[0]]
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint=None, key=None):
+        """ (ResponseCache, str, tuple) -> int
+
+        Drop a single key, every response of `endpoint`, or everything when both are None.
+        Returns the number of dropped responses.
+        """
+        with self._lock:
+            if key is not None:
+                return 1 if self._entries.pop(key, None) else 0
+            if endpoint is None:
+                count = len(self._entries)
+                self._entries.clear()
+                return count
+            keys = [_key for _key in self._entries if _key[0] == endpoint]
+            for _key in keys:
+                del self._entries[_key]
+            return len(keys)
+
+    def invalidate_for(self, endpoint):
+        """ (ResponseCache, str) -> NoneType
+
+        Drop responses affected by calling the given mutating endpoint.
+        """
+        for target in self.invalidates.get(endpoint, ()):
+            self.invalidate(target)
+
+    def stats(self):
+        """ (ResponseCache) -> dict
+
+        Hit/miss counters per endpoint.
+        """
+        with self._lock:
+            return {
+                endpoint: {
+                    "hits": self.hits.get(endpoint, 0),
+                    "misses": self.misses.get(endpoint, 0),
+                }
+                for endpoint in set(self.hits) | set(self.misses)
+            }
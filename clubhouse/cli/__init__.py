@@ -0,0 +1,64 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+clubhouse.cli
+
+The `clubhouse` command. Every subcommand runs on the shared engine
+(cache, connection pool, rate limiter, coalescing, scheduler) and only
+its own module is imported, so startup loads what the subcommand needs.
+
+    $ clubhouse browse
+    $ clubhouse join <channel>
+    $ clubhouse watch <channel>
+    $ clubhouse export <user_id> -o graph --format parquet
+    $ clubhouse bench --mock
+"""
+
+import sys
+import argparse
+import importlib
+
+# name: (module, help)
+COMMANDS = {
+    "browse": ("browse", "list the open rooms and join one (default)"),
+    "join": ("join", "join a room by name or link"),
+    "watch": ("watch", "follow a room's events without joining its voice channel"),
+    "export": ("export", "export the follow graph around some users"),
+    "bench": ("bench", "time the client's requests"),
+}
+
+DEFAULT_COMMAND = "browse"
+
+def main(argv=None):
+    """ (list of str) -> NoneType
+
+    Entry point of the `clubhouse` command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="clubhouse",
+        description="Clubhouse client",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:10} {text}" for name, (_, text) in COMMANDS.items()) +
+               "\n\nRun `clubhouse <command> --help` for the options of a command."
+    )
+    parser.add_argument("command", nargs="?", default=DEFAULT_COMMAND, choices=sorted(COMMANDS), metavar="command")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    name = args.command
+    module_name, text = COMMANDS[name]
+    # Loaded by name, so frozen builds must bundle them (see build.sh).
+    module = importlib.import_module(f".{module_name}", __name__)
+    from . import engine # pylint: disable=import-outside-toplevel
+    command_parser = argparse.ArgumentParser(prog=f"clubhouse {name}", description=text)
+    engine.add_arguments(command_parser)
+    module.add_arguments(command_parser)
+    command_args = command_parser.parse_args(args.args)
+
+    try:
+        sys.exit(module.run(command_args))
+    except Exception:
+        # Remove dump files on exit.
+        engine.remove_dumps()
+        raise
@@ -0,0 +1,12 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+__main__.py
+
+`python -m clubhouse.cli`, the same as the `clubhouse` command.
+"""
+
+from . import main
+
+main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+bench.py
+
+`clubhouse bench`: time the requests the other subcommands make, through the
+same client (cache, pool, rate limiter, coalescing), against the API or a local mock server.
+"""
+
+import os
+import time
+import tempfile
+from ..metrics import MetricsRegistry
+from . import engine
+
+def add_arguments(parser):
+    """ (argparse.ArgumentParser) -> NoneType """
+    parser.add_argument("--mock", action="store_true", help="run against a local mock server")
+    parser.add_argument("--latency", type=float, default=0.05, help="mock server latency in seconds")
+    parser.add_argument("--requests", type=int, default=20, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=8, help="profiles fetched at once")
+
+def _percentile(values, fraction):
+    """ (list of float, float) -> float """
+    values = sorted(values)
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))] if values else 0.0
+
+def _time(name, func, count):
+    """ (str, callable, int) -> object
+
+    Call `func()` `count` times, print its latency and return the last result.
+    """
+    latencies = []
+    result = None
+    for _ in range(count):
+        start = time.perf_counter()
+        result = func()
+        latencies.append(time.perf_counter() - start)
+    print(f"{name:28} p50 {_percentile(latencies, 0.5) * 1e3:9.3f} ms  p99 {_percentile(latencies, 0.99) * 1e3:9.3f} ms")
+    return result
+
+def run(args):
+    """ (argparse.Namespace) -> int """
+    metrics = MetricsRegistry()
+    server = None
+    directory = None
+    if args.mock:
+        from ..mockserver import MockServer # pylint: disable=import-outside-toplevel
+        server = MockServer(latency=args.latency).start()
+        args.api_url = server.url
+        # Mock responses go to a cache of their own, new for every run,
+        # never to the one of the real account.
+        directory = tempfile.TemporaryDirectory()
+        client = engine.make_client(
+            args, "1", "benchmark", "benchmark", metrics, os.path.join(directory.name, "cache.sqlite3")
+        )
+    else:
+        client = engine.get_client(args, metrics)
+        if client is None:
+            return 1
+    try:
+        channels = _time("get_channels", client.get_channels, args.requests)["channels"]
+        if not channels:
+            print("[!] No open rooms to benchmark.")
+            return 0
+        channel = channels[0]["channel"]
+        _time("get_channel", lambda: client.get_channel(channel), args.requests)
+        user_ids = [user["user_id"] for room in channels for user in room["users"]][:args.requests * args.concurrency]
+        _time(f"get_profiles_x{len(user_ids)}", lambda: client.get_profiles(user_ids, args.concurrency), 1)
+        _time("get_profiles_cached", lambda: client.get_profiles(user_ids, args.concurrency), 1)
+        print()
+        for endpoint, data in sorted(metrics.snapshot().items()):
+            hits = data["cache_hit_ratio"]
+            print(
+                f"{endpoint:28} {data['count']:6} requests  {data['retries']:4} retries"
+                f"  {data['coalesced']:4} coalesced  cache hits {'-' if hits is None else f'{hits:.0%}'}"
+            )
+    finally:
+        client.close()
+        if server is not None:
+            server.stop()
+        if directory is not None:
+            client.cache.close()
+            directory.cleanup()
+    return 0
@@ -0,0 +1,33 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+browse.py
+
+`clubhouse browse`: list the open rooms, pick one, join it, come back to the list.
+"""
+
+from ..feed import ChannelFeed
+from . import engine, room
+from .ui import print_channel_list
+
+def add_arguments(parser):
+    """ (argparse.ArgumentParser) -> NoneType """
+    parser.add_argument("--once", action="store_true", help="print the rooms and exit")
+
+def run(args):
+    """ (argparse.Namespace) -> int """
+    client = engine.get_client(args)
+    if client is None:
+        return 1
+    max_limit = 2000
+    feed = ChannelFeed()
+    if args.once:
+        print_channel_list(client, max_limit, feed)
+        return 0
+    while True:
+        # Choose which channel to enter.
+        # Join the talk on success.
+        print_channel_list(client, max_limit, feed)
+        channel_name = input("[.] Enter channel_name: ")
+        room.enter(client, channel_name, feed, max_limit)
@@ -0,0 +1,252 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+engine.py
+
+What every subcommand shares: the saved account, the client with its
+cache, connection pool, rate limiter and request coalescing, sign-in
+and onboarding, the shared scheduler and the voice engine.
+"""
+
+import os
+import configparser
+from ..clubhouse import Clubhouse
+from ..scheduler import get_scheduler
+from ..rtc import RtcEngine, is_available
+
+DEFAULT_CONFIG = "setting.ini"
+
+# Requests per second of the endpoints the subcommands fan out to
+# (profiles of the speakers, follow graph pages); a batch of them
+# is sent at once rather than paced at the default rate.
+RATES = {
+    "get_profile": 50,
+    "get_followers": 20,
+    "get_following": 20,
+    "get_mutual_follows": 20,
+}
+BURST = 32
+
+def add_arguments(parser):
+    """ (argparse.ArgumentParser) -> NoneType
+
+    Options common to every subcommand.
+    """
+    parser.add_argument("--config", default=DEFAULT_CONFIG, help=f"account file (default: {DEFAULT_CONFIG})")
+    parser.add_argument("--api-url", help="API server, e.g. a local `python -m clubhouse.mockserver`")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the on-disk response cache")
+
+def write_config(user_id, user_token, user_device, filename=DEFAULT_CONFIG):
+    """ (str, str, str, str) -> bool
+
+    Write Config. return True on successful file write
+    """
+    config = configparser.ConfigParser()
+    config["Account"] = {
+        "user_device": user_device,
+        "user_id": user_id,
+        "user_token": user_token,
+    }
+    with open(filename, 'w') as config_file:
+        config.write(config_file)
+    return True
+
+def read_config(filename=DEFAULT_CONFIG):
+    """ (str) -> dict of str
+
+    Read Config
+    """
+    config = configparser.ConfigParser()
+    config.read(filename)
+    if "Account" in config:
+        return dict(config['Account'])
+    return dict()
+
+def make_client(args, user_id='', user_token='', user_device='', metrics=None, cache_path=None):
+    """ (argparse.Namespace, str, str, str, MetricsRegistry, str) -> Clubhouse
+
+    Build the client used by every subcommand. Authenticated clients keep
+    their responses in the on-disk cache, so slowly-changing data is served
+    from it and refreshed in the background. `cache_path` overrides the location
+    of that cache (under the user's config directory by default).
+    """
+    from ..ratelimit import RateLimiter # pylint: disable=import-outside-toplevel
+    from ..singleflight import SingleFlight # pylint: disable=import-outside-toplevel
+    cache = None
+    if user_id and not args.no_cache:
+        from ..store import PersistentCache # pylint: disable=import-outside-toplevel
+        cache = PersistentCache(path=cache_path, namespace=user_id)
+    return Clubhouse(
+        user_id=user_id,
+        user_token=user_token,
+        user_device=user_device,
+        api_url=args.api_url,
+        cache=cache,
+        metrics=metrics,
+        ratelimit=RateLimiter(burst=BURST, rates=RATES),
+        singleflight=SingleFlight()
+    )
+
+def get_client(args, metrics=None):
+    """ (argparse.Namespace, MetricsRegistry) -> Clubhouse
+
+    Return an authenticated client, signing in first if there is no saved account.
+    Return None if the account cannot be used yet (waitlisted).
+    """
+    while True:
+        user_config = read_config(args.config)
+        user_id = user_config.get('user_id')
+        user_token = user_config.get('user_token')
+        user_device = user_config.get('user_device')
+        if user_id and user_token and user_device:
+            break
+        user_authentication(make_client(args), args)
+
+    client = make_client(args, user_id, user_token, user_device, metrics)
+
+    # Waitlist status and profile decide whether to go on,
+    # so they are never cached (a stale answer would stick).
+    # Check if user is still on the waitlist
+    _check = client.check_waitlist_status()
+    if _check['is_waitlisted']:
+        print("[!] You're still on the waitlist. Find your friends to get yourself in.")
+        return None
+
+    # Check if user has not signed up yet.
+    _check = client.me()
+    if not _check['user_profile'].get("username"):
+        process_onboarding(client)
+    return client
+
+def user_authentication(client, args):
+    """ (Clubhouse, argparse.Namespace) -> NoneType
+
+    Just for authenticating the user.
+    """
+    result = None
+    while True:
+        user_phone_number = input("[.] Please enter your phone number. (+818043217654) > ")
+        result = client.start_phone_number_auth(user_phone_number)
+        if not result['success']:
+            print(f"[-] Error occured during authentication. ({result['error_message']})")
+            continue
+        break
+
+    result = None
+    while True:
+        verification_code = input("[.] Please enter the SMS verification code (1234, 0000, ...) > ")
+        result = client.complete_phone_number_auth(user_phone_number, verification_code)
+        if not result['success']:
+            print(f"[-] Error occured during authentication. ({result['error_message']})")
+            continue
+        break
+
+    user_id = result['user_profile']['user_id']
+    user_token = result['auth_token']
+    user_device = client.HEADERS.get("CH-DeviceId")
+    write_config(user_id, user_token, user_device, args.config)
+
+    print("[.] Writing configuration file complete.")
+
+    if result['is_waitlisted']:
+        print("[!] You're still on the waitlist. Find your friends to get yourself in.")
+        return
+
+    # Authenticate user first and start doing something
+    if result['is_onboarding']:
+        process_onboarding(make_client(args, user_id, user_token, user_device))
+
+def process_onboarding(client):
+    """ (Clubhouse) -> NoneType
+
+    This is to process the initial setup for the first time user.
+    """
+    print("=" * 30)
+    print("Welcome to Clubhouse!\n")
+    print("The registration is not yet complete.")
+    print("Finish the process by entering your legal name and your username.")
+    print("WARNING: THIS FEATURE IS PURELY EXPERIMENTAL.")
+    print("         YOU CAN GET BANNED FOR REGISTERING FROM THE CLI ACCOUNT.")
+    print("=" * 30)
+
+    while True:
+        user_realname = input("[.] Enter your legal name (John Smith): ")
+        user_username = input("[.] Enter your username (elonmusk1234): ")
+
+        user_realname_split = user_realname.split(" ")
+
+        if len(user_realname_split) != 2:
+            print("[-] Please enter your legal name properly.")
+            continue
+
+        if not (user_realname_split[0].isalpha() and
+                user_realname_split[1].isalpha()):
+            print("[-] Your legal name is supposed to be written in alphabets only.")
+            continue
+
+        if len(user_username) > 16:
+            print("[-] Your username exceeds above 16 characters.")
+            continue
+
+        if not user_username.isalnum():
+            print("[-] Your username is supposed to be in alphanumerics only.")
+            continue
+
+        client.update_name(user_realname)
+        result = client.update_username(user_username)
+        if not result['success']:
+            print(f"[-] You failed to update your username. ({result})")
+            continue
+
+        result = client.check_waitlist_status()
+        if not result['success']:
+            print("[-] Your registration failed.")
+            print(f"    It's better to sign up from a real device. ({result})")
+            continue
+
+        print("[-] Registration Complete!")
+        print("    Try registering by real device if this process pops again.")
+        break
+
+def set_interval(interval, jitter=0.0):
+    """ (int, float) -> decorator
+
+    set_interval decorator
+
+    Calls run on the shared scheduler thread every `interval` seconds
+    until the function returns False. Returns a handle to `cancel()`.
+    """
+    def decorator(func):
+        def wrap(*args, **kwargs):
+            return get_scheduler().every(interval, func, *args, jitter=jitter, **kwargs)
+        return wrap
+    return decorator
+
+# The voice engine is brought up on the first join, not at import.
+RTC = RtcEngine(Clubhouse.AGORA_KEY) if is_available() else None
+
+def start_rtc():
+    """ () -> NoneType
+
+    Start bringing up the voice engine in the background, once.
+    """
+    if RTC is None or RTC.started:
+        return
+    RTC.start().add_done_callback(_on_rtc_started)
+
+def _on_rtc_started(future):
+    """ (Future) -> NoneType """
+    if future.exception() is not None:
+        print(f"[-] Failed to start the voice engine ({future.exception()})")
+    elif not future.result():
+        print("[-] Failed to set the high quality audio profile")
+
+def remove_dumps(directory="."):
+    """ (str) -> NoneType
+
+    Remove the crash dumps the voice engine leaves behind.
+    """
+    for _file in os.listdir(directory):
+        if _file.endswith(".dmp"):
+            os.remove(os.path.join(directory, _file))
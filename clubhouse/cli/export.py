@@ -0,0 +1,43 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+export.py
+
+`clubhouse export USER_ID...`: export the follow graph around seed users
+(see `clubhouse.export.GraphExporter`). Run it again to resume.
+"""
+
+from ..export import GraphExporter, RELATIONS, WRITERS
+from . import engine
+
+def add_arguments(parser):
+    """ (argparse.ArgumentParser) -> NoneType """
+    parser.add_argument("seeds", nargs="+", type=int, metavar="USER_ID", help="seed users")
+    parser.add_argument("-o", "--output", default="graph", help="output directory (default: graph)")
+    parser.add_argument("--relations", nargs="+", choices=sorted(RELATIONS), default=["followers", "following"])
+    parser.add_argument("--format", dest="output_format", choices=sorted(WRITERS), default="ndjson")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4, help="seeds fetched at once")
+    parser.add_argument("--chunk-size", type=int, default=100000, help="edges per chunk file")
+
+def run(args):
+    """ (argparse.Namespace) -> int """
+    client = engine.get_client(args)
+    if client is None:
+        return 1
+    exporter = GraphExporter(
+        client, args.output,
+        relations=args.relations,
+        output_format=args.output_format,
+        page_size=args.page_size,
+        max_workers=args.workers,
+        chunk_size=args.chunk_size
+    )
+    try:
+        totals = exporter.run(args.seeds)
+    except KeyboardInterrupt:
+        print(f"[!] Interrupted. Run the same command again to resume ({exporter.checkpoint_path}).")
+        return 130
+    print(f"[*] {totals['edges']} edges in {totals['chunks']} chunks ({totals['pages']} pages fetched) under {args.output}")
+    return 0
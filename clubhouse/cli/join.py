@@ -0,0 +1,22 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+join.py
+
+`clubhouse join CHANNEL`: join a room directly, by name or from a link.
+"""
+
+from . import engine, room
+
+def add_arguments(parser):
+    """ (argparse.ArgumentParser) -> NoneType """
+    parser.add_argument("channel", help="room name, the last part of https://www.joinclubhouse.com/room/<channel>")
+
+def run(args):
+    """ (argparse.Namespace) -> int """
+    client = engine.get_client(args)
+    if client is None:
+        return 1
+    channel_name = args.channel.rstrip("/").rsplit("/", 1)[-1]
+    return 0 if room.enter(client, channel_name) else 1
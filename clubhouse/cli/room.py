@@ -0,0 +1,200 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+room.py
+
+An interactive session in a room, shared by `clubhouse browse` and `clubhouse join`:
+voice, keep-alive pings, room events, hotkeys, and leaving cleanly.
+"""
+
+import sys
+from ..pubnub import RoomWatcher
+from . import engine
+from .ui import print_channel_list, print_users
+
+def join(client, channel_name):
+    """ (Clubhouse, str) -> dict
+
+    Join a room, also trying it as a room taken from a link.
+    Return the `join_channel` response, or None on failure.
+    """
+    # Bring up the voice engine while joining the room.
+    engine.start_rtc()
+    channel_info = client.join_channel(channel_name)
+    if not channel_info['success']:
+        # Check if this channel_name was taken from the link
+        channel_info = client.join_channel(channel_name, "link", "e30=")
+        if not channel_info['success']:
+            print(f"[-] Error while joining the channel ({channel_info['error_message']})")
+            return None
+    return channel_info
+
+def enter(client, channel_name, feed=None, max_limit=2000):
+    """ (Clubhouse, str, ChannelFeed, int) -> bool
+
+    Join a room and stay until [Enter] is pressed. Return False if the room could not be joined.
+    """
+    import keyboard
+    from colorama import Fore
+    user_id = client.HEADERS.get("CH-UserID")
+    channel_speaker_permission = False
+    hand_raised = False
+
+    def _request_speaker_permission(client, channel_name, user_id):
+        """ (str) -> bool
+
+        Raise hands for permissions
+        """
+        nonlocal hand_raised
+        if not channel_speaker_permission:
+            client.audience_reply(channel_name, True, False)
+            hand_raised = True
+            print("[/] You've raised your hand. Wait for the moderator to give you the permission.")
+
+    @engine.set_interval(30, jitter=2)
+    def _ping_keep_alive(client, channel_name):
+        """ (str) -> bool
+
+        Continue to ping alive every 30 seconds.
+        """
+        client.active_ping(channel_name)
+        return True
+
+    def _accept_speaker_invite(client, channel_name, user_id):
+        """ (str, int) -> bool
+
+        Accept the speaker invite sent by user_id.
+        """
+        nonlocal hand_raised
+        res_inv = client.accept_speaker_invite(channel_name, user_id)
+        if res_inv['success']:
+            hand_raised = False
+            print("[-] Now you have a speaker permission.")
+            print("    Please re-join this channel to activate a permission.")
+        return res_inv['success']
+
+    def _on_room_event(event, state):
+        """ (dict, RoomState) -> NoneType
+
+        Function that runs on every event of the room.
+        """
+        action = event.get("action")
+        if action == "invite_speaker" and hand_raised:
+            _accept_speaker_invite(client, state.channel, event.get("from_user_id"))
+        elif action == "end_channel":
+            print("[!] This room has ended. Press [Enter] to leave.")
+
+    def _on_room_poll(state):
+        """ (RoomState) -> NoneType
+
+        Function that runs on every poll while the event stream is down.
+        Without the stream, invites are only noticed by trying to accept one.
+        """
+        if hand_raised:
+            for _user_id in state.users:
+                if str(_user_id) != user_id:
+                    _accept_speaker_invite(client, state.channel, _user_id)
+                    break
+
+    channel_info = join(client, channel_name)
+    if channel_info is None:
+        return False
+
+    # Check for the voice level.
+    if engine.RTC:
+        engine.RTC.join(channel_info['token'], channel_name, user_id)
+    else:
+        print("[!] Agora SDK is not installed.")
+        print("    You may not speak or listen to the conversation.")
+
+    # Activate pinging
+    client.active_ping(channel_name)
+    _ping_func = _ping_keep_alive(client, channel_name)
+
+    # Follow the room events, polling only when the event stream is down
+    _watcher = RoomWatcher(client, channel_info, on_event=_on_room_event, on_poll=_on_room_poll).start()
+
+    channel_speaker_permission = print_users(channel_info, user_id, client)
+    if feed is not None:
+        print_channel_list(client, max_limit, feed, full=False)
+
+    users = channel_info['users']
+    number_of_users = len(users)
+
+    print(Fore.GREEN + "______________________________Joined Channel_____________________________\n")
+    print("Channel: -> ")
+    print("ChannelID: ", channel_info['channel_id'], " ChannelName: ", channel_info['channel'])
+    print("Topic: ", channel_info['topic'])
+    print(Fore.CYAN)
+
+    clubInfo = channel_info['club']
+    clubID = "----------"
+    clubName = "----------"
+    clubDescription = "----------"
+    if clubInfo:
+        clubID = clubInfo['club_id']
+        clubName = clubInfo['name']
+        clubDescription = clubInfo['description']
+
+    print("Club: -> ")
+    print("ClubID: ", clubID, " ClubName: ", clubName)
+    print("Description: ", clubDescription)
+    print(Fore.YELLOW)
+    print("\nNumber of Users: ", number_of_users)
+    print("____________________________________________________________________________")
+    print(Fore.RED)
+
+    # Add raise_hands key bindings for speaker permission
+    # Sorry for the bad quality
+    if not channel_speaker_permission:
+
+        if sys.platform == "darwin": # OSX
+            _hotkey = "9"
+        else: # Windows
+            _hotkey = "ctrl+shift+h"
+
+        print(f"[*] Press [{_hotkey}] to RAISE YOUR HAND for the speaker permission.")
+
+        keyboard.add_hotkey(
+            _hotkey,
+            _request_speaker_permission,
+            args=(client, channel_name, user_id),
+            trigger_on_release=True,
+        )
+
+        _hotkey_refresh_users = "1"
+
+        print(f"[*] Press [{_hotkey_refresh_users}] to refresh USERS in conversation.")
+
+        keyboard.add_hotkey(
+            _hotkey_refresh_users,
+            lambda: print_users(_watcher.snapshot(), user_id, client),
+            trigger_on_release=True,
+        )
+
+        if feed is not None:
+            _hotkey_refresh_channels = "2"
+
+            print(f"[*] Press [{_hotkey_refresh_channels}] to refresh CHANNELS in conversation.")
+
+            keyboard.add_hotkey(
+                _hotkey_refresh_channels,
+                print_channel_list,
+                args=(client, max_limit, feed, False),
+                trigger_on_release=True,
+            )
+
+    try:
+        print(Fore.MAGENTA)
+        input(f"[*] Press [Enter] to quit conversation.\n\t____________________\n\n")
+    finally:
+        keyboard.unhook_all()
+
+        # Safely leave the channel upon quitting the channel.
+        _ping_func.cancel()
+        _watcher.stop()
+        if engine.RTC:
+            engine.RTC.leave()
+        client.leave_channel(channel_name)
+    return True
@@ -0,0 +1,177 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+ui.py
+
+Terminal rendering of channels and rooms.
+rich and colorama are imported by the functions that draw, when they first draw.
+"""
+
+from ..room import RoomState
+from ..feed import channel_row
+
+def print_channel_list(client, max_limit=2000, feed=None, full=True):
+    """ (Clubhouse, int, ChannelFeed, bool) -> NoneType
+
+    Print list of channels.
+    With `feed` and `full=False`, only channels whose row changed since the last call
+    are printed, so a refresh prints the changes rather than the whole list again.
+    """
+    # Get channels and print out
+    channels = client.get_channels()['channels']
+    if feed is None:
+        _print_channel_table((index, channel_row(channel)) for index, channel in enumerate(channels, 1))
+        return
+    diff = feed.update(channels)
+    if not full:
+        if not diff:
+            print("[*] No changes in the channel list.")
+            return
+        rows = [("+", feed.row(channel['channel'])) for channel in diff.added]
+        rows += [("~", feed.row(channel['channel'])) for channel in diff.changed]
+        _print_channel_table(rows)
+        if diff.removed:
+            print("[-] Closed: " + ", ".join(str(channel['channel']) for channel in diff.removed))
+        return
+    _print_channel_table((index, feed.row(channel['channel'])) for index, channel in enumerate(channels, 1))
+
+def _print_channel_table(rows):
+    """ (iterable of (object, tuple)) -> NoneType
+
+    Render the given (label, `channel_row`) rows.
+    """
+    from rich.table import Table
+    from rich.console import Console
+    console = Console()
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("#")
+    table.add_column("channel", style="cyan", justify="left")
+    table.add_column("topic", justify="left")
+    table.add_column("club_name", justify="left")
+    table.add_column("co", justify="left")
+    table.add_column("speakers", justify="left")
+    i = 1
+    for label, (channel, topic, clubName, num_speakers, speakers) in rows:
+        if not clubName:
+            clubName = "----------"
+        color = '[cyan]' if i%2 == 0 else '[orange1]'
+        table.add_row(
+            color+str(label),
+            color+str(channel),
+            color+str(topic),
+            color+str(clubName),
+            color+str(num_speakers),
+            color+str(speakers),
+        )
+        i+=1
+
+    console.print(table)
+
+
+
+def print_users(channel_info, user_id, client):
+    """ (dict or RoomState, str, Clubhouse) -> bool
+
+    Print the room and its top 25 users, speakers first with their bio.
+    Return True if the current user may speak.
+    """
+    from colorama import Fore
+    from rich.table import Table
+    from rich.console import Console
+    from rich.live import Live
+
+    room = channel_info if isinstance(channel_info, RoomState) else RoomState.from_channel(channel_info)
+
+    number_of_users = len(room)
+
+    print(Fore.GREEN + "______________________________Joining Channel_______________________________\n")
+    # print(channel_info)
+    print("Channel: -> ")
+    print("ChannelID: ", room.channel_id, " ChannelName: ", room.channel)
+    print("Topic: ", room.topic)
+    print(Fore.CYAN)
+
+    clubInfo = room.club
+    clubID = ""
+    clubName = ""
+    clubDescription = ""
+    if clubInfo:
+        clubID = clubInfo['club_id']
+        clubName = clubInfo['name']
+        clubDescription = clubInfo['description']
+
+    print("Club: -> ")
+    print("ClubID: ", clubID, " ClubName: ", clubName)
+    print("Description: ", clubDescription)
+    print(Fore.YELLOW, "\nNumber of Users: ", number_of_users)
+    print("____________________________________________________________________________")
+    print(Fore.RED)
+
+    # List currently available users (TOP 25 only, speakers first.)
+    # Also, check for the current user's speaker permission.
+    channel_speaker_permission = room.is_speaker(user_id)
+    console = Console()
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("#", style="cyan", justify="right")
+    table.add_column("user_id")
+    table.add_column("User")
+    # table.add_column("name")
+    table.add_column("s-m")
+    table.add_column("description")
+
+    # Fetch speaker profiles concurrently and render rows as they arrive.
+    visible_users = room.top(25)
+    profiles = client.iter_profiles([user['user_id'] for user in visible_users if user['is_speaker']])
+    with Live(table, console=console, auto_refresh=False) as live:
+        i = 1
+        for user in visible_users:
+            is_speaker = user['is_speaker']
+            if not is_speaker:
+                is_speaker = "-"
+            is_moderator = user['is_moderator']
+            if not is_moderator:
+                is_moderator = "-"
+
+            desc = "----------"
+            if user['is_speaker']:
+                _, profile = next(profiles)
+                desc = profile.get('user_profile', {}).get('bio', desc)
+
+            is_speaker_mod = ""
+            if is_speaker != "-":
+                is_speaker_mod += "T"
+            else:
+                is_speaker_mod += "F"
+            is_speaker_mod += "-"
+            if is_moderator != "-":
+                is_speaker_mod += "T"
+            else:
+                is_speaker_mod += "F"
+
+            if desc == "":
+                desc = "----------"
+            username_name = user['name'] + " (" + user['username'] + ")"
+            if i%2 == 0:
+                table.add_row(
+                    '[white]'+str(i),
+                    '[white]'+str(user['user_id']),
+                    '[white]'+username_name,
+                    # '[white]'+str(user['username']),
+                    '[white]'+str(is_speaker_mod),
+                    '[white]'+str(desc),
+                )
+            else:
+                table.add_row(
+                    '[orange1]'+str(i),
+                    '[orange1]'+str(user['user_id']),
+                    '[orange1]'+username_name,
+                    # '[orange1]'+str(user['username']),
+                    '[orange1]'+str(is_speaker_mod),
+                    '[orange1]'+str(desc),
+                )
+            i+=1
+            live.refresh()
+
+
+    return channel_speaker_permission
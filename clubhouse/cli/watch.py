@@ -0,0 +1,75 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+watch.py
+
+`clubhouse watch CHANNEL`: print the events of a room as they happen, without voice,
+until the room ends or Ctrl-C.
+"""
+
+import time
+from ..pubnub import RoomWatcher
+from . import engine, room
+
+ACTIONS = {
+    "join_channel": "joined",
+    "leave_channel": "left",
+    "add_speaker": "is now a speaker",
+    "remove_speaker": "is no longer a speaker",
+    "make_moderator": "is now a moderator",
+    "raise_hands": "raised their hand",
+    "unraise_hands": "lowered their hand",
+    "invite_speaker": "invited you to speak",
+    "uninvite_speaker": "uninvited you to speak",
+    "end_channel": "The room has ended",
+}
+
+def add_arguments(parser):
+    """ (argparse.ArgumentParser) -> NoneType """
+    parser.add_argument("channel", help="room name")
+    parser.add_argument("--poll-interval", type=int, default=10, help="seconds between polls while the event stream is down")
+
+def run(args):
+    """ (argparse.Namespace) -> int """
+    client = engine.get_client(args)
+    if client is None:
+        return 1
+    channel_info = room.join(client, args.channel)
+    if channel_info is None:
+        return 1
+    names = {int(user["user_id"]): user.get("name") for user in channel_info.get("users") or ()}
+
+    def on_event(event, state):
+        """ (dict, RoomState) -> NoneType """
+        action = event.get("action")
+        profile = event.get("user_profile") or {}
+        user_id = event.get("from_user_id") if action in ("invite_speaker", "uninvite_speaker") else event.get("user_id", profile.get("user_id"))
+        if user_id is not None:
+            user_id = int(user_id)
+            names.setdefault(user_id, profile.get("name"))
+        who = f"{names.get(user_id) or user_id} " if user_id is not None and action != "end_channel" else ""
+        print(f"[{time.strftime('%H:%M:%S')}] {who}{ACTIONS.get(action, action)} ({len(state)} in the room)")
+
+    @engine.set_interval(30, jitter=2)
+    def _ping_keep_alive(client, channel_name):
+        """ (str) -> bool
+
+        Continue to ping alive every 30 seconds.
+        """
+        client.active_ping(channel_name)
+        return True
+
+    _ping_func = _ping_keep_alive(client, args.channel)
+    watcher = RoomWatcher(client, channel_info, on_event=on_event, poll_interval=args.poll_interval).start()
+    print(f"[*] Watching {args.channel} ({len(watcher.state)} in the room). Press Ctrl-C to stop.")
+    try:
+        while not watcher.wait(1):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _ping_func.cancel()
+        watcher.stop()
+        client.leave_channel(args.channel)
+    return 0
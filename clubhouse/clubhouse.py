@@ -11,11 +11,18 @@ Please make sure to know what you're trying to do!
 Sending an odd API request could result in a permanent ban on your account.
 """
 
-import uuid
-import random
-import secrets
+import os
+import time
 import functools
-import requests
+import threading
+from types import MappingProxyType
+from .transport import RequestsTransport, AiohttpTransport
+from .paging import iter_pages, aiter_pages
+from .cache import MISS, ResponseCache
+from .endpoints import install, is_idempotent
+
+# asyncio, concurrent.futures, uuid and the HTTP libraries are imported where they
+# are first needed: importing this module should stay cheap for short-lived processes.
 
 class Clubhouse:
     """
@@ -28,10 +35,13 @@ class Clubhouse:
         @unstable_endpoint
             - This means that the endpoint is never tested.
             - Likely to be endpoints that were taken from a static analysis
+
+    Most request methods are generated from the table in `clubhouse.endpoints`;
+    the methods written here are the ones that need more than that table.
     """
 
     # App/API Information
-    API_URL = "https://www.clubhouseapi.com/api"
+    API_URL = os.environ.get("CLUBHOUSE_API_URL", "https://www.clubhouseapi.com/api")
     API_BUILD_ID = "304"
     API_BUILD_VERSION = "0.1.28"
     API_UA = f"clubhouse/{API_BUILD_ID} (iPhone; iOS 14.4; Scale/2.00)"
@@ -53,7 +63,8 @@ class Clubhouse:
     AMPLITUDE_KEY = "9098a21a950e7cb0933fb5b30affe5be"
 
     # Useful header information
-    HEADERS = {
+    # This is the read-only template. Every instance builds its own copy in __init__.
+    HEADERS = MappingProxyType({
         "CH-Languages": "en-JP,ja-JP",
         "CH-Locale": "en_JP",
         "Accept": "application/json",
@@ -62,10 +73,9 @@ class Clubhouse:
         "CH-AppBuild": f"{API_BUILD_ID}",
         "CH-AppVersion": f"{API_BUILD_VERSION}",
         "User-Agent": f"{API_UA}",
-        "Connection": "close",
+        "Connection": "keep-alive",
         "Content-Type": "application/json; charset=utf-8",
-        "Cookie": f"__cfduid={secrets.token_hex(21)}{random.randint(1, 9)}"
-    }
+    })
 
     def require_authentication(func):
         """ Simple decorator to check for the authentication """
@@ -86,14 +96,44 @@ class Clubhouse:
             return func(self, *args, **kwargs)
         return wrap
 
-    def __init__(self, user_id='', user_token='', user_device=''):
-        """ (Clubhouse, str, str, str) -> NoneType
+    def __init__(self, user_id='', user_token='', user_device='', transport=None, cache=None, api_url=None, metrics=None, ratelimit=None, singleflight=None):
+        """ (Clubhouse, str, str, str, Transport, ResponseCache, str, MetricsRegistry, RateLimiter, SingleFlight) -> NoneType
         Set authenticated information
-        """
-        self.HEADERS['CH-UserID'] = user_id if user_id else "(null)"
+
+        `transport` defaults to a pooled keep-alive `RequestsTransport`.
+        Pass your own to tune the pool size, per-host limits and idle timeouts.
+        `cache` enables caching of read-only endpoints (see `clubhouse.cache.ResponseCache`).
+        `api_url` points this instance at another server, such as `clubhouse.mockserver`.
+        The default can also be set with the CLUBHOUSE_API_URL environment variable.
+        `metrics` records latency, sizes and status codes of every request (see `clubhouse.metrics`).
+        `ratelimit` paces requests and retries throttled or failed ones (see `clubhouse.ratelimit.RateLimiter`).
+        `singleflight` lets concurrent identical reads share one request (see `clubhouse.singleflight`).
+        """
+        if api_url:
+            self.API_URL = api_url.rstrip("/")
+        headers = dict(Clubhouse.HEADERS)
+        headers['Cookie'] = f"__cfduid={os.urandom(21).hex()}{1 + os.urandom(1)[0] % 9}"
+        headers['CH-UserID'] = str(user_id) if user_id else "(null)"
         if user_token:
-            self.HEADERS['Authorization'] = f"Token {user_token}"
-        self.HEADERS['CH-DeviceId'] = user_device.upper() if user_device else str(uuid.uuid4()).upper()
+            headers['Authorization'] = f"Token {user_token}"
+        headers['CH-DeviceId'] = user_device.upper() if user_device else self._new_device_id()
+        self.update_headers(headers)
+        self.transport = transport if transport else RequestsTransport()
+        self.cache = cache
+        self.metrics = metrics
+        self.ratelimit = ratelimit
+        self.singleflight = singleflight
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+
+    @staticmethod
+    def _new_device_id():
+        """ () -> str
+
+        Random device id, in the uppercase UUID form of the app.
+        """
+        import uuid # pylint: disable=import-outside-toplevel
+        return str(uuid.uuid4()).upper()
 
     def __str__(self):
         """ (Clubhouse) -> str
@@ -108,1474 +148,532 @@ class Clubhouse:
             self.HEADERS.get('CH-DeviceId')
         )
 
-    def start_phone_number_auth(self, phone_number):
-        """ (Clubhouse, str) -> dict
-
-        Begin phone number authentication.
-        Some examples for the phone number.
-
-        >>> clubhouse = Clubhouse()
-        >>> clubhouse.start_phone_number_auth("+821012341337")
-        ...
-        >>> clubhouse.start_phone_number_auth("+818013371221")
-        ...
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number
-        }
-        req = requests.post(f"{self.API_URL}/start_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    def call_phone_number_auth(self, phone_number):
-        """ (Clubhouse, str) -> dict
-
-        Call the person and send verification message.
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number
-        }
-        req = requests.post(f"{self.API_URL}/call_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    def resend_phone_number_auth(self, phone_number):
-        """ (Clubhouse, str) -> dict
-
-        Resend the verification message
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number
-        }
-        req = requests.post(f"{self.API_URL}/resend_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    def complete_phone_number_auth(self, phone_number, verification_code):
-        """ (Clubhouse, str, str) -> dict
-
-        Complete phone number authentication.
-        This should return `auth_token`, `access_token`, `refresh_token`, is_waitlisted, ...
-        Please note that output may be different depending on the status of the authenticated user
-        """
-        if self.HEADERS.get("Authorization"):
-            raise Exception('Already Authenticatied')
-        data = {
-            "phone_number": phone_number,
-            "verification_code": verification_code
-        }
-        req = requests.post(f"{self.API_URL}/complete_phone_number_auth", headers=self.HEADERS, json=data)
-        return req.json()
-
-    def check_for_update(self, is_testflight=False):
-        """ (Clubhouse, bool) -> dict
-
-        Check for app updates.
-
-        >>> clubhouse = Clubhouse()
-        >>> clubhouse.check_for_update(False)
-        {'has_update': False, 'success': True}
-        """
-        query = f"is_testflight={int(is_testflight)}"
-        req = requests.get(f"{self.API_URL}/check_for_update?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_release_notes(self):
-        """ (Clubhouse) -> dict
-
-        Get release notes.
-        """
-        req = requests.post(f"{self.API_URL}/get_release_notes", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def check_waitlist_status(self):
-        """ (Clubhouse) -> dict
-
-        Check whether you're still on a waitlist or not.
-        """
-        req = requests.post(f"{self.API_URL}/check_waitlist_status", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def add_email(self, email):
-        """ (Clubhouse, str) -> dict
-
-        Request for email verification.
-        You only need to do this once.
-        """
-        data = {
-            "email": email
-        }
-        req = requests.post(f"{self.API_URL}/add_email", headers=self.HEADERS, json=data)
-        return req.json()
+    def update_headers(self, headers):
+        """ (Clubhouse, dict) -> NoneType
+
+        Replace the headers of this instance.
+        `self.HEADERS` is read-only and swapped as a whole, so threads sharing
+        the instance always see either the old or the new headers, never a mix.
+        """
+        headers = dict(headers)
+        upload_headers = {key: value for key, value in headers.items() if key != "Content-Type"}
+        self._upload_headers = MappingProxyType(upload_headers)
+        self.HEADERS = MappingProxyType(headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """ (Clubhouse) -> NoneType
+
+        Close pooled connections held by the transport.
+        """
+        self.transport.close()
+
+    def invalidate_cache(self, endpoint=None):
+        """ (Clubhouse, str) -> int
+
+        Drop cached responses of the given endpoint, or all of them.
+        """
+        if self.cache is None:
+            return 0
+        return self.cache.invalidate(endpoint)
+
+    def _cache_lookup(self, method, endpoint, query, json):
+        """ (Clubhouse, str, str, str, dict) -> (tuple, dict)
+
+        Return the cache key and the cached response (or `MISS`).
+        The key is None for endpoints that are not cacheable.
+        A stale response is returned as is and refreshed in the background.
+        """
+        if not self.cache.is_cacheable(endpoint):
+            return None, MISS
+        key = self.cache.make_key(endpoint, query, json, self.HEADERS.get("CH-UserID"))
+        result, fresh = self.cache.lookup(key)
+        if self.metrics is not None:
+            self.metrics.observe_cache(endpoint, result is not MISS)
+        if result is not MISS and not fresh:
+            with self._revalidating_lock:
+                if key in self._revalidating:
+                    return key, result
+                self._revalidating.add(key)
+            self._schedule_revalidate(method, endpoint, query, json, key)
+        return key, result
+
+    def _cache_store(self, endpoint, key, result, req=None):
+        """ (Clubhouse, str, tuple, dict, Response) -> NoneType
+
+        Cache a fresh response, or invalidate what a mutating call may have changed.
+        """
+        if key is None:
+            self.cache.invalidate_for(endpoint)
+        else:
+            self.cache.set(key, result, etag=req.headers.get("ETag") if req is not None else None)
+
+    def _revalidate_headers(self, key):
+        """ (Clubhouse, tuple) -> dict """
+        etag = self.cache.etag(key)
+        if not etag:
+            return self.HEADERS
+        return {**self.HEADERS, "If-None-Match": etag}
+
+    def _revalidated(self, endpoint, key, req):
+        """ (Clubhouse, str, tuple, Response) -> NoneType """
+        if req.status_code == 304:
+            self.cache.touch(key)
+        else:
+            self._cache_store(endpoint, key, self._decode(req), req)
+
+    def _schedule_revalidate(self, method, endpoint, query, json, key):
+        """ (Clubhouse, str, str, str, dict, tuple) -> NoneType
+
+        Refresh a stale response on a background thread.
+        """
+        def revalidate():
+            try:
+                req = self._fetch(method, endpoint, query, json, headers=self._revalidate_headers(key))
+                self._revalidated(endpoint, key, req)
+            except Exception: # pylint: disable=broad-except
+                pass
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+        threading.Thread(target=revalidate, daemon=True).start()
+
+    def _fetch(self, method, endpoint, query=None, json=None, files=None, headers=None):
+        """ (Clubhouse, str, str, str, dict, dict, dict) -> Response
+
+        Send the request through the transport, within the limits of `self.ratelimit`.
+        """
+        url = f"{self.API_URL}/{endpoint}"
+        if query:
+            url = f"{url}?{query}"
+        headers = headers if headers is not None else self.HEADERS
+        if self.ratelimit is None:
+            return self._send(method, endpoint, url, headers, json, files)
+        return self.ratelimit.run(
+            endpoint, method, lambda: self._send(method, endpoint, url, headers, json, files),
+            on_retry=self.metrics.observe_retry if self.metrics is not None else None,
+            retry=not files
+        )
 
-    @require_authentication
-    def update_photo(self, photo_filename):
-        """ (Clubhouse, str) -> dict
+    def _send(self, method, endpoint, url, headers, json, files):
+        """ (Clubhouse, str, str, str, dict, dict, dict) -> Response
 
-        Update photo. Please make sure to upload a JPG format.
+        Send one attempt of a request.
         """
-        files = {
-            "file": ("image.jpg", open(photo_filename, "rb"), "image/jpeg"),
-        }
-        tmp = self.HEADERS['Content-Type']
-        self.HEADERS.pop("Content-Type")
-        req = requests.post(f"{self.API_URL}/update_photo", headers=self.HEADERS, files=files)
-        self.HEADERS['Content-Type'] = tmp
-        return req.json()
+        if self.metrics is None:
+            return self.transport.request(method, url, headers=headers, json=json, files=files)
+        start = time.perf_counter()
+        try:
+            req = self.transport.request(method, url, headers=headers, json=json, files=files)
+        except Exception:
+            self.metrics.observe_request(endpoint, method, None, time.perf_counter() - start)
+            raise
+        self._observe(endpoint, method, req, start)
+        return req
 
-    @require_authentication
-    def follow(self, user_id, user_ids=None, source=4, source_topic_id=None):
-        """ (Clubhouse, int, list, int, int) -> dict
+    def _observe(self, endpoint, method, req, start):
+        """ (Clubhouse, str, str, Response, float) -> NoneType
 
-        Follow a user.
-        Different value for `source` may require different parameters to be set
+        Report a finished request to `self.metrics`.
         """
-        data = {
-            "source_topic_id": source_topic_id,
-            "user_ids": user_ids,
-            "user_id": int(user_id),
-            "source": source
-        }
-        req = requests.post(f"{self.API_URL}/follow", headers=self.HEADERS, json=data)
-        return req.json()
+        self.metrics.observe_request(
+            endpoint, method, req.status_code, time.perf_counter() - start,
+            self.transport.request_size(req), len(req.content)
+        )
 
-    @require_authentication
-    def unfollow(self, user_id):
-        """ (Clubhouse, int) -> dict
+    def _flight_key(self, method, endpoint, query, json, files, headers):
+        """ (Clubhouse, str, str, str, dict, dict, dict) -> tuple
 
-        Unfollow a user.
+        Return the key under which the request may share a request in flight,
+        or None if it must be sent on its own. Responses are only shared
+        between calls of the same user on the same server.
         """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/unfollow", headers=self.HEADERS, json=data)
-        return req.json()
+        if self.singleflight is None or files or headers is not None or not is_idempotent(method, endpoint):
+            return None
+        return ResponseCache.make_key(endpoint, query, json, self.HEADERS.get("CH-UserID")) + (self.API_URL,)
 
-    @require_authentication
-    def block(self, user_id):
-        """ (Clubhouse, int) -> dict
+    def _load(self, method, endpoint, query, json, files, headers, key):
+        """ (Clubhouse, str, str, str, dict, dict, dict, tuple) -> dict
 
-        Block a user.
+        Fetch, decode and cache a response.
         """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/block", headers=self.HEADERS, json=data)
-        return req.json()
+        req = self._fetch(method, endpoint, query, json, files, headers)
+        result = self._decode(req)
+        if self.cache is not None:
+            self._cache_store(endpoint, key, result, req)
+        return result
 
-    @require_authentication
-    def unblock(self, user_id):
-        """ (Clubhouse, int) -> dict
+    def _request(self, method, endpoint, query=None, json=None, files=None, headers=None):
+        """ (Clubhouse, str, str, str, dict, dict, dict) -> dict
 
-        Unfollow a user.
+        Send the request through the transport and decode the response.
         """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/unblock", headers=self.HEADERS, json=data)
-        return req.json()
+        key = None
+        if self.cache is not None:
+            key, result = self._cache_lookup(method, endpoint, query, json)
+            if result is not MISS:
+                return result
+        flight_key = self._flight_key(method, endpoint, query, json, files, headers)
+        if flight_key is None:
+            return self._load(method, endpoint, query, json, files, headers, key)
+        result, shared = self.singleflight.do(
+            flight_key, lambda: self._load(method, endpoint, query, json, files, headers, key)
+        )
+        if shared and self.metrics is not None:
+            self.metrics.observe_coalesced(endpoint)
+        return result
 
-    @require_authentication
-    def follow_multiple(self, user_ids, user_id=None, source=7, source_topic_id=None):
-        """ (Clubhouse, list, int, int, int) -> dict
+    def _decode(self, req):
+        """ (Clubhouse, Response) -> dict
 
-        Follow multiple users at once.
-        Different value for `source` may require different parameters to be set
+        Decode a response. Error pages that are not JSON (proxy errors, throttling, ...)
+        are turned into a failed response instead of raising.
         """
-        data = {
-            "source_topic_id": source_topic_id,
-            "user_ids": user_ids,
-            "user_id": user_id,
-            "source": source
-        }
-        req = requests.post(f"{self.API_URL}/follow_multiple", headers=self.HEADERS, json=data)
-        return req.json()
+        try:
+            result = self.transport.decode(req)
+        except ValueError:
+            if req.status_code < 400:
+                raise
+            return {"success": False, "error_message": f"HTTP {req.status_code}", "status_code": req.status_code}
+        if req.status_code == 404 and isinstance(result, dict):
+            # Tells a missing room apart from other failures (see `room.is_room_gone`).
+            result.setdefault("success", False)
+            result.setdefault("status_code", 404)
+        return result
 
-    @require_authentication
-    def follow_club(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
+    def _result(self, value):
+        """ (Clubhouse, object) -> object
 
-        Follow a club
+        Return a locally computed value in the same form as `_request()`.
         """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/follow_club", headers=self.HEADERS, json=data)
-        return req.json()
+        return value
 
-    @require_authentication
-    def unfollow_club(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
+    def _paginate(self, method, items_key, page, page_size, *args, **kwargs):
+        """ (Clubhouse, callable, str, int, int, ...) -> generator
 
-        Unfollow a club
+        Iterate over every record of a paged endpoint.
         """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/unfollow_club", headers=self.HEADERS, json=data)
-        return req.json()
+        def fetch(_page):
+            return method(*args, page_size=page_size, page=_page, **kwargs)
+        return iter_pages(fetch, items_key, page, page_size)
 
-    @require_authentication
-    def update_follow_notifications(self, user_id, notification_type=2):
-        """ (Clubhouse, str, int) -> dict
+    def _check(self, endpoint):
+        """ (Clubhouse, Endpoint) -> NoneType
 
-        Update notification frequency for the given user.
-        1 = Always notify, 2 = Sometimes, 3 = Never
+        Enforce the authentication requirement of an endpoint, and warn about untested ones.
         """
-        data = {
-            "user_id": int(user_id),
-            "notification_type": int(notification_type)
-        }
-        req = requests.post(f"{self.API_URL}/update_follow_notifications", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_follows_similar(self, user_id):
-        """ (Clubhouse, int) -> dict
+        if endpoint.auth:
+            headers = self.HEADERS
+            if not (headers.get("CH-UserID") and headers.get("CH-DeviceId") and headers.get("Authorization")):
+                raise Exception('Not Authenticated')
+        elif endpoint.auth is None and self.HEADERS.get("Authorization"):
+            raise Exception('Already Authenticatied')
+        if endpoint.unstable:
+            print("[!] This endpoint is NEVER TESTED and MAY BE UNSTABLE. BE CAREFUL!")
 
-        Get similar users based on the given user.
-        """
-        data = {
-            "user_id": int(user_id),
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_follows_similar", headers=self.HEADERS, json=data)
-        return req.json()
+    def batch(self, name, calls, max_workers=8):
+        """ (Clubhouse, str, list, int) -> generator of dict
 
-    @require_authentication
-    def get_suggested_follows_friends_only(self, club_id=None, upload_contacts=True, contacts=()):
-        """ (Clubhouse, int, int, list of dict) -> dict
+        Call the endpoint method `name` once per item of `calls` over a bounded worker pool.
+        Items are tuples of positional arguments or dicts of keyword arguments.
+        Results are yielded in the order of `calls` as soon as they are available.
+        A failed call yields {"success": False, "error_message": ...} instead of raising.
 
-        Get users based on the phone number.
-        Only seems to be used upon signup.
+        >>> list(clubhouse.batch("get_club", [(1,), (2,), {"club_id": 3}]))
         """
-        data = {
-            "club_id": club_id,
-            "upload_contacts": upload_contacts,
-            "contacts": contacts
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_follows_friends_only", headers=self.HEADERS, json=data)
-        return req.json()
+        from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+        method = getattr(self, name)
 
-    @require_authentication
-    def get_suggested_follows_all(self, in_onboarding=True, page_size=50, page=1):
-        """ (Clubhouse, bool, int, int) -> dict
+        def call(args):
+            return method(**args) if isinstance(args, dict) else method(*args)
 
-        Get all suggested follows.
-        """
-        query = "in_onboarding={}&page_size={}&page={}".format(
-            "true" if in_onboarding else "false",
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_suggested_follows_all?{query}", headers=self.HEADERS)
-        return req.json()
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(call, args) for args in calls]
+            for future in futures:
+                try:
+                    yield future.result()
+                except Exception as exc: # pylint: disable=broad-except
+                    yield {"success": False, "error_message": str(exc)}
 
     @require_authentication
-    def ignore_suggested_follow(self, user_id):
+    def update_photo(self, photo_filename):
         """ (Clubhouse, str) -> dict
 
-        Remove user_id from the suggested follow list.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/user_id", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_event(self, event_id=None, user_ids=None, club_id=None, is_member_only=False, event_hashid=None, description=None, time_start_epoch=None, name=None):
-        """ (Clubhouse, int, list, int, bool, int, str, int, str) -> dict
-
-        Get details about the event
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/get_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def create_event(self, name, time_start_epoch, description, event_id=None, user_ids=(), club_id=None, is_member_only=False, event_hashid=None):
-        """ (Clubhouse, str, int, str, int, list, int, bool, int) -> dict
-
-        Create a new event
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/edit_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def edit_event(self, name, time_start_epoch, description, event_id=None, user_ids=(), club_id=None, is_member_only=False, event_hashid=None):
-        """ (Clubhouse, str, int, str, int, list, int, bool, int) -> dict
-
-        Edit an event.
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/edit_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def delete_event(self, event_id, user_ids=None, club_id=None, is_member_only=False, event_hashid=None, description=None, time_start_epoch=None, name=None):
-        """ (Clubhouse, str, list, int, bool, int, str, int, str) -> dict
-
-        Delete event.
-        """
-        data = {
-            "user_ids": user_ids,
-            "club_id": club_id,
-            "is_member_only": is_member_only,
-            "event_id": int(event_id) if event_id else None,
-            "event_hashid": event_hashid,
-            "description": description,
-            "time_start_epoch": time_start_epoch,
-            "name": name
-        }
-        req = requests.post(f"{self.API_URL}/delete_event", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_events(self, is_filtered=True, page_size=25, page=1):
-        """ (Clubhouse, bool, int, int) -> dict
-
-        Get list of upcoming events with details.
-        """
-        _is_filtered = "true" if is_filtered else "false"
-        query = "is_filtered={}&page_size={}&page={}".format(
-            "true" if is_filtered else "false",
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_events?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_club(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Get the information about the given club_id.
+        Update photo. Please make sure to upload a JPG format.
         """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
+        files = {
+            "file": ("image.jpg", open(photo_filename, "rb"), "image/jpeg"),
         }
-        req = requests.post(f"{self.API_URL}/get_club", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_club_members(self, club_id, return_followers=False, return_members=True, page_size=50, page=1):
-        """ (Clubhouse, int, bool, bool, int, int) -> dict
-
-        Get list of members on the given club_id.
-        """
-        query = "club_id={}&return_followers={}&return_members={}&page_size={}&page={}".format(
-            club_id,
-            int(return_followers),
-            int(return_members),
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_club_members?{query}", headers=self.HEADERS)
-        return req.json()
+        return self._request("POST", "update_photo", files=files, headers=self._upload_headers)
 
     @require_authentication
-    def get_settings(self):
-        """ (Clubhouse) -> dict
+    def iter_profiles(self, user_ids, max_workers=8):
+        """ (Clubhouse, list of int, int) -> generator of (int, dict)
 
-        Receive user's settings.
+        Lookup many profiles at once over a bounded worker pool.
+        Duplicated IDs are fetched once. Pairs of (user_id, result) are yielded in input order
+        as soon as they are available, so callers can render them progressively.
+        A failed lookup yields {"success": False, "error_message": ...} instead of raising.
         """
-        req = requests.get(f"{self.API_URL}/get_settings", headers=self.HEADERS)
-        return req.json()
+        user_ids = [int(user_id) for user_id in user_ids]
+        unique = list(dict.fromkeys(user_ids))
+        fetched = zip(unique, self.batch("get_profile", [(user_id,) for user_id in unique], max_workers))
+        results = {}
+        for user_id in user_ids:
+            while user_id not in results:
+                fetched_id, result = next(fetched)
+                results[fetched_id] = result
+            yield user_id, results[user_id]
 
     @require_authentication
-    def get_welcome_channel(self):
-        """ (Clubhouse) -> dict
+    def get_profiles(self, user_ids, max_workers=8):
+        """ (Clubhouse, list of int, int) -> list of dict
 
-        Seems to be called upon sign up. Does not seem to return much data.
+        Lookup many profiles at once. Results follow the order of `user_ids`.
         """
-        req = requests.get(f"{self.API_URL}/get_welcome_channel", headers=self.HEADERS)
-        return req.json()
+        return [result for _, result in self.iter_profiles(user_ids, max_workers)]
 
     @require_authentication
-    def hide_channel(self, channel, hide=True):
-        """ (Clubhouse, str, bool) -> dict
-
-        Hide/unhide the channel from the channel list.
-        """
-        # Join channel
-        data = {
-            "channel": channel,
-            "hide": hide
-        }
-        req = requests.post(f"{self.API_URL}/hide_channel", headers=self.HEADERS, json=data)
-        return req.json()
+    def change_handraise_settings(self, channel, is_enabled=True, handraise_permission=1):
+        """ (Clubhouse, bool, int) -> dict
 
-    @require_authentication
-    def join_channel(self, channel, attribution_source="feed", attribution_details="eyJpc19leHBsb3JlIjpmYWxzZSwicmFuayI6MX0="):
-        """ (Clubhouse, str, str) -> dict
+        Change handraise settings. Requires moderator privilege
 
-        Join the given channel
+        * handraise_permission(int)
+           - 1: Everyone
+           - 2: Followed by the speakers
+        * is_enabled(bool)
+           - True: Enable handraise
+           - False: Disable handraise
         """
-        data = {
-            "channel": channel,
-            "attribution_source": attribution_source,
-            "attribution_details": attribution_details, # base64_json
-        }
-        req = requests.post(f"{self.API_URL}/join_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def leave_channel(self, channel):
-        """ (Clubhouse, str) -> dict
+        handraise_permission = int(handraise_permission)
+        if not 1 <= handraise_permission <= 2:
+            return self._result(False)
 
-        Leave the given channel
-        """
         data = {
             "channel": channel,
-            "channel_id": None
+            "is_enabled": is_enabled,
+            "handraise_permission": handraise_permission
         }
-        req = requests.post(f"{self.API_URL}/leave_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        return self._request("POST", "change_handraise_settings", json=data)
 
     @require_authentication
-    def make_channel_public(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
-
-        Make the current channel open to public.
-        Everyone can join the channel.
+    def update_skintone(self, skintone=1):
+        """ (Clubhouse, int) -> dict
+        Updating skinetone for raising hands, etc.
         """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/make_channel_public", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def make_channel_social(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
+        skintone = int(skintone)
+        if not 1 <= skintone <= 5:
+            return self._result(False)
 
-        Make the current channel open to public.
-        Only people who user follows can join the channel.
-        """
         data = {
-            "channel": channel,
-            "channel_id": channel_id
+            "skintone": skintone
         }
-        req = requests.post(f"{self.API_URL}/make_channel_social", headers=self.HEADERS, json=data)
-        return req.json()
+        return self._request("POST", "update_skintone", json=data)
 
+    @unstable_endpoint
     @require_authentication
-    def end_channel(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
+    def update_club_rules(self):
+        """ (Clubhouse) -> dict
 
-        Kick everyone and close the channel. Requires moderator privilege.
+        Not implemented method
         """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/end_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        raise NotImplementedError("Not Implemented!")
 
+    @unstable_endpoint
     @require_authentication
-    def make_moderator(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
+    def update_club_topics(self):
+        """ (Clubhouse) -> dict
 
-        Make the given user moderator. Requires moderator privilege.
+        Not implemented method
         """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/make_moderator", headers=self.HEADERS, json=data)
-        return req.json()
+        raise NotImplementedError("Not Implemented!")
 
+    @unstable_endpoint
     @require_authentication
-    def block_from_channel(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
+    def get_events_for_user(self):
+        """ (Clubhouse) -> dict
 
-        Remove the user from the channel. The user will not be able to re-join.
+        Not implemented method
         """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/block_from_channel", headers=self.HEADERS, json=data)
-        return req.json()
+        raise NotImplementedError("Not Implemented!")
 
-    @require_authentication
-    def get_profile(self, user_id):
-        """ (Clubhouse, str) -> dict
+install(Clubhouse)
 
-        Lookup someone else's profile. It is OK to one's own profile with this method.
-        """
-        data = {
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/get_profile", headers=self.HEADERS, json=data)
-        return req.json()
 
-    @require_authentication
-    def me(self, return_blocked_ids=False, timezone_identifier="Asia/Tokyo", return_following_ids=False):
-        """ (Clubhouse, bool, str, bool) -> dict
+class AsyncClubhouse(Clubhouse):
+    """
+    AsyncClubhouse Class
 
-        Get my information
-        """
-        data = {
-            "return_blocked_ids": return_blocked_ids,
-            "timezone_identifier": timezone_identifier,
-            "return_following_ids": return_following_ids
-        }
-        req = requests.post(f"{self.API_URL}/me", headers=self.HEADERS, json=data)
-        return req.json()
+    asyncio version of `Clubhouse`. Every endpoint is inherited from `Clubhouse`,
+    so both clients share the same definitions; the methods here return coroutines.
 
-    @require_authentication
-    def get_following(self, user_id, page_size=50, page=1):
-        """ (Clubhouse, str, int, int) -> dict
+    >>> async with AsyncClubhouse(user_id, user_token, user_device) as clubhouse:
+    ...     channels = await clubhouse.get_channels()
+    """
 
-        Get following users type2
-        """
-        query = "user_id={}&page_size={}&page={}".format(
-            user_id,
-            page_size,
-            page
+    def __init__(self, user_id='', user_token='', user_device='', transport=None, cache=None, api_url=None, metrics=None, ratelimit=None, singleflight=None):
+        """ (AsyncClubhouse, str, str, str, Transport, ResponseCache, str, MetricsRegistry, RateLimiter, SingleFlight) -> NoneType
+
+        `transport` defaults to a pooled `AiohttpTransport`.
+        """
+        super().__init__(
+            user_id=user_id,
+            user_token=user_token,
+            user_device=user_device,
+            transport=transport if transport else AiohttpTransport(),
+            cache=cache,
+            api_url=api_url,
+            metrics=metrics,
+            ratelimit=ratelimit,
+            singleflight=singleflight
         )
-        req = requests.get(f"{self.API_URL}/get_following?{query}", headers=self.HEADERS)
-        return req.json()
 
-    @require_authentication
-    def get_followers(self, user_id, page_size=50, page=1):
-        """ (Clubhouse, str, int, int) -> dict
-
-        Get followers of the given user_id.
-        """
-        query = "user_id={}&page_size={}&page={}".format(
-            user_id,
-            page_size,
-            page
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def __enter__(self):
+        raise TypeError("Use 'async with' for AsyncClubhouse")
+
+    async def close(self):
+        """ (AsyncClubhouse) -> NoneType """
+        await self.transport.close()
+
+    def _schedule_revalidate(self, method, endpoint, query, json, key):
+        """ (AsyncClubhouse, str, str, str, dict, tuple) -> NoneType
+
+        Refresh a stale response on a background task.
+        """
+        import asyncio # pylint: disable=import-outside-toplevel
+
+        async def revalidate():
+            try:
+                req = await self._fetch(method, endpoint, query, json, headers=self._revalidate_headers(key))
+                self._revalidated(endpoint, key, req)
+            except Exception: # pylint: disable=broad-except
+                pass
+            finally:
+                with self._revalidating_lock:
+                    self._revalidating.discard(key)
+        asyncio.ensure_future(revalidate())
+
+    async def _fetch(self, method, endpoint, query=None, json=None, files=None, headers=None):
+        """ (AsyncClubhouse, str, str, str, dict, dict, dict) -> Response """
+        url = f"{self.API_URL}/{endpoint}"
+        if query:
+            url = f"{url}?{query}"
+        headers = headers if headers is not None else self.HEADERS
+        if self.ratelimit is None:
+            return await self._send(method, endpoint, url, headers, json, files)
+        return await self.ratelimit.arun(
+            endpoint, method, lambda: self._send(method, endpoint, url, headers, json, files),
+            on_retry=self.metrics.observe_retry if self.metrics is not None else None,
+            retry=not files
         )
-        req = requests.get(f"{self.API_URL}/get_followers?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_mutual_follows(self, user_id, page_size=50, page=1):
-        """ (Clubhouse, str, int, int) -> dict
 
-        Get mutual followers between the current user and the given user_id.
-        """
-        query = "user_id={}&page_size={}&page={}".format(
-            user_id,
-            page_size,
-            page
+    async def _send(self, method, endpoint, url, headers, json, files):
+        """ (AsyncClubhouse, str, str, str, dict, dict, dict) -> Response """
+        if self.metrics is None:
+            return await self.transport.request(method, url, headers=headers, json=json, files=files)
+        start = time.perf_counter()
+        try:
+            req = await self.transport.request(method, url, headers=headers, json=json, files=files)
+        except Exception:
+            self.metrics.observe_request(endpoint, method, None, time.perf_counter() - start)
+            raise
+        self._observe(endpoint, method, req, start)
+        return req
+
+    async def _load(self, method, endpoint, query, json, files, headers, key):
+        """ (AsyncClubhouse, str, str, str, dict, dict, dict, tuple) -> dict """
+        req = await self._fetch(method, endpoint, query, json, files, headers)
+        result = self._decode(req)
+        if self.cache is not None:
+            self._cache_store(endpoint, key, result, req)
+        return result
+
+    async def _request(self, method, endpoint, query=None, json=None, files=None, headers=None):
+        """ (AsyncClubhouse, str, str, str, dict, dict, dict) -> dict """
+        key = None
+        if self.cache is not None:
+            key, result = self._cache_lookup(method, endpoint, query, json)
+            if result is not MISS:
+                return result
+        flight_key = self._flight_key(method, endpoint, query, json, files, headers)
+        if flight_key is None:
+            return await self._load(method, endpoint, query, json, files, headers, key)
+        result, shared = await self.singleflight.ado(
+            flight_key, lambda: self._load(method, endpoint, query, json, files, headers, key)
         )
-        req = requests.get(f"{self.API_URL}/get_mutual_follows?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_all_topics(self):
-        """ (Clubhouse) -> dict
-
-        Get list of topics, based on the server's channel selection algorithm
-        """
-        req = requests.get(f"{self.API_URL}/get_all_topics", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_channels(self):
-        """ (Clubhouse) -> dict
-
-        Get list of channels, based on the server's channel selection algorithm
-        """
-        req = requests.get(f"{self.API_URL}/get_channels", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_channel(self, channel, channel_id=None):
-        """ (Clubhouse, str, int) -> dict
-
-        Get information of the given channel
-        """
-        data = {
-            "channel": channel,
-            "channel_id": channel_id
-        }
-        req = requests.post(f"{self.API_URL}/get_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def active_ping(self, channel):
-        """ (Clubhouse, str) -> dict
-
-        Keeping the user active while being in a chatroom
-        """
-        data = {
-            "channel": channel,
-            "chanel_id": None
-        }
-        req = requests.post(f"{self.API_URL}/active_ping", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def audience_reply(self, channel, raise_hands=True, unraise_hands=False):
-        """ (Clubhouse, str, bool, bool) -> bool
-
-        Request for raise_hands.
-        """
-        data = {
-            "channel": channel,
-            "raise_hands": raise_hands,
-            "unraise_hands": unraise_hands
-        }
-        req = requests.post(f"{self.API_URL}/audience_reply", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def change_handraise_settings(self, channel, is_enabled=True, handraise_permission=1):
-        """ (Clubhouse, bool, int) -> dict
-
-        Change handraise settings. Requires moderator privilege
-
-        * handraise_permission(int)
-           - 1: Everyone
-           - 2: Followed by the speakers
-        * is_enabled(bool)
-           - True: Enable handraise
-           - False: Disable handraise
-        """
-        handraise_permission = int(handraise_permission)
-        if not 1 <= handraise_permission <= 2:
-            return False
-
-        data = {
-            "channel": channel,
-            "is_enabled": is_enabled,
-            "handraise_permission": handraise_permission
-        }
-        req = requests.post(f"{self.API_URL}/change_handraise_settings", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_skintone(self, skintone=1):
-        """ (Clubhouse, int) -> dict
-        Updating skinetone for raising hands, etc.
-        """
-        skintone = int(skintone)
-        if not 1 <= skintone <= 5:
-            return False
-
-        data = {
-            "skintone": skintone
-        }
-        req = requests.post(f"{self.API_URL}/update_skintone", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_notifications(self, page_size=20, page=1):
-        """ (Clubhouse, int, int) -> dict
-
-        Get my notifications.
-        """
-        query = f"page_size={page_size}&page={page}"
-        req = requests.get(f"{self.API_URL}/get_notifications?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_actionable_notifications(self):
-        """ (Clubhouse, int, int) -> dict
-
-        Get notifications. This may return some notifications that require some actions
-        """
-        req = requests.get(f"{self.API_URL}/get_actionable_notifications", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_online_friends(self):
-        """ (Clubhouse) -> dict
-
-        List all online friends.
-        """
-        req = requests.post(f"{self.API_URL}/get_online_friends", headers=self.HEADERS, json={})
-        return req.json()
-
-    @require_authentication
-    def accept_speaker_invite(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Accept speaker's invitation, based on the (channel, invited_moderator)
-        `raise_hands` needs to be called first, prior to the invitation.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/accept_speaker_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def reject_speaker_invite(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Reject speaker's invitation.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/reject_speaker_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def invite_speaker(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Move audience to speaker. Requires moderator privilege.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/invite_speaker", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def uninvite_speaker(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Move speaker to audience. Requires moderator privilege.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/uninvite_speaker", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def mute_speaker(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Mute speaker. Requires moderator privilege
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/mute_speaker", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_speakers(self, channel):
-        """ (Clubhouse, str) -> dict
-
-        Get suggested speakers from the given channel
-        """
-        data = {
-            "channel": channel
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_speakers", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def create_channel(self, topic="", user_ids=(), is_private=False, is_social_mode=False):
-        """ (Clubhouse, str, list, bool, bool) -> dict
-
-        Create a new channel. Type of the room can be changed
-        """
-        data = {
-            "is_social_mode": is_social_mode,
-            "is_private": is_private,
-            "club_id": None,
-            "user_ids": user_ids,
-            "event_id": None,
-            "topic": topic
-        }
-        req = requests.post(f"{self.API_URL}/create_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_create_channel_targets(self):
-        """ (Clubhouse) -> dict
-
-        Not sure what this does. Triggered upon channel creation
-        """
-        data = {}
-        req = requests.post(f"{self.API_URL}/get_create_channel_targets", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_invites(self, club_id=None, upload_contacts=True, contacts=()):
-        """ (Clubhouse, int, bool, list of dict) -> dict
-
-        Get invitations and user lists based on phone number.
-
-        contacts(dict)
-            - example: [{"name": "Test Name", "phone_number": "+821043219876"}, ...]
-        """
-        data = {
-            "club_id": club_id,
-            "upload_contacts": upload_contacts,
-            "contacts": contacts
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_invites", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_suggested_club_invites(self, upload_contacts=True, contacts=()):
-        """ (Clubhouse, int, bool, list of dict) -> dict
-
-        Get user lists based on phone number. For inviting clubs.
-
-        contacts(dict)
-            - example: [{"name": "Test Name", "phone_number": "+821043219876"}, ...]
-        """
-        data = {
-            "upload_contacts": upload_contacts,
-            "contacts": contacts
-        }
-        req = requests.post(f"{self.API_URL}/get_suggested_club_invites", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def invite_to_app(self, name, phone_number, message=None):
-        """ (Clubhouse, str, str, str) -> dict
-
-        Invite users to app. but this only works when you have a leftover invitation.
-        """
-        data = {
-            "name": name,
-            "phone_number": phone_number,
-            "message": message
-        }
-        req = requests.post(f"{self.API_URL}/invite_to_app", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def invite_from_waitlist(self, user_id):
-        """ (Clubhouse, str, str, str) -> dict
-
-        Invite someone from the waitlist.
-        This is much more reliable than inviting someone by invite_to_app
-        """
-        data = {
-            "user_id": int(user_id),
-        }
-        req = requests.post(f"{self.API_URL}/invite_from_waitlist", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def search_users(self, query, followers_only=False, following_only=False, cofollows_only=False):
-        """ (Clubhouse, str, bool, bool, bool) -> dict
-
-        Search users based on the given query.
-        """
-        data = {
-            "cofollows_only": cofollows_only,
-            "following_only": following_only,
-            "followers_only": followers_only,
-            "query": query
-        }
-        req = requests.post(f"{self.API_URL}/search_users", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def search_clubs(self, query, followers_only=False, following_only=False, cofollows_only=False):
-        """ (Clubhouse, str, bool, bool, bool) -> dict
-
-        Search clubs based on the given query.
-        """
-        data = {
-            "cofollows_only": cofollows_only,
-            "following_only": following_only,
-            "followers_only": followers_only,
-            "query": query
-        }
-        req = requests.post(f"{self.API_URL}/search_clubs", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_topic(self, topic_id):
-        """ (Clubhouse, int) -> dict
-
-        Get topic's information based on the given topic id.
-        """
-        data = {
-            "topic_id": int(topic_id)
-        }
-        req = requests.post(f"{self.API_URL}/get_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_clubs_for_topic(self, topic_id, page_size=25, page=1):
-        """ (Clubhouse, int, int, int) -> dict
-
-        Get list of clubs based on the given topic id.
-        """
-        query = "topic_id={}&page_size={}&page={}".format(
-            topic_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_clubs_for_topic?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def get_clubs(self, is_startable_only):
-        """ (Clubhouse, bool) -> dict
-
-        Get list of clubs the user's in.
-        """
-        data = {
-            "is_startable_only": is_startable_only
-        }
-        req = requests.post(f"{self.API_URL}/get_clubs", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def get_users_for_topic(self, topic_id, page_size=25, page=1):
-        """ (Clubhouse, int, int, int) -> dict
-
-        Get list of users based on the given topic id.
-        """
-        query = "topic_id={}&page_size={}&page={}".format(
-            topic_id,
-            page_size,
-            page
-        )
-        req = requests.get(f"{self.API_URL}/get_users_for_topic?{query}", headers=self.HEADERS)
-        return req.json()
-
-    @require_authentication
-    def invite_to_existing_channel(self, channel, user_id):
-        """ (Clubhouse, str, int) -> dict
-
-        Invite someone to a currently joined channel.
-        It will send a ping notification to the given user_id.
-        """
-        data = {
-            "channel": channel,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/invite_to_existing_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_username(self, username):
-        """ (Clubhouse, str) -> dict
-
-        Change username. YOU HAVE LIMITED NUMBER OF TRIALS TO CHANGE YOUR USERNAME.
-        """
-        data = {
-            "username": username,
-        }
-        req = requests.post(f"{self.API_URL}/update_username", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_name(self, name):
-        """ (Clubhouse, str) -> dict
-
-        Change your legal name. Be careful of what you're trying to enter.
-            (1) Upon registration
-            (2) Changing your legal name. YOU CAN ONLY DO THIS ONCE.
-        """
-        data = {
-            "name": name,
-        }
-        req = requests.post(f"{self.API_URL}/update_name", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_twitter_username(self, username, twitter_token, twitter_secret):
-        """ (Clubhouse, str, str, str) -> dict
-
-        Change Twitter username based on Twitter Token.
-
-        >>> client.update_twitter_username(None, None, None) # Clear username
-        >>> client.update_twitter_username("stereotype32", "...", "...") # Set username
-        """
-        data = {
-            "username": username,
-            "twitter_token": twitter_token,
-            "twitter_secret": twitter_secret
-        }
-        req = requests.post(f"{self.API_URL}/update_twitter_username", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_instagram_username(self, code):
-        """ (Clubhouse, str) -> dict
-
-        Change Twitter username based on Instagram token.
-
-        >>> client.update_instagram_username(None) # Clear username
-        >>> client.update_instagram_username("...") # Set username
-        """
-        data = {
-            "code": code
-        }
-        req = requests.post(f"{self.API_URL}/update_instagram_username", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_displayname(self, name):
-        """ (Clubhouse, str) -> dict
-
-        Change your nickname. YOU CAN ONLY DO THIS ONCE.
-        """
-        data = {
-            "name": name,
-        }
-        req = requests.post(f"{self.API_URL}/update_name", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def refresh_token(self, refresh_token):
-        """ (Clubhouse, str) -> dict
-
-        Refresh the JWT token. returns both access and refresh token.
-        """
-        data = {
-            "refresh": refresh_token
-        }
-        req = requests.post(f"{self.API_URL}/refresh_token", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def update_bio(self, bio):
-        """ (Clubhouse, str) -> dict
-
-        Update bio on your profile
-        """
-        data = {
-            "bio": bio
-        }
-        req = requests.post(f"{self.API_URL}/update_bio", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def record_action_trails(self, action_trails=()):
-        """ (Clubhouse, list of dict) -> dict
-
-        Recording actions of the user interactions while using the app.
-        action_trails: [{"blob_data":{}, "trail_type": "...", ...}, ...]
-        """
-        data = {
-            "action_trails": action_trails
-        }
-        req = requests.post(f"{self.API_URL}/update_bio", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def add_user_topic(self, club_id=None, topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Add user's interest.
-
-        Some interesting flags for Language has been shared in the following link.
-        Reference: https://github.com/grishka/Houseclub/issues/24
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "topic_id": int(topic_id) if topic_id else None
-        }
-        req = requests.post(f"{self.API_URL}/add_user_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @require_authentication
-    def remove_user_topic(self, club_id, topic_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Remove user's interest
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "topic_id": int(topic_id) if topic_id else None
-        }
-        req = requests.post(f"{self.API_URL}/remove_user_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def report_incident(self, user_id, channel, incident_type, incident_description, email):
-        """ (Clubhouse, int, str, unknown, str, str) -> dict
-
-        Report incident
-        There seemed to be a field for attachment, need to trace this later
-        """
-        data = {
-            "user_id": int(user_id),
-            "channel": channel,
-            "incident_type": incident_type,
-            "incident_description": incident_description,
-            "email": email
-        }
-        req = requests.post(f"{self.API_URL}/report_incident", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def reject_welcome_channel(self):
-        """ (Clubhouse) -> dict
-
-        Unknown
-        """
-        req = requests.get(f"{self.API_URL}/reject_welcome_channel", headers=self.HEADERS)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_channel_flags(self, channel, visibility, flag_title, unflag_title):
-        """ (Clubhouse, str, bool, unknown, unknown) -> dict
-
-        Unknown
-        """
-        data = {
-            "channel": channel,
-            "visibility": visibility,
-            "flag_title": flag_title,
-            "unflag_title": unflag_title,
-        }
-        req = requests.post(f"{self.API_URL}/update_channel_flags", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def ignore_actionable_notification(self, actionable_notification_id):
-        """ (Clubhouse, int) -> dict
-
-        Ignore the actionable notification.
-        """
-        data = {
-            "actionable_notification_id": actionable_notification_id
-        }
-        req = requests.post(f"{self.API_URL}/ignore_actionable_notification", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def invite_to_new_channel(self, user_id, channel):
-        """ (Clubhouse, int, str) -> dict
-
-        Invite someone to the channel
-        """
-        data = {
-            "user_id": int(user_id),
-            "channel": channel
-        }
-        req = requests.post(f"{self.API_URL}/invite_to_new_channel", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def accept_new_channel_invite(self, channel_invite_id):
-        """ (Clubhouse, int) -> dict
-
-        Accept Channel Invitation
-        """
-        data = {
-            "channel_invite_id": channel_invite_id
-        }
-        req = requests.post(f"{self.API_URL}/accept_new_channel_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def reject_new_channel_invite(self, channel_invite_id):
-        """ (Clubhouse, int) -> dict
-
-        Reject Channel Invitation
-        """
-        data = {
-            "channel_invite_id": channel_invite_id
-        }
-        req = requests.post(f"{self.API_URL}/reject_new_channel_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def cancel_new_channel_invite(self, channel_invite_id):
-        """ (Clubhouse, int) -> dict
-
-        Cancel Channel Invitation
-        """
-        data = {
-            "channel_invite_id": channel_invite_id
-        }
-        req = requests.post(f"{self.API_URL}/cancel_new_channel_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def add_club_admin(self, club_id, user_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Add Club Admin. Requires privilege.
-        """
-        data = {
-            "club_id": int(club_id),
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/add_club_admin", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def remove_club_admin(self, club_id, user_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Remove Club admin. Requires privilege.
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/remove_club_admin", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def remove_club_member(self, club_id, user_id):
-        """ (Clubhouse, int, int) -> dict
-
-        Remove Club member. Requires privilege.
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "user_id": int(user_id)
-        }
-        req = requests.post(f"{self.API_URL}/remove_club_member", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def accept_club_member_invite(self, club_id, source_topic_id=None):
-        """ (Clubhouse, int, int) -> dict
-
-        Accept Club member invite.
-        """
-        data = {
-            "club_id": int(club_id) if club_id else None,
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/accept_club_member_invite", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def add_club_member(self, club_id, user_id, name, phone_number, message, reason):
-        """ (Clubhouse, int, int, str, str, str, unknown) -> dict
-
-        Add club member
-        """
-        data = {
-            "club_id": int(club_id),
-            "user_id": int(user_id),
-            "name": name,
-            "phone_number": phone_number,
-            "message": message,
-            "reason": reason
-        }
-        req = requests.post(f"{self.API_URL}/add_club_member", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def get_club_nominations(self, club_id, source_topic_id):
-        """ (Club, int, int) -> dict
-
-        Get club nomination list
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id
-        }
-        req = requests.post(f"{self.API_URL}/get_club_nominations", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def approve_club_nomination(self, club_id, source_topic_id, invite_nomination_id):
-        """ (Club, int, int) -> dict
-
-        Approve club nomination
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id,
-            "invite_nomination_id": invite_nomination_id
-        }
-        req = requests.post(f"{self.API_URL}/approve_club_nomination", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def reject_club_nomination(self, club_id, source_topic_id, invite_nomination_id):
-        """ (Club, int, int) -> dict
-
-        Reject club nomination
-        """
-        data = {
-            "club_id": int(club_id),
-            "source_topic_id": source_topic_id,
-            "invite_nomination_id": invite_nomination_id
-        }
-        req = requests.post(f"{self.API_URL}/approve_club_nomination", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def add_club_topic(self, club_id, topic_id):
-        """ (Club, int, int) -> dict
-
-        Add club topic
-        """
-        data = {
-            "club_id": int(club_id),
-            "topic_id": int(topic_id)
-        }
-        req = requests.post(f"{self.API_URL}/add_club_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def remove_club_topic(self, club_id, topic_id):
-        """ (Club, int, int) -> dict
-
-        Remove club topic
-        """
-        data = {
-            "club_id": int(club_id),
-            "topic_id": int(topic_id)
-        }
-        req = requests.post(f"{self.API_URL}/remove_club_topic", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def get_events_to_start(self):
-        """ (Clubhouse) -> dict
-
-        Get events to start
-        """
-        req = requests.get(f"{self.API_URL}/get_events_to_start", headers=self.HEADERS)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_is_follow_allowed(self, club_id, is_follow_allowed=True):
-        """ (Clubhouse, int, bool) -> dict
-
-        Update follow button of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "is_follow_allowed": is_follow_allowed
-        }
-        req = requests.post(f"{self.API_URL}/update_is_follow_allowed", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_is_membership_private(self, club_id, is_membership_private):
-        """ (Clubhouse, int, bool) -> dict
-
-        Update membership status of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "is_membership_private": is_membership_private
-        }
-        req = requests.post(f"{self.API_URL}/update_is_membership_private", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_is_community(self, club_id, is_community):
-        """ (Clubhouse, int, bool) -> dict
-
-        Update community stat of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "is_community": is_community
-        }
-        req = requests.post(f"{self.API_URL}/update_is_community", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_club_description(self, club_id, description):
-        """ (Clubhouse, int, str) -> dict
-
-        Update description of the given Club
-        """
-        data = {
-            "club_id": int(club_id),
-            "description": description
-        }
-        req = requests.post(f"{self.API_URL}/update_club_description", headers=self.HEADERS, json=data)
-        return req.json()
-
-    @unstable_endpoint
-    @require_authentication
-    def update_club_rules(self):
-        """ (Clubhouse) -> dict
-
-        Not implemented method
-        """
-        raise NotImplementedError("Not Implemented!")
-
-    @unstable_endpoint
-    @require_authentication
-    def update_club_topics(self):
-        """ (Clubhouse) -> dict
-
-        Not implemented method
-        """
-        raise NotImplementedError("Not Implemented!")
-
-    @unstable_endpoint
-    @require_authentication
-    def get_events_for_user(self):
-        """ (Clubhouse) -> dict
-
-        Not implemented method
-        """
-        raise NotImplementedError("Not Implemented!")
+        if shared and self.metrics is not None:
+            self.metrics.observe_coalesced(endpoint)
+        return result
+
+    async def _result(self, value):
+        """ (AsyncClubhouse, object) -> object """
+        return value
+
+    async def batch(self, name, calls, max_workers=64):
+        """ (AsyncClubhouse, str, list, int) -> async generator of dict
+
+        asyncio version of `Clubhouse.batch()`.
+        At most `max_workers` calls are in flight at once.
+        """
+        import asyncio # pylint: disable=import-outside-toplevel
+        method = getattr(self, name)
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def call(args):
+            async with semaphore:
+                try:
+                    return await (method(**args) if isinstance(args, dict) else method(*args))
+                except Exception as exc: # pylint: disable=broad-except
+                    return {"success": False, "error_message": str(exc)}
+
+        tasks = [asyncio.ensure_future(call(args)) for args in calls]
+        try:
+            for task in tasks:
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def iter_profiles(self, user_ids, max_workers=64):
+        """ (AsyncClubhouse, list of int, int) -> async generator of (int, dict)
+
+        asyncio version of `Clubhouse.iter_profiles()`.
+        At most `max_workers` lookups are in flight at once.
+        """
+        user_ids = [int(user_id) for user_id in user_ids]
+        unique = list(dict.fromkeys(user_ids))
+        fetched = self.batch("get_profile", [(user_id,) for user_id in unique], max_workers)
+        pending = iter(unique)
+        results = {}
+        try:
+            for user_id in user_ids:
+                while user_id not in results:
+                    results[next(pending)] = await fetched.__anext__()
+                yield user_id, results[user_id]
+        finally:
+            await fetched.aclose()
+
+    async def get_profiles(self, user_ids, max_workers=64):
+        """ (AsyncClubhouse, list of int, int) -> list of dict """
+        return [result async for _, result in self.iter_profiles(user_ids, max_workers)]
+
+    def _paginate(self, method, items_key, page, page_size, *args, **kwargs):
+        """ (AsyncClubhouse, coroutine function, str, int, int, ...) -> async generator
+
+        Use `async for` over the iter_* methods of this class.
+        """
+        def fetch(_page):
+            return method(*args, page_size=page_size, page=_page, **kwargs)
+        return aiter_pages(fetch, items_key, page, page_size)
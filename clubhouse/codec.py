@@ -0,0 +1,101 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+codec.py
+
+Pluggable JSON backend used by transports to encode request bodies and decode responses.
+The fastest installed backend is used: orjson, then msgspec, then the standard library.
+"""
+
+import json
+
+class Codec:
+    """
+    Codec Class
+
+    A named pair of `loads(bytes) -> object` and `dumps(object) -> bytes`.
+    Both raise ValueError on invalid input, whatever the backend is.
+    """
+
+    __slots__ = ("name", "loads", "dumps")
+
+    def __init__(self, name, loads, dumps):
+        """ (Codec, str, callable, callable) -> NoneType """
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+
+    def __repr__(self):
+        return f"Codec({self.name})"
+
+
+def _raising_value_error(function, errors):
+    """ (callable, tuple of type) -> callable
+
+    Wrap `function` so that the given errors are raised as ValueError.
+    """
+    def wrapper(value):
+        try:
+            return function(value)
+        except errors as exc:
+            raise ValueError(str(exc)) from exc
+
+    return wrapper
+
+def _stdlib_codec():
+    """ () -> Codec """
+    encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def dumps(value):
+        return encoder.encode(value).encode("utf-8")
+
+    # json.JSONDecodeError is a ValueError already; unserializable values raise TypeError.
+    return Codec("json", json.loads, _raising_value_error(dumps, TypeError))
+
+def _orjson_codec():
+    """ () -> Codec """
+    import orjson # pylint: disable=import-outside-toplevel
+    # orjson.JSONDecodeError is a ValueError, but orjson.JSONEncodeError is a TypeError.
+    return Codec("orjson", orjson.loads, _raising_value_error(orjson.dumps, orjson.JSONEncodeError))
+
+def _msgspec_codec():
+    """ () -> Codec """
+    import msgspec # pylint: disable=import-outside-toplevel
+    decoder = msgspec.json.Decoder()
+    encoder = msgspec.json.Encoder()
+    # msgspec errors derive from neither; unsupported types raise TypeError.
+    return Codec(
+        "msgspec",
+        _raising_value_error(decoder.decode, msgspec.DecodeError),
+        _raising_value_error(encoder.encode, (msgspec.EncodeError, TypeError)),
+    )
+
+BACKENDS = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+_CODECS = {}
+
+def get_codec(name=None):
+    """ (str) -> Codec
+
+    Return the codec of the given backend, or the fastest installed one when `name` is None.
+    """
+    if name in _CODECS:
+        return _CODECS[name]
+    if name is None:
+        for backend in BACKENDS:
+            try:
+                codec = get_codec(backend)
+            except ImportError:
+                continue
+            _CODECS[None] = codec
+            return codec
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}")
+    codec = BACKENDS[name]()
+    _CODECS[name] = codec
+    return codec
@@ -0,0 +1,516 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+# pylint: disable=line-too-long
+
+"""
+endpoints.py
+
+Declarative table of the Clubhouse API.
+Every endpoint is described once (HTTP method, path, parameters, authentication,
+idempotency, caching and pagination), and the request methods of `Clubhouse`
+and `AsyncClubhouse` are generated from the table by `install()`.
+
+>>> ENDPOINTS["get_followers"]
+Endpoint(get_followers, GET /get_followers)
+>>> help(Clubhouse.get_followers)
+"""
+
+import re
+from urllib.parse import quote_plus
+
+# Most reads of this API are POST requests, so idempotency is decided by name as well.
+IDEMPOTENT_PREFIXES = ("get_", "search_", "check_")
+
+REQUIRED = object()
+
+_UNRESERVED = re.compile(r"[A-Za-z0-9_.~-]*\Z").match
+
+def quote_value(value):
+    """ (object) -> str
+
+    Encode a query string value. Numbers and plain words, the usual case, are not escaped.
+    """
+    if value.__class__ is int:
+        return str(value)
+    value = str(value)
+    return value if _UNRESERVED(value) else quote_plus(value)
+
+def _int_or_none(value):
+    """ (object) -> int """
+    return int(value) if value else None
+
+def _bool_str(value):
+    """ (bool) -> str """
+    return "true" if value else "false"
+
+def _bool_int(value):
+    """ (bool) -> int """
+    return int(bool(value))
+
+
+class Param:
+    """
+    Param Class
+
+    One argument of an endpoint.
+
+        name:
+            - argument name of the generated method.
+        type_name:
+            - type shown in the docstring.
+        default:
+            - default value. Parameters without one are required.
+        convert:
+            - applied to the value before it is sent, e.g. `int`.
+        key:
+            - name on the wire, when it differs from `name`.
+        secret:
+            - credentials or contact details, redacted from recordings (see `secret_keys()`).
+    """
+
+    __slots__ = ("name", "type_name", "default", "convert", "key", "secret")
+
+    def __init__(self, name, type_name="str", default=REQUIRED, convert=None, key=None, secret=False):
+        """ (Param, str, str, object, callable, str, bool) -> NoneType """
+        self.name = name
+        self.type_name = type_name
+        self.default = default
+        self.convert = convert
+        self.key = key if key else name
+        self.secret = secret
+
+    def __repr__(self):
+        return f"Param({self.name})"
+
+
+class Endpoint:
+    """
+    Endpoint Class
+
+    Specification of one API endpoint.
+
+        method / path:
+            - HTTP method and path under `API_URL`. The path defaults to the name.
+        params:
+            - `Param`s, sent in the query string of GET requests and in the JSON body otherwise.
+        consts:
+            - fields always sent with the same value. `{}` sends an empty body
+              to an endpoint without parameters.
+        auth:
+            - True: requires an authenticated client. None: must not be authenticated
+              (sign-in endpoints). False: no check.
+        unstable:
+            - the endpoint was never tested; calling it prints a warning.
+        idempotent:
+            - safe to retry. Defaults to GET requests and read-only names.
+        ttl:
+            - seconds a response may be cached by `ResponseCache`. None: not cached.
+        invalidates:
+            - cached endpoints whose responses are dropped after calling this one.
+        items_key:
+            - for paged endpoints, key of the records in a page. An `iter_*` method is generated.
+        custom:
+            - the method is written by hand in `Clubhouse`; only the metadata is used.
+    """
+
+    __slots__ = (
+        "name", "method", "path", "params", "consts", "auth", "unstable", "idempotent",
+        "ttl", "invalidates", "items_key", "doc", "custom"
+    )
+
+    def __init__(self, name, method="POST", params=(), consts=None, path=None, auth=True, unstable=False,
+                 idempotent=None, ttl=None, invalidates=(), items_key=None, doc="", custom=False):
+        """ (Endpoint, str, str, tuple of Param, dict, str, bool, bool, bool, int, tuple of str, str, str, bool) -> NoneType """
+        if not name.isidentifier():
+            raise ValueError(f"Invalid endpoint name: {name}")
+        self.name = name
+        self.method = method
+        self.path = path if path else name
+        self.params = tuple(params)
+        self.consts = consts
+        self.auth = auth
+        self.unstable = unstable
+        if idempotent is None:
+            idempotent = method == "GET" or name == "me" or name.startswith(IDEMPOTENT_PREFIXES)
+        self.idempotent = idempotent
+        self.ttl = ttl
+        self.invalidates = tuple(invalidates)
+        self.items_key = items_key
+        self.doc = doc
+        self.custom = custom
+
+    @property
+    def iterator(self):
+        """ (Endpoint) -> str
+
+        Name of the generated `iter_*` method of a paged endpoint.
+        """
+        name = self.name[4:] if self.name.startswith("get_") else self.name
+        return f"iter_{name}"
+
+    def __repr__(self):
+        return f"Endpoint({self.name}, {self.method} /{self.path})"
+
+
+def _signature(endpoint, namespace):
+    """ (Endpoint, dict) -> str
+
+    Build the argument list of a generated method. Defaults are passed through `namespace`.
+    """
+    args = ["self"]
+    for index, param in enumerate(endpoint.params):
+        if param.default is REQUIRED:
+            args.append(param.name)
+        else:
+            namespace[f"_default{index}"] = param.default
+            args.append(f"{param.name}=_default{index}")
+    return ", ".join(args)
+
+def _docstring(endpoint, returns, doc):
+    """ (Endpoint, str, str) -> str """
+    types = ", ".join(["Clubhouse"] + [param.type_name for param in endpoint.params])
+    return f"({types}) -> {returns}\n\n{doc}"
+
+def _value(param, index, namespace):
+    """ (Param, int, dict) -> str
+
+    Expression of the value sent for a parameter in a generated method.
+    """
+    if param.convert is None:
+        return param.name
+    namespace[f"_convert{index}"] = param.convert
+    return f"_convert{index}({param.name})"
+
+def _body(endpoint, namespace):
+    """ (Endpoint, dict) -> list of str
+
+    Statements of a generated method after the checks: build the query string
+    or the JSON body from pre-built pieces, then send the request.
+    """
+    if endpoint.method == "GET":
+        if not endpoint.params:
+            return [f"return self._request('GET', {endpoint.path!r})"]
+        pieces = []
+        for index, param in enumerate(endpoint.params):
+            # Converters below return values that never need escaping.
+            encode = "str" if param.convert in (int, _bool_int, _bool_str) else "_quote"
+            pieces.append((param, f"{encode}({_value(param, index, namespace)})"))
+        if all(param.default is not None for param, _ in pieces):
+            query = " + ".join(f"{('&' if index else '') + param.key + '='!r} + {piece}" for index, (param, piece) in enumerate(pieces))
+            return [f"return self._request('GET', {endpoint.path!r}, query={query})"]
+        lines = ["query = []"]
+        for param, piece in pieces:
+            if param.default is None:
+                lines.append(f"if {param.name} is not None: query.append({param.key + '='!r} + {piece})")
+            else:
+                lines.append(f"query.append({param.key + '='!r} + {piece})")
+        lines.append(f"return self._request('GET', {endpoint.path!r}, query='&'.join(query))")
+        return lines
+    if not endpoint.params and endpoint.consts is None:
+        return [f"return self._request({endpoint.method!r}, {endpoint.path!r})"]
+    fields = [f"{param.key!r}: {_value(param, index, namespace)}" for index, param in enumerate(endpoint.params)]
+    fields += [f"{key!r}: {value!r}" for key, value in (endpoint.consts or {}).items()]
+    return [f"return self._request({endpoint.method!r}, {endpoint.path!r}, json={{{', '.join(fields)}}})"]
+
+def make_method(endpoint):
+    """ (Endpoint) -> function
+
+    Generate the request method of an endpoint. The source is compiled once,
+    so a call costs no more than a hand-written method.
+    """
+    namespace = {"_endpoint": endpoint, "_quote": quote_value}
+    lines = [f"def {endpoint.name}({_signature(endpoint, namespace)}):"]
+    if endpoint.auth is not False or endpoint.unstable:
+        lines.append("    self._check(_endpoint)")
+    lines += [f"    {line}" for line in _body(endpoint, namespace)]
+    exec("\n".join(lines) + "\n", namespace) # pylint: disable=exec-used
+    method = namespace[endpoint.name]
+    method.__doc__ = _docstring(endpoint, "dict", endpoint.doc)
+    return method
+
+def make_iterator(endpoint):
+    """ (Endpoint) -> function
+
+    Generate the `iter_*` method of a paged endpoint.
+    """
+    namespace = {"_endpoint": endpoint}
+    names = [param.name for param in endpoint.params if param.name not in ("page", "page_size")]
+    kwargs = "".join(f", {name}={name}" for name in names)
+    source = (
+        f"def {endpoint.iterator}({_signature(endpoint, namespace)}):\n"
+        f"    self._check(_endpoint)\n"
+        f"    return self._paginate(self.{endpoint.name}, {endpoint.items_key!r}, page, page_size{kwargs})\n"
+    )
+    exec(source, namespace) # pylint: disable=exec-used
+    method = namespace[endpoint.iterator]
+    method.__doc__ = _docstring(
+        endpoint, "generator of dict",
+        f"Iterate over the `{endpoint.items_key}` of `{endpoint.name}()`.\n"
+        "Pages are fetched lazily, one page ahead of the consumer."
+    )
+    return method
+
+class _Generated:
+    """
+    Placeholder of a generated method in the class it is installed in.
+    The method is compiled on first access and replaces the placeholder,
+    so importing the client compiles nothing.
+    """
+
+    __slots__ = ("cls", "name", "endpoint", "factory")
+
+    def __init__(self, cls, name, endpoint, factory):
+        """ (_Generated, type, str, Endpoint, callable) -> NoneType """
+        self.cls = cls
+        self.name = name
+        self.endpoint = endpoint
+        self.factory = factory
+
+    def __get__(self, instance, owner=None):
+        method = self.factory(self.endpoint)
+        method.__qualname__ = f"{self.cls.__name__}.{self.name}"
+        method.__module__ = self.cls.__module__
+        # Threads racing here set equivalent functions; either one may stay.
+        setattr(self.cls, self.name, method)
+        return method if instance is None else method.__get__(instance, owner)
+
+def install(cls):
+    """ (type) -> type
+
+    Add the methods of every endpoint to `cls`. They are generated on first use.
+    """
+    for endpoint in ENDPOINTS.values():
+        if endpoint.custom:
+            continue
+        methods = [(endpoint.name, make_method)]
+        if endpoint.items_key:
+            methods.append((endpoint.iterator, make_iterator))
+        for name, factory in methods:
+            if name in cls.__dict__:
+                raise Exception(f"{cls.__name__}.{name} is already defined")
+            setattr(cls, name, _Generated(cls, name, endpoint, factory))
+    return cls
+
+def is_idempotent(method, endpoint):
+    """ (str, str) -> bool
+
+    True for requests that can be sent twice without side effects,
+    as declared in the table, or guessed from the name for unknown endpoints.
+    """
+    spec = ENDPOINTS.get(endpoint)
+    if spec is not None:
+        return spec.idempotent
+    return method == "GET" or endpoint.startswith(IDEMPOTENT_PREFIXES)
+
+def cache_ttls():
+    """ () -> dict
+
+    {endpoint: seconds} of every cacheable endpoint.
+    """
+    return {endpoint.path: endpoint.ttl for endpoint in ENDPOINTS.values() if endpoint.ttl}
+
+def secret_keys():
+    """ () -> frozenset of str
+
+    Wire keys of every secret parameter.
+    """
+    return frozenset(param.key for endpoint in ENDPOINTS.values() for param in endpoint.params if param.secret)
+
+def cache_invalidations():
+    """ () -> dict
+
+    {mutating endpoint: (cached endpoints, ...)} of every endpoint that changes cached data.
+    """
+    return {endpoint.path: endpoint.invalidates for endpoint in ENDPOINTS.values() if endpoint.invalidates}
+
+
+# Shared parameters
+USER_ID = Param("user_id", "int", convert=int)
+CHANNEL = Param("channel", "str")
+CHANNEL_ID = Param("channel_id", "int", None)
+CLUB_ID = Param("club_id", "int", convert=int)
+TOPIC_ID = Param("topic_id", "int", convert=int)
+SOURCE_TOPIC_ID = Param("source_topic_id", "int", None)
+PHONE_NUMBER = Param("phone_number", "str", secret=True)
+EMAIL = Param("email", secret=True)
+PAGE = Param("page", "int", 1)
+CHANNEL_INVITE_ID = Param("channel_invite_id", "int")
+
+def _page_size(default):
+    """ (int) -> Param """
+    return Param("page_size", "int", default)
+
+_EVENT = (Param("club_id", "int", None), Param("is_member_only", "bool", False), Param("event_hashid", "int", None))
+_EVENT_DETAILS = (Param("description", "str", None), Param("time_start_epoch", "int", None), Param("name", "str", None))
+_EVENT_EDIT = (Param("name"), Param("time_start_epoch", "int"), Param("description"), Param("event_id", "int", None, _int_or_none), Param("user_ids", "list", ())) + _EVENT
+_PROFILE = ("get_profile", "me")
+_CLUB = ("get_club",)
+_CONTACTS = (Param("upload_contacts", "bool", True), Param("contacts", "list of dict", ()))
+_SEARCH = (Param("query"), Param("followers_only", "bool", False), Param("following_only", "bool", False), Param("cofollows_only", "bool", False))
+
+ENDPOINTS = {endpoint.name: endpoint for endpoint in (
+    # Authentication
+    Endpoint("start_phone_number_auth", params=(PHONE_NUMBER,), auth=None, doc="Begin phone number authentication."),
+    Endpoint("call_phone_number_auth", params=(PHONE_NUMBER,), auth=None, unstable=True, doc="Call the person and send verification message."),
+    Endpoint("resend_phone_number_auth", params=(PHONE_NUMBER,), auth=None, unstable=True, doc="Resend the verification message"),
+    Endpoint("complete_phone_number_auth", params=(PHONE_NUMBER, Param("verification_code", secret=True)), auth=None,
+             doc="Complete phone number authentication.\nThis should return `auth_token`, `access_token`, `refresh_token`, is_waitlisted, ..."),
+    Endpoint("check_for_update", "GET", (Param("is_testflight", "bool", False, _bool_int),), auth=False, ttl=3600, doc="Check for app updates."),
+    Endpoint("get_release_notes", ttl=3600, doc="Get release notes."),
+    # Never cached, like `me`: the CLI decides whether to go on from them.
+    Endpoint("check_waitlist_status", doc="Check whether you're still on a waitlist or not."),
+    Endpoint("refresh_token", params=(Param("refresh_token", key="refresh", secret=True),), doc="Refresh the JWT token. returns both access and refresh token."),
+
+    # Account
+    Endpoint("add_email", params=(EMAIL,), doc="Request for email verification.\nYou only need to do this once."),
+    Endpoint("update_photo", invalidates=_PROFILE, custom=True),
+    Endpoint("update_username", params=(Param("username"),), invalidates=_PROFILE,
+             doc="Change username. YOU HAVE LIMITED NUMBER OF TRIALS TO CHANGE YOUR USERNAME."),
+    Endpoint("update_name", params=(Param("name"),), invalidates=_PROFILE,
+             doc="Change your legal name. Be careful of what you're trying to enter.\n    (1) Upon registration\n    (2) Changing your legal name. YOU CAN ONLY DO THIS ONCE."),
+    Endpoint("update_displayname", params=(Param("name"),), path="update_name", invalidates=_PROFILE,
+             doc="Change your nickname. YOU CAN ONLY DO THIS ONCE."),
+    Endpoint("update_twitter_username", params=(Param("username"), Param("twitter_token", secret=True), Param("twitter_secret", secret=True)), unstable=True, invalidates=_PROFILE,
+             doc="Change Twitter username based on Twitter Token."),
+    Endpoint("update_instagram_username", params=(Param("code", secret=True),), unstable=True, invalidates=_PROFILE,
+             doc="Change Instagram username based on Instagram token."),
+    Endpoint("update_bio", params=(Param("bio"),), invalidates=_PROFILE, doc="Update bio on your profile"),
+    Endpoint("update_skintone", invalidates=_PROFILE, custom=True),
+    Endpoint("record_action_trails", params=(Param("action_trails", "list of dict", ()),),
+             doc="Recording actions of the user interactions while using the app.\naction_trails: [{\"blob_data\":{}, \"trail_type\": \"...\", ...}, ...]"),
+    Endpoint("add_user_topic", params=(Param("club_id", "int", None, _int_or_none), Param("topic_id", "int", None, _int_or_none)), invalidates=_PROFILE + ("get_topic",),
+             doc="Add user's interest.\n\nSome interesting flags for Language has been shared in the following link.\nReference: https://github.com/grishka/Houseclub/issues/24"),
+    Endpoint("remove_user_topic", params=(Param("club_id", "int", convert=_int_or_none), Param("topic_id", "int", convert=_int_or_none)), invalidates=_PROFILE + ("get_topic",),
+             doc="Remove user's interest"),
+    Endpoint("get_settings", "GET", doc="Receive user's settings."),
+    Endpoint("me", params=(Param("return_blocked_ids", "bool", False), Param("timezone_identifier", "str", "Asia/Tokyo"), Param("return_following_ids", "bool", False)),
+             doc="Get my information"),
+
+    # Users
+    Endpoint("follow", params=(USER_ID, Param("user_ids", "list", None), Param("source", "int", 4), SOURCE_TOPIC_ID), invalidates=_PROFILE,
+             doc="Follow a user.\nDifferent value for `source` may require different parameters to be set"),
+    Endpoint("unfollow", params=(USER_ID,), invalidates=_PROFILE, doc="Unfollow a user."),
+    Endpoint("block", params=(USER_ID,), invalidates=_PROFILE, doc="Block a user."),
+    Endpoint("unblock", params=(USER_ID,), invalidates=_PROFILE, doc="Unblock a user."),
+    Endpoint("follow_multiple", params=(Param("user_ids", "list"), Param("user_id", "int", None), Param("source", "int", 7), SOURCE_TOPIC_ID), invalidates=_PROFILE,
+             doc="Follow multiple users at once.\nDifferent value for `source` may require different parameters to be set"),
+    Endpoint("update_follow_notifications", params=(USER_ID, Param("notification_type", "int", 2, int)), invalidates=_PROFILE,
+             doc="Update notification frequency for the given user.\n1 = Always notify, 2 = Sometimes, 3 = Never"),
+    Endpoint("get_profile", params=(USER_ID,), ttl=60, doc="Lookup someone else's profile. It is OK to one's own profile with this method."),
+    Endpoint("get_following", "GET", (Param("user_id", "int"), _page_size(50), PAGE), items_key="users", doc="Get users followed by the given user_id."),
+    Endpoint("get_followers", "GET", (Param("user_id", "int"), _page_size(50), PAGE), items_key="users", doc="Get followers of the given user_id."),
+    Endpoint("get_mutual_follows", "GET", (Param("user_id", "int"), _page_size(50), PAGE), items_key="users",
+             doc="Get mutual followers between the current user and the given user_id."),
+    Endpoint("get_suggested_follows_similar", params=(USER_ID,), doc="Get similar users based on the given user."),
+    Endpoint("get_suggested_follows_friends_only", params=(Param("club_id", "int", None),) + _CONTACTS,
+             doc="Get users based on the phone number.\nOnly seems to be used upon signup."),
+    Endpoint("get_suggested_follows_all", "GET", (Param("in_onboarding", "bool", True, _bool_str), _page_size(50), PAGE), items_key="users",
+             doc="Get all suggested follows."),
+    Endpoint("ignore_suggested_follow", params=(USER_ID,), doc="Remove user_id from the suggested follow list."),
+    Endpoint("search_users", params=_SEARCH, doc="Search users based on the given query."),
+    Endpoint("get_online_friends", consts={}, doc="List all online friends."),
+    Endpoint("invite_to_app", params=(Param("name"), PHONE_NUMBER, Param("message", "str", None)),
+             doc="Invite users to app. but this only works when you have a leftover invitation."),
+    Endpoint("invite_from_waitlist", params=(USER_ID,),
+             doc="Invite someone from the waitlist.\nThis is much more reliable than inviting someone by invite_to_app"),
+    Endpoint("get_suggested_invites", params=(Param("club_id", "int", None),) + _CONTACTS,
+             doc="Get invitations and user lists based on phone number.\n\ncontacts(dict)\n    - example: [{\"name\": \"Test Name\", \"phone_number\": \"+821043219876\"}, ...]"),
+    Endpoint("get_suggested_club_invites", params=_CONTACTS,
+             doc="Get user lists based on phone number. For inviting clubs.\n\ncontacts(dict)\n    - example: [{\"name\": \"Test Name\", \"phone_number\": \"+821043219876\"}, ...]"),
+    Endpoint("report_incident", params=(USER_ID, CHANNEL, Param("incident_type", "unknown"), Param("incident_description"), EMAIL), unstable=True,
+             doc="Report incident\nThere seemed to be a field for attachment, need to trace this later"),
+
+    # Events
+    Endpoint("get_event", params=(Param("event_id", "int", None, _int_or_none), Param("user_ids", "list", None)) + _EVENT + _EVENT_DETAILS,
+             doc="Get details about the event"),
+    Endpoint("create_event", params=_EVENT_EDIT, doc="Create a new event"),
+    Endpoint("edit_event", params=_EVENT_EDIT, doc="Edit an event."),
+    Endpoint("delete_event", params=(Param("event_id", "int", convert=_int_or_none), Param("user_ids", "list", None)) + _EVENT + _EVENT_DETAILS,
+             doc="Delete event."),
+    Endpoint("get_events", "GET", (Param("is_filtered", "bool", True, _bool_str), _page_size(25), PAGE), items_key="events",
+             doc="Get list of upcoming events with details."),
+    Endpoint("get_events_to_start", "GET", unstable=True, doc="Get events to start"),
+
+    # Channels
+    Endpoint("get_channels", "GET", doc="Get list of channels, based on the server's channel selection algorithm"),
+    Endpoint("get_channel", params=(CHANNEL, CHANNEL_ID), doc="Get information of the given channel"),
+    Endpoint("get_welcome_channel", "GET", doc="Seems to be called upon sign up. Does not seem to return much data."),
+    Endpoint("reject_welcome_channel", "GET", unstable=True, doc="Unknown"),
+    Endpoint("create_channel", params=(Param("topic", "str", ""), Param("user_ids", "list", ()), Param("is_private", "bool", False), Param("is_social_mode", "bool", False)),
+             consts={"club_id": None, "event_id": None}, doc="Create a new channel. Type of the room can be changed"),
+    Endpoint("get_create_channel_targets", consts={}, doc="Not sure what this does. Triggered upon channel creation"),
+    Endpoint("join_channel", params=(CHANNEL, Param("attribution_source", "str", "feed"), Param("attribution_details", "str", "eyJpc19leHBsb3JlIjpmYWxzZSwicmFuayI6MX0=")),
+             doc="Join the given channel.\n`attribution_details` is base64-encoded JSON."),
+    Endpoint("leave_channel", params=(CHANNEL,), consts={"channel_id": None}, doc="Leave the given channel"),
+    Endpoint("active_ping", params=(CHANNEL,), consts={"channel_id": None}, doc="Keeping the user active while being in a chatroom"),
+    Endpoint("hide_channel", params=(CHANNEL, Param("hide", "bool", True)), doc="Hide/unhide the channel from the channel list."),
+    Endpoint("make_channel_public", params=(CHANNEL, CHANNEL_ID), doc="Make the current channel open to public.\nEveryone can join the channel."),
+    Endpoint("make_channel_social", params=(CHANNEL, CHANNEL_ID),
+             doc="Make the current channel open to public.\nOnly people who user follows can join the channel."),
+    Endpoint("end_channel", params=(CHANNEL, CHANNEL_ID), doc="Kick everyone and close the channel. Requires moderator privilege."),
+    Endpoint("update_channel_flags", params=(CHANNEL, Param("visibility", "bool"), Param("flag_title", "unknown"), Param("unflag_title", "unknown")), unstable=True,
+             doc="Unknown"),
+    Endpoint("audience_reply", params=(CHANNEL, Param("raise_hands", "bool", True), Param("unraise_hands", "bool", False)), doc="Request for raise_hands."),
+    Endpoint("change_handraise_settings", custom=True),
+    Endpoint("make_moderator", params=(CHANNEL, USER_ID), doc="Make the given user moderator. Requires moderator privilege."),
+    Endpoint("block_from_channel", params=(CHANNEL, USER_ID), doc="Remove the user from the channel. The user will not be able to re-join."),
+    Endpoint("accept_speaker_invite", params=(CHANNEL, USER_ID),
+             doc="Accept speaker's invitation, based on the (channel, invited_moderator)\n`raise_hands` needs to be called first, prior to the invitation."),
+    Endpoint("reject_speaker_invite", params=(CHANNEL, USER_ID), doc="Reject speaker's invitation."),
+    Endpoint("invite_speaker", params=(CHANNEL, USER_ID), doc="Move audience to speaker. Requires moderator privilege."),
+    Endpoint("uninvite_speaker", params=(CHANNEL, USER_ID), doc="Move speaker to audience. Requires moderator privilege."),
+    Endpoint("mute_speaker", params=(CHANNEL, USER_ID), doc="Mute speaker. Requires moderator privilege"),
+    Endpoint("get_suggested_speakers", params=(CHANNEL,), doc="Get suggested speakers from the given channel"),
+    Endpoint("invite_to_existing_channel", params=(CHANNEL, USER_ID),
+             doc="Invite someone to a currently joined channel.\nIt will send a ping notification to the given user_id."),
+    Endpoint("invite_to_new_channel", params=(USER_ID, CHANNEL), unstable=True, doc="Invite someone to the channel"),
+    Endpoint("accept_new_channel_invite", params=(CHANNEL_INVITE_ID,), unstable=True, doc="Accept Channel Invitation"),
+    Endpoint("reject_new_channel_invite", params=(CHANNEL_INVITE_ID,), unstable=True, doc="Reject Channel Invitation"),
+    Endpoint("cancel_new_channel_invite", params=(CHANNEL_INVITE_ID,), unstable=True, doc="Cancel Channel Invitation"),
+
+    # Notifications
+    Endpoint("get_notifications", "GET", (_page_size(20), PAGE), items_key="notifications", doc="Get my notifications."),
+    Endpoint("get_actionable_notifications", "GET", doc="Get notifications. This may return some notifications that require some actions"),
+    Endpoint("ignore_actionable_notification", params=(Param("actionable_notification_id", "int"),), unstable=True, doc="Ignore the actionable notification."),
+
+    # Topics
+    Endpoint("get_all_topics", "GET", ttl=3600, doc="Get list of topics, based on the server's channel selection algorithm"),
+    Endpoint("get_topic", params=(TOPIC_ID,), ttl=3600, doc="Get topic's information based on the given topic id."),
+    Endpoint("get_clubs_for_topic", "GET", (Param("topic_id", "int"), _page_size(25), PAGE), items_key="clubs",
+             doc="Get list of clubs based on the given topic id."),
+    Endpoint("get_users_for_topic", "GET", (Param("topic_id", "int"), _page_size(25), PAGE), items_key="users",
+             doc="Get list of users based on the given topic id."),
+
+    # Clubs
+    Endpoint("get_club", params=(CLUB_ID, SOURCE_TOPIC_ID), ttl=300, doc="Get the information about the given club_id."),
+    Endpoint("get_club_members", "GET", (Param("club_id", "int"), Param("return_followers", "bool", False, _bool_int), Param("return_members", "bool", True, _bool_int), _page_size(50), PAGE),
+             items_key="users", doc="Get list of members on the given club_id."),
+    Endpoint("get_clubs", params=(Param("is_startable_only", "bool"),), doc="Get list of clubs the user's in."),
+    Endpoint("search_clubs", params=_SEARCH, doc="Search clubs based on the given query."),
+    Endpoint("follow_club", params=(CLUB_ID, SOURCE_TOPIC_ID), invalidates=_CLUB, doc="Follow a club"),
+    Endpoint("unfollow_club", params=(CLUB_ID, SOURCE_TOPIC_ID), invalidates=_CLUB, doc="Unfollow a club"),
+    Endpoint("add_club_admin", params=(CLUB_ID, USER_ID), unstable=True, invalidates=_CLUB, doc="Add Club Admin. Requires privilege."),
+    Endpoint("remove_club_admin", params=(Param("club_id", "int", convert=_int_or_none), USER_ID), unstable=True, invalidates=_CLUB,
+             doc="Remove Club admin. Requires privilege."),
+    Endpoint("add_club_member", params=(CLUB_ID, USER_ID, Param("name"), PHONE_NUMBER, Param("message"), Param("reason", "unknown")), unstable=True, invalidates=_CLUB,
+             doc="Add club member"),
+    Endpoint("remove_club_member", params=(Param("club_id", "int", convert=_int_or_none), USER_ID), unstable=True, invalidates=_CLUB,
+             doc="Remove Club member. Requires privilege."),
+    Endpoint("accept_club_member_invite", params=(Param("club_id", "int", convert=_int_or_none), SOURCE_TOPIC_ID), unstable=True, invalidates=_CLUB,
+             doc="Accept Club member invite."),
+    Endpoint("get_club_nominations", params=(CLUB_ID, Param("source_topic_id", "int")), unstable=True, doc="Get club nomination list"),
+    Endpoint("approve_club_nomination", params=(CLUB_ID, Param("source_topic_id", "int"), Param("invite_nomination_id", "int")), unstable=True,
+             doc="Approve club nomination"),
+    Endpoint("reject_club_nomination", params=(CLUB_ID, Param("source_topic_id", "int"), Param("invite_nomination_id", "int")), unstable=True,
+             doc="Reject club nomination"),
+    Endpoint("add_club_topic", params=(CLUB_ID, TOPIC_ID), unstable=True, invalidates=_CLUB + ("get_topic",), doc="Add club topic"),
+    Endpoint("remove_club_topic", params=(CLUB_ID, TOPIC_ID), unstable=True, invalidates=_CLUB + ("get_topic",), doc="Remove club topic"),
+    Endpoint("update_is_follow_allowed", params=(CLUB_ID, Param("is_follow_allowed", "bool", True)), unstable=True, invalidates=_CLUB,
+             doc="Update follow button of the given Club"),
+    Endpoint("update_is_membership_private", params=(CLUB_ID, Param("is_membership_private", "bool")), unstable=True, invalidates=_CLUB,
+             doc="Update membership status of the given Club"),
+    Endpoint("update_is_community", params=(CLUB_ID, Param("is_community", "bool")), unstable=True, invalidates=_CLUB,
+             doc="Update community stat of the given Club"),
+    Endpoint("update_club_description", params=(CLUB_ID, Param("description")), unstable=True, invalidates=_CLUB,
+             doc="Update description of the given Club"),
+)}
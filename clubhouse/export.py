@@ -0,0 +1,343 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+export.py
+
+Streaming exporter of the follow graph around a set of seed users.
+Edges are written to numbered chunk files (gzipped NDJSON or CSV, or Parquet),
+and a checkpoint file records the pages already in finished chunks,
+so an interrupted export resumes where it stopped without duplicating edges.
+Memory stays flat: only a few pages and one chunk writer are alive at once.
+
+>>> exporter = GraphExporter(clubhouse, "graph/", relations=("followers", "following"))
+>>> exporter.run([1665037778, 4])
+{'edges': 123456, 'pages': 1235, 'chunks': 2}
+"""
+
+import os
+import csv
+import gzip
+import json
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from .paging import _next_page
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+RELATIONS = {
+    "followers": "get_followers",
+    "following": "get_following",
+    "mutual_follows": "get_mutual_follows",
+}
+
+FIELDS = ("seed", "relation", "user_id", "username", "name")
+
+
+class ChunkWriter:
+    """
+    ChunkWriter Class
+
+    Writes one chunk to a temporary file, renamed to its final name on `close()`,
+    so a chunk file either is complete or does not exist.
+    """
+
+    EXTENSION = ""
+
+    def __init__(self, path):
+        """ (ChunkWriter, str) -> NoneType """
+        self.path = path
+        self.temp_path = path + ".tmp"
+        self.rows = 0
+
+    def write(self, rows):
+        """ (ChunkWriter, list of dict) -> NoneType """
+        raise NotImplementedError("Not Implemented!")
+
+    def _close(self):
+        """ (ChunkWriter) -> NoneType """
+        raise NotImplementedError("Not Implemented!")
+
+    def close(self):
+        """ (ChunkWriter) -> NoneType """
+        self._close()
+        os.replace(self.temp_path, self.path)
+
+
+class NdjsonChunkWriter(ChunkWriter):
+    """ Gzipped newline-delimited JSON, one edge per line. """
+
+    EXTENSION = ".ndjson.gz"
+
+    def __init__(self, path):
+        """ (NdjsonChunkWriter, str) -> NoneType """
+        super().__init__(path)
+        self._file = gzip.open(self.temp_path, "wt", encoding="utf-8")
+        self._encoder = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+    def write(self, rows):
+        """ (NdjsonChunkWriter, list of dict) -> NoneType """
+        encode = self._encoder.encode
+        self._file.writelines(encode(row) + "\n" for row in rows)
+        self.rows += len(rows)
+
+    def _close(self):
+        """ (NdjsonChunkWriter) -> NoneType """
+        self._file.close()
+
+
+class CsvChunkWriter(ChunkWriter):
+    """ Gzipped CSV with a header line. """
+
+    EXTENSION = ".csv.gz"
+
+    def __init__(self, path):
+        """ (CsvChunkWriter, str) -> NoneType """
+        super().__init__(path)
+        self._file = gzip.open(self.temp_path, "wt", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, FIELDS, extrasaction="ignore")
+        self._writer.writeheader()
+
+    def write(self, rows):
+        """ (CsvChunkWriter, list of dict) -> NoneType """
+        self._writer.writerows(rows)
+        self.rows += len(rows)
+
+    def _close(self):
+        """ (CsvChunkWriter) -> NoneType """
+        self._file.close()
+
+
+class ParquetChunkWriter(ChunkWriter):
+    """ Parquet file. Parquet is columnar, so the rows of a chunk are buffered until `close()`. """
+
+    EXTENSION = ".parquet"
+
+    def __init__(self, path):
+        """ (ParquetChunkWriter, str) -> NoneType """
+        if pyarrow is None:
+            raise ImportError("pyarrow is required for Parquet exports. (pip3 install pyarrow)")
+        super().__init__(path)
+        self._columns = {field: [] for field in FIELDS}
+
+    def write(self, rows):
+        """ (ParquetChunkWriter, list of dict) -> NoneType """
+        for field, column in self._columns.items():
+            column.extend(row.get(field) for row in rows)
+        self.rows += len(rows)
+
+    def _close(self):
+        """ (ParquetChunkWriter) -> NoneType """
+        pyarrow.parquet.write_table(pyarrow.table(self._columns), self.temp_path)
+        self._columns = None
+
+WRITERS = {
+    "ndjson": NdjsonChunkWriter,
+    "csv": CsvChunkWriter,
+    "parquet": ParquetChunkWriter,
+}
+
+
+class Checkpoint:
+    """
+    Checkpoint Class
+
+    Progress of an export: the next page of every (relation, seed) pair,
+    None once the pair is complete. Saved atomically as JSON.
+    """
+
+    def __init__(self, path):
+        """ (Checkpoint, str) -> NoneType """
+        self.path = path
+        self.chunks = 0
+        self.edges = 0
+        self.units = {}
+        if os.path.exists(path):
+            with open(path) as checkpoint_file:
+                data = json.load(checkpoint_file)
+            self.chunks = data.get("chunks", 0)
+            self.edges = data.get("edges", 0)
+            self.units = data.get("units", {})
+
+    @staticmethod
+    def key(relation, seed):
+        """ (str, int) -> str """
+        return f"{relation}:{seed}"
+
+    def next_page(self, relation, seed):
+        """ (Checkpoint, str, int) -> int
+
+        Return the page to resume from, or None when the pair is complete.
+        """
+        return self.units.get(self.key(relation, seed), 1)
+
+    def save(self):
+        """ (Checkpoint) -> NoneType """
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w") as checkpoint_file:
+            json.dump({"chunks": self.chunks, "edges": self.edges, "units": self.units}, checkpoint_file)
+        os.replace(temp_path, self.path)
+
+
+class GraphExporter:
+    """
+    GraphExporter Class
+
+    Export the followers/following/mutual follows of seed users.
+
+        client:
+            - authenticated `Clubhouse` instance.
+        directory:
+            - output directory of the chunks and of the checkpoint.
+        relations:
+            - any of "followers", "following", "mutual_follows".
+        output_format:
+            - "ndjson" (gzipped), "csv" (gzipped) or "parquet" (needs pyarrow).
+        page_size:
+            - users per request.
+        max_workers:
+            - seeds fetched at once. Pages of one seed are fetched in order.
+        chunk_size:
+            - edges per chunk file. A chunk is the unit of progress: an interrupted
+              export loses at most the pages of the chunk being written.
+        checkpoint:
+            - checkpoint path, `<directory>/checkpoint.json` by default.
+    """
+
+    def __init__(self, client, directory, relations=("followers", "following"), output_format="ndjson",
+                 page_size=100, max_workers=4, chunk_size=100000, checkpoint=None, prefix="edges"):
+        """ (GraphExporter, Clubhouse, str, tuple of str, str, int, int, int, str, str) -> NoneType """
+        for relation in relations:
+            if relation not in RELATIONS:
+                raise ValueError(f"Unknown relation: {relation}")
+        if output_format not in WRITERS:
+            raise ValueError(f"Unknown output format: {output_format}")
+        self.client = client
+        self.directory = directory
+        self.relations = tuple(relations)
+        self.writer_class = WRITERS[output_format]
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.prefix = prefix
+        self.checkpoint_path = checkpoint if checkpoint else os.path.join(directory, "checkpoint.json")
+        self.checkpoint = None
+        self._writer = None
+        self._pending = {}
+        self._pages = 0
+
+    def _chunk_path(self, index):
+        """ (GraphExporter, int) -> str """
+        return os.path.join(self.directory, f"{self.prefix}-{index:05d}{self.writer_class.EXTENSION}")
+
+    def _fetch(self, relation, seed, page, out, abort):
+        """ (GraphExporter, str, int, int, queue.Queue, threading.Event) -> NoneType
+
+        Fetch the pages of one (relation, seed) pair from `page` on and queue them.
+        Blocks while the writer is behind, so memory stays bounded.
+        """
+        method = getattr(self.client, RELATIONS[relation])
+        try:
+            while page is not None and not abort.is_set():
+                result = method(seed, page_size=self.page_size, page=page)
+                users = result.get("users") or []
+                next_page = _next_page(result, users, page, self.page_size)
+                rows = [
+                    {
+                        "seed": seed,
+                        "relation": relation,
+                        "user_id": user.get("user_id"),
+                        "username": user.get("username"),
+                        "name": user.get("name"),
+                    }
+                    for user in users
+                ]
+                self._put(out, abort, (relation, seed, next_page, rows, None))
+                page = next_page
+        except Exception as exc: # pylint: disable=broad-except
+            self._put(out, abort, (relation, seed, page, None, exc))
+
+    @staticmethod
+    def _put(out, abort, item):
+        """ (queue.Queue, threading.Event, tuple) -> NoneType """
+        while not abort.is_set():
+            try:
+                out.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                continue
+
+    def _write(self, relation, seed, next_page, rows):
+        """ (GraphExporter, str, int, int, list of dict) -> NoneType """
+        if rows:
+            if self._writer is None:
+                self._writer = self.writer_class(self._chunk_path(self.checkpoint.chunks))
+            self._writer.write(rows)
+        self._pending[Checkpoint.key(relation, seed)] = next_page
+        self._pages += 1
+        if self._writer is not None and self._writer.rows >= self.chunk_size:
+            self._commit()
+
+    def _commit(self):
+        """ (GraphExporter) -> NoneType
+
+        Finish the current chunk, then record its pages in the checkpoint.
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self.checkpoint.chunks += 1
+            self.checkpoint.edges += self._writer.rows
+            self._writer = None
+        if self._pending:
+            self.checkpoint.units.update(self._pending)
+            self._pending = {}
+            self.checkpoint.save()
+
+    def run(self, seeds):
+        """ (GraphExporter, list of int) -> dict
+
+        Export the relations of every seed, resuming from the checkpoint if there is one.
+        Return the totals of the export so far.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self.checkpoint = Checkpoint(self.checkpoint_path)
+        # Left over by an interrupted run; its pages are fetched again.
+        stale_path = self._chunk_path(self.checkpoint.chunks) + ".tmp"
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+        units = []
+        for seed in dict.fromkeys(int(seed) for seed in seeds):
+            for relation in self.relations:
+                page = self.checkpoint.next_page(relation, seed)
+                if page is not None:
+                    units.append((relation, seed, page))
+
+        out = queue.Queue(maxsize=self.max_workers * 2)
+        abort = threading.Event()
+        remaining = len(units)
+        error = None
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for relation, seed, page in units:
+                executor.submit(self._fetch, relation, seed, page, out, abort)
+            while remaining:
+                relation, seed, next_page, rows, exc = out.get()
+                if exc is not None:
+                    error = exc
+                    break
+                self._write(relation, seed, next_page, rows)
+                if next_page is None:
+                    remaining -= 1
+        finally:
+            abort.set()
+            executor.shutdown(wait=True)
+            # Pages received so far are complete; keep them.
+            self._commit()
+        if error is not None:
+            raise error
+        return {"edges": self.checkpoint.edges, "pages": self._pages, "chunks": self.checkpoint.chunks}
@@ -0,0 +1,143 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+feed.py
+
+Channel feed model that keeps the previous `get_channels()` snapshot
+and computes what changed, so views only redraw the changed rows.
+"""
+
+def channel_row(channel):
+    """ (dict) -> tuple
+
+    What the channel list shows of a channel: (channel, topic, club name,
+    number of speakers, speaker names). Listeners coming and going
+    do not change it.
+    """
+    club = channel.get('club')
+    speakers = ",".join(
+        user["name"] for user in channel["users"] if user['is_speaker'] or user['is_moderator']
+    )
+    return (
+        channel['channel'],
+        channel.get('topic'),
+        club['name'] if club else None,
+        channel.get('num_speakers'),
+        speakers,
+    )
+
+class FeedDiff:
+    """
+    FeedDiff Class
+
+    Result of `ChannelFeed.update()`.
+
+        added:
+            - list of channels that were not in the previous snapshot.
+        changed:
+            - list of channels whose row differs from the previous snapshot.
+        removed:
+            - list of channels that are gone.
+    """
+
+    __slots__ = ("added", "changed", "removed")
+
+    def __init__(self, added=(), changed=(), removed=()):
+        """ (FeedDiff, list, list, list) -> NoneType """
+        self.added = list(added)
+        self.changed = list(changed)
+        self.removed = list(removed)
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed)
+
+    def __len__(self):
+        return len(self.added) + len(self.changed) + len(self.removed)
+
+    def __repr__(self):
+        return "FeedDiff(added={}, changed={}, removed={})".format(
+            len(self.added), len(self.changed), len(self.removed)
+        )
+
+
+class ChannelFeed:
+    """
+    ChannelFeed Class
+
+    Keeps the latest channel list keyed by `channel`, with the row of each channel.
+
+        key:
+            - field identifying a channel.
+        project:
+            - builds the row compared between snapshots (`channel_row` by default).
+              Fields outside of it, such as the listeners, do not make a channel "changed".
+
+    >>> feed = ChannelFeed()
+    >>> diff = feed.update(client.get_channels()['channels'])
+    >>> for channel in diff.added + diff.changed:
+    ...     redraw(channel)
+    """
+
+    def __init__(self, key="channel", project=channel_row):
+        """ (ChannelFeed, str, callable) -> NoneType """
+        self.key = key
+        self.project = project
+        self._channels = {}
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._channels)
+
+    def __iter__(self):
+        return iter(self._channels.values())
+
+    def __contains__(self, channel):
+        return channel in self._channels
+
+    def get(self, channel):
+        """ (ChannelFeed, str) -> dict """
+        return self._channels.get(channel)
+
+    def row(self, channel):
+        """ (ChannelFeed, str) -> tuple
+
+        Row of a channel of the latest snapshot, as built by `project`.
+        """
+        return self._rows.get(channel)
+
+    def update(self, channels):
+        """ (ChannelFeed, list of dict) -> FeedDiff
+
+        Replace the snapshot with `channels` and return the difference.
+        Channels are compared by their rows, so a channel is only "changed"
+        when what is shown of it changed.
+        """
+        key = self.key
+        project = self.project
+        previous = self._rows
+        channels_by_name = {}
+        rows = {}
+        added = []
+        changed = []
+        for channel in channels:
+            name = channel[key]
+            channels_by_name[name] = channel
+            row = rows[name] = project(channel)
+            old = previous.get(name)
+            if old is None:
+                added.append(channel)
+            elif old != row:
+                changed.append(channel)
+        if len(rows) - len(added) == len(previous):
+            removed = []
+        else:
+            removed = [self._channels[name] for name in previous if name not in rows]
+        self._channels = channels_by_name
+        self._rows = rows
+        return FeedDiff(added, changed, removed)
+
+    def clear(self):
+        """ (ChannelFeed) -> NoneType """
+        self._channels = {}
+        self._rows = {}
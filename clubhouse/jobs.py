@@ -0,0 +1,373 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+jobs.py
+
+Durable job queue for long API scans.
+Tasks are stored in SQLite with an idempotency key, so adding a task twice
+is a no-op and a task that completed is never run again. A scan interrupted
+by a crash or Ctrl-C is resumed by running it again: finished tasks are skipped
+and tasks that were running are put back in the queue.
+
+>>> queue = JobQueue("scan.sqlite3")
+>>> for topic_id in (90, 100, 10, 107):
+...     queue.add("topic_users", {"topic_id": topic_id})
+>>> JobRunner(clubhouse, queue, max_workers=4).run()
+{'pending': 0, 'running': 0, 'done': 48, 'failed': 0}
+>>> users = [user for page in queue.results("topic_users") for user in page]
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .paging import _next_page
+from .store import default_cache_path
+
+STATUSES = ("pending", "running", "done", "failed")
+
+def task_key(kind, args):
+    """ (str, dict) -> str
+
+    Default idempotency key: the kind and the arguments of the task.
+    """
+    return json.dumps([kind, args], sort_keys=True, separators=(",", ":"))
+
+
+class Job:
+    """
+    Job Class
+
+    A task being run, passed to its handler.
+    Tasks added with `spawn()` are queued in the same transaction that marks
+    this task done, so a follow-up task is queued exactly once.
+    """
+
+    def __init__(self, client, key, kind, args, attempts):
+        """ (Job, Clubhouse, str, str, dict, int) -> NoneType """
+        self.client = client
+        self.key = key
+        self.kind = kind
+        self.args = args
+        self.attempts = attempts
+        self.children = []
+
+    def spawn(self, kind, args, key=None):
+        """ (Job, str, dict, str) -> NoneType """
+        self.children.append((key if key else task_key(kind, args), kind, args))
+
+    def __repr__(self):
+        return f"Job({self.kind}, {self.args}, attempts={self.attempts})"
+
+
+class JobQueue:
+    """
+    JobQueue Class
+
+    Tasks and their results, stored in a SQLite file.
+
+        path:
+            - location of the database. Defaults to `default_cache_path("jobs.sqlite3")`.
+    """
+
+    def __init__(self, path=None):
+        """ (JobQueue, str) -> NoneType """
+        self.path = path if path else default_cache_path("jobs.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " key TEXT PRIMARY KEY, kind TEXT NOT NULL, args TEXT NOT NULL,"
+            " status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0,"
+            " result TEXT, error TEXT, created REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, created)")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def _insert(self, tasks, now):
+        """ (JobQueue, list of (str, str, dict), float) -> int
+
+        Must be called with the lock held.
+        """
+        cursor = self._db.executemany(
+            "INSERT OR IGNORE INTO tasks (key, kind, args, status, created, updated)"
+            " VALUES (?, ?, ?, 'pending', ?, ?)",
+            [(key, kind, json.dumps(args), now, now) for key, kind, args in tasks]
+        )
+        return cursor.rowcount
+
+    def add(self, kind, args=None, key=None):
+        """ (JobQueue, str, dict, str) -> bool
+
+        Queue a task. Return False if a task with the same key already exists.
+        """
+        args = args if args else {}
+        with self._lock:
+            return self._insert([(key if key else task_key(kind, args), kind, args)], time.time()) > 0
+
+    def claim(self, limit):
+        """ (JobQueue, int) -> list of (str, str, dict, int)
+
+        Mark up to `limit` pending tasks, oldest first, as running and return them.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT key, kind, args, attempts FROM tasks WHERE status = 'pending'"
+                    " ORDER BY created LIMIT ?", (limit,)
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE tasks SET status = 'running', attempts = attempts + 1, updated = ? WHERE key = ?",
+                    [(now, row[0]) for row in rows]
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [(key, kind, json.loads(args), attempts + 1) for key, kind, args, attempts in rows]
+
+    def complete(self, key, result=None, children=()):
+        """ (JobQueue, str, object, list of (str, str, dict)) -> NoneType
+
+        Mark a task done with its result, and queue the tasks it spawned, atomically.
+        """
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.execute(
+                    "UPDATE tasks SET status = 'done', result = ?, error = NULL, updated = ? WHERE key = ?",
+                    (json.dumps(result) if result is not None else None, now, key)
+                )
+                self._insert(children, now)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def fail(self, key, error, retry=True):
+        """ (JobQueue, str, str, bool) -> NoneType
+
+        Record an error, and put the task back in the queue if `retry` is True.
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE tasks SET status = ?, error = ?, updated = ? WHERE key = ?",
+                ("pending" if retry else "failed", error, time.time(), key)
+            )
+
+    def recover(self):
+        """ (JobQueue) -> int
+
+        Put tasks left running by an interrupted run back in the queue.
+        Their handler may have run partly, so handlers should be safe to run twice.
+        """
+        with self._lock:
+            return self._db.execute(
+                "UPDATE tasks SET status = 'pending', updated = ? WHERE status = 'running'", (time.time(),)
+            ).rowcount
+
+    def retry_failed(self, kind=None):
+        """ (JobQueue, str) -> int
+
+        Queue failed tasks again, with a fresh attempt count.
+        """
+        sql = "UPDATE tasks SET status = 'pending', attempts = 0, updated = ? WHERE status = 'failed'"
+        params = (time.time(),)
+        if kind is not None:
+            sql += " AND kind = ?"
+            params += (kind,)
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def counts(self, kind=None):
+        """ (JobQueue, str) -> dict
+
+        Return the number of tasks per status.
+        """
+        sql = "SELECT status, COUNT(*) FROM tasks"
+        params = ()
+        if kind is not None:
+            sql += " WHERE kind = ?"
+            params = (kind,)
+        with self._lock:
+            rows = dict(self._db.execute(sql + " GROUP BY status", params).fetchall())
+        return {status: rows.get(status, 0) for status in STATUSES}
+
+    def status(self, key):
+        """ (JobQueue, str) -> dict
+
+        Return the status, attempts and last error of a task, or None if it does not exist.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT kind, args, status, attempts, error FROM tasks WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        kind, args, status, attempts, error = row
+        return {"kind": kind, "args": json.loads(args), "status": status, "attempts": attempts, "error": error}
+
+    def failures(self, kind=None):
+        """ (JobQueue, str) -> list of dict """
+        sql = "SELECT key, kind, args, attempts, error FROM tasks WHERE status = 'failed'"
+        params = ()
+        if kind is not None:
+            sql += " AND kind = ?"
+            params = (kind,)
+        with self._lock:
+            rows = self._db.execute(sql + " ORDER BY created", params).fetchall()
+        return [
+            {"key": key, "kind": kind, "args": json.loads(args), "attempts": attempts, "error": error}
+            for key, kind, args, attempts, error in rows
+        ]
+
+    def results(self, kind=None, batch_size=500):
+        """ (JobQueue, str, int) -> generator
+
+        Yield the results of finished tasks, in the order the tasks were queued.
+        Rows are read in batches, so large scans are not loaded at once.
+        """
+        sql = "SELECT rowid, result FROM tasks WHERE status = 'done' AND result IS NOT NULL AND rowid > ?"
+        params = ()
+        if kind is not None:
+            sql += " AND kind = ?"
+            params = (kind,)
+        sql += " ORDER BY rowid LIMIT ?"
+        last = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(sql, (last,) + params + (batch_size,)).fetchall()
+            for last, result in rows:
+                yield json.loads(result)
+            if len(rows) < batch_size:
+                return
+
+    def close(self):
+        """ (JobQueue) -> NoneType """
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def paged(method, items_key):
+    """ (str, str) -> callable
+
+    Build a handler fetching one page of a paged endpoint, e.g. `paged("get_club_members", "users")`.
+    The task arguments are passed to `method`; the next page is spawned as a task of its own,
+    so an interrupted scan resumes at the page where it stopped. The result is the page's items.
+    """
+    def handler(job):
+        page = job.args.get("page", 1)
+        page_size = job.args.get("page_size", 25)
+        result = getattr(job.client, method)(**dict(job.args, page=page, page_size=page_size))
+        items = result.get(items_key) or []
+        next_page = _next_page(result, items, page, page_size)
+        if next_page is not None:
+            job.spawn(job.kind, dict(job.args, page=next_page))
+        return items
+    handler.__name__ = f"paged_{method}"
+    return handler
+
+HANDLERS = {
+    "topic_users": paged("get_users_for_topic", "users"),
+    "topic_clubs": paged("get_clubs_for_topic", "clubs"),
+    "club_members": paged("get_club_members", "users"),
+    "events": paged("get_events", "events"),
+}
+
+
+class JobRunner:
+    """
+    JobRunner Class
+
+    Run the tasks of a `JobQueue` on a bounded pool of threads until none is left.
+
+        client:
+            - authenticated `Clubhouse` instance, available to handlers as `job.client`.
+              Pass a `RateLimiter` to the client to pace the requests.
+        handlers:
+            - {kind: handler(job) -> result}. The result must be JSON serializable.
+              Defaults to `HANDLERS`, extended by the given ones.
+        max_workers:
+            - tasks run at once.
+        max_attempts:
+            - runs of a task before it is marked failed.
+    """
+
+    def __init__(self, client, queue, handlers=None, max_workers=4, max_attempts=3):
+        """ (JobRunner, Clubhouse, JobQueue, dict, int, int) -> NoneType """
+        self.client = client
+        self.queue = queue
+        self.handlers = dict(HANDLERS)
+        self.handlers.update(handlers or {})
+        self.max_workers = max_workers
+        self.max_attempts = max_attempts
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """ (JobRunner) -> NoneType
+
+        Stop claiming tasks. Tasks in progress are finished first.
+        """
+        self._stopped.set()
+
+    def _run_task(self, job):
+        """ (JobRunner, Job) -> object """
+        handler = self.handlers.get(job.kind)
+        if handler is None:
+            raise Exception(f"No handler for task kind: {job.kind}")
+        return handler(job)
+
+    def _finish(self, job, future):
+        """ (JobRunner, Job, Future) -> NoneType """
+        error = future.exception()
+        if error is None:
+            self.queue.complete(job.key, future.result(), job.children)
+        else:
+            self.queue.fail(job.key, f"{type(error).__name__}: {error}", retry=job.attempts < self.max_attempts)
+
+    def run(self):
+        """ (JobRunner) -> dict
+
+        Run until the queue is empty or `stop()` is called, and return the task counts.
+        """
+        self._stopped.clear()
+        self.queue.recover()
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                while True:
+                    if not self._stopped.is_set() and len(running) < self.max_workers:
+                        for key, kind, args, attempts in self.queue.claim(self.max_workers - len(running)):
+                            job = Job(self.client, key, kind, args, attempts)
+                            running[executor.submit(self._run_task, job)] = job
+                    if not running:
+                        break
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(running.pop(future), future)
+            except BaseException:
+                self._stopped.set()
+                for future, job in running.items():
+                    if future.cancel():
+                        self.queue.fail(job.key, "Cancelled")
+                raise
+        return self.queue.counts()
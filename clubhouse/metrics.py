@@ -0,0 +1,238 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+metrics.py
+
+In-process request metrics: per-endpoint latency histograms, bytes in/out,
+status code counts, retries and cache hits. Pass a registry to the client
+to enable them; without one the request path does not touch this module.
+
+>>> metrics = MetricsRegistry()
+>>> clubhouse = Clubhouse(user_id, user_token, user_device, metrics=metrics)
+>>> print(metrics.to_prometheus())
+"""
+
+import time
+import bisect
+import threading
+
+try:
+    from opentelemetry import trace
+except ImportError:
+    trace = None
+
+# Latency buckets in seconds, upper bounds of each histogram bucket.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+class EndpointMetrics:
+    """
+    EndpointMetrics Class
+
+    Counters of a single endpoint. `buckets` holds per-bucket (not cumulative)
+    counts, with one extra slot for requests slower than the last bound.
+    """
+
+    __slots__ = (
+        "buckets", "duration_sum", "count", "bytes_out", "bytes_in",
+        "statuses", "errors", "retries", "cache_hits", "cache_misses", "coalesced",
+    )
+
+    def __init__(self, num_buckets):
+        """ (EndpointMetrics, int) -> NoneType """
+        self.buckets = [0] * (num_buckets + 1)
+        self.duration_sum = 0.0
+        self.count = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.statuses = {}
+        self.errors = 0
+        self.retries = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.coalesced = 0
+
+    def to_dict(self, bounds):
+        """ (EndpointMetrics, tuple of float) -> dict """
+        cache_lookups = self.cache_hits + self.cache_misses
+        return {
+            "count": self.count,
+            "duration_sum": self.duration_sum,
+            "histogram": dict(zip(bounds + (float("inf"),), self.buckets)),
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "statuses": dict(self.statuses),
+            "errors": self.errors,
+            "retries": self.retries,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_ratio": self.cache_hits / cache_lookups if cache_lookups else None,
+            "coalesced": self.coalesced,
+        }
+
+
+class MetricsRegistry:
+    """
+    MetricsRegistry Class
+
+    Thread-safe registry the client reports every request to.
+    Subclass it and extend the `observe_*` methods to forward metrics elsewhere.
+
+        buckets:
+            - upper bounds of the latency histogram, in seconds.
+    """
+
+    def __init__(self, buckets=BUCKETS):
+        """ (MetricsRegistry, tuple of float) -> NoneType """
+        self.bounds = tuple(sorted(buckets))
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint):
+        """ (MetricsRegistry, str) -> EndpointMetrics
+
+        Must be called with the lock held.
+        """
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics(len(self.bounds))
+        return metrics
+
+    def observe_request(self, endpoint, method, status, duration, bytes_out=0, bytes_in=0):
+        """ (MetricsRegistry, str, str, int, float, int, int) -> NoneType
+
+        Record a finished request. `status` is None when the transport failed.
+        """
+        index = bisect.bisect_left(self.bounds, duration)
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.buckets[index] += 1
+            metrics.duration_sum += duration
+            metrics.count += 1
+            metrics.bytes_out += bytes_out
+            metrics.bytes_in += bytes_in
+            if status is None:
+                metrics.errors += 1
+            else:
+                metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def observe_retry(self, endpoint):
+        """ (MetricsRegistry, str) -> NoneType """
+        with self._lock:
+            self._get(endpoint).retries += 1
+
+    def observe_coalesced(self, endpoint):
+        """ (MetricsRegistry, str) -> NoneType
+
+        Count a call that shared the request of an identical call in flight.
+        """
+        with self._lock:
+            self._get(endpoint).coalesced += 1
+
+    def observe_cache(self, endpoint, hit):
+        """ (MetricsRegistry, str, bool) -> NoneType """
+        with self._lock:
+            metrics = self._get(endpoint)
+            if hit:
+                metrics.cache_hits += 1
+            else:
+                metrics.cache_misses += 1
+
+    def snapshot(self):
+        """ (MetricsRegistry) -> dict
+
+        Return {endpoint: metrics dict} of everything recorded so far.
+        """
+        with self._lock:
+            return {endpoint: metrics.to_dict(self.bounds) for endpoint, metrics in self._endpoints.items()}
+
+    def reset(self):
+        """ (MetricsRegistry) -> NoneType """
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_prometheus(self, prefix="clubhouse"):
+        """ (MetricsRegistry, str) -> str
+
+        Render the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def header(name, kind, text):
+            lines.append(f"# HELP {prefix}_{name} {text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+
+        header("request_duration_seconds", "histogram", "Request latency by endpoint.")
+        for endpoint, metrics in sorted(snapshot.items()):
+            cumulative = 0
+            for bound, count in metrics["histogram"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{le}"}} {cumulative}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {metrics["duration_sum"]}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{endpoint}"}} {metrics["count"]}')
+
+        header("responses_total", "counter", "Responses by endpoint and status code.")
+        for endpoint, metrics in sorted(snapshot.items()):
+            for status, count in sorted(metrics["statuses"].items()):
+                lines.append(f'{prefix}_responses_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        counters = (
+            ("request_errors_total", "errors", "Requests that failed without a response."),
+            ("request_bytes_total", "bytes_out", "Request body bytes sent."),
+            ("response_bytes_total", "bytes_in", "Response body bytes received."),
+            ("retries_total", "retries", "Retried requests."),
+            ("coalesced_total", "coalesced", "Calls that shared an identical request in flight."),
+        )
+        for name, key, text in counters:
+            header(name, "counter", text)
+            for endpoint, metrics in sorted(snapshot.items()):
+                lines.append(f'{prefix}_{name}{{endpoint="{endpoint}"}} {metrics[key]}')
+
+        header("cache_lookups_total", "counter", "Response cache lookups by result.")
+        for endpoint, metrics in sorted(snapshot.items()):
+            if metrics["cache_hits"] or metrics["cache_misses"]:
+                lines.append(f'{prefix}_cache_lookups_total{{endpoint="{endpoint}",result="hit"}} {metrics["cache_hits"]}')
+                lines.append(f'{prefix}_cache_lookups_total{{endpoint="{endpoint}",result="miss"}} {metrics["cache_misses"]}')
+        return "\n".join(lines) + "\n"
+
+
+class OpenTelemetryMetrics(MetricsRegistry):
+    """
+    OpenTelemetryMetrics Class
+
+    `MetricsRegistry` that also emits one CLIENT span per request through OpenTelemetry.
+    Requires `opentelemetry-api` (pip3 install clubhouse-py[otel]) and a configured tracer provider.
+
+        tracer:
+            - tracer to use. Defaults to the global "clubhouse-py" tracer.
+    """
+
+    def __init__(self, tracer=None, buckets=BUCKETS):
+        """ (OpenTelemetryMetrics, Tracer, tuple of float) -> NoneType """
+        if trace is None:
+            raise ImportError("opentelemetry-api is required for OpenTelemetryMetrics. (pip3 install opentelemetry-api)")
+        super().__init__(buckets)
+        self.tracer = tracer if tracer else trace.get_tracer("clubhouse-py")
+
+    def observe_request(self, endpoint, method, status, duration, bytes_out=0, bytes_in=0):
+        """ (OpenTelemetryMetrics, str, str, int, float, int, int) -> NoneType """
+        super().observe_request(endpoint, method, status, duration, bytes_out, bytes_in)
+        end_time = time.time_ns()
+        span = self.tracer.start_span(
+            f"{method} {endpoint}",
+            kind=trace.SpanKind.CLIENT,
+            start_time=end_time - int(duration * 1e9),
+            attributes={
+                "http.request.method": method,
+                "clubhouse.endpoint": endpoint,
+                "http.request.body.size": bytes_out,
+                "http.response.body.size": bytes_in,
+            },
+        )
+        if status is None or status >= 400:
+            span.set_status(trace.Status(trace.StatusCode.ERROR))
+        if status is not None:
+            span.set_attribute("http.response.status_code", status)
+        span.end(end_time=end_time)
@@ -0,0 +1,807 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+# pylint: disable=missing-function-docstring,unused-argument
+
+"""
+mockserver.py
+
+Local stand-in for the Clubhouse API, for offline tests, benchmarks and load tests.
+It implements the endpoints used by `clubhouse.py` on synthetic data, with configurable
+latency, error injection and rate limiting.
+It also serves the PubNub subscribe API (`/v2/subscribe/...`): joining, leaving,
+raising hands, speaker invites and ending a room publish the same events as Clubhouse.
+
+    $ python -m clubhouse.mockserver --port 8080 --latency 0.05 --error-rate 0.01
+    $ CLUBHOUSE_API_URL=http://127.0.0.1:8080/api python3 cli.py
+
+>>> with MockServer(num_channels=100) as server:
+...     clubhouse = Clubhouse(user_id=1, user_token="token", api_url=server.url)
+...     clubhouse.get_channels()
+"""
+
+import json
+import time
+import random
+import argparse
+import threading
+import collections
+from urllib.parse import urlsplit, parse_qs, unquote
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+def make_user(user_id, is_speaker=False):
+    """ (int, bool) -> dict
+
+    Build a channel member. The same user_id always gives the same user.
+    """
+    user_id = int(user_id)
+    return {
+        "user_id": user_id,
+        "name": f"User Name {user_id}",
+        "username": f"user{user_id}",
+        "photo_url": f"https://clubhouseprod.s3.amazonaws.com:443/{user_id}_5f5e6d2b.jpeg",
+        "first_name": "User",
+        "is_speaker": is_speaker,
+        "is_moderator": is_speaker and user_id % 3 == 0,
+        "is_new": False,
+        "is_followed_by_speaker": bool(user_id % 2),
+        "is_invited_as_speaker": False,
+        "time_joined_as_speaker": "2021-02-24T12:34:56.789012+00:00" if is_speaker else None,
+        "skintone": 1 + user_id % 5,
+    }
+
+def make_profile(user_id, num_followers=1000):
+    """ (int, int) -> dict """
+    user_id = int(user_id)
+    return {
+        "user_id": user_id,
+        "name": f"User Name {user_id}",
+        "username": f"user{user_id}",
+        "displayname": "",
+        "photo_url": f"https://clubhouseprod.s3.amazonaws.com:443/{user_id}_5f5e6d2b.jpeg",
+        "bio": f"Hello, I am user {user_id}.",
+        "num_followers": num_followers,
+        "num_following": num_followers // 2,
+        "time_created": "2021-01-01T00:00:00.000000+00:00",
+        "follows_me": False,
+        "is_blocked_by_network": False,
+        "mutual_follows_count": 0,
+        "mutual_follows": [],
+        "notification_type": 3,
+        "invited_by_user_profile": None,
+        "invited_by_club": None,
+        "clubs": [],
+        "url": f"https://www.joinclubhouse.com/@user{user_id}",
+        "can_receive_direct_payment": False,
+        "twitter": None,
+        "instagram": None,
+        "topics": [],
+    }
+
+def make_club(club_id):
+    """ (int) -> dict """
+    club_id = int(club_id)
+    return {
+        "club_id": club_id,
+        "name": f"Club {club_id}",
+        "description": "A club for benchmarks",
+        "photo_url": None,
+        "url": f"https://www.joinclubhouse.com/club/club-{club_id}",
+        "rules": [],
+        "num_members": 1000,
+        "num_followers": 5000,
+        "num_online": 0,
+        "is_follow_allowed": True,
+        "is_membership_private": False,
+        "is_community": False,
+        "topics": [],
+    }
+
+def make_topic(topic_id):
+    """ (int) -> dict """
+    topic_id = int(topic_id)
+    return {
+        "id": topic_id,
+        "title": f"Topic {topic_id}",
+        "abbreviated_title": f"T{topic_id}",
+        "url": f"https://www.joinclubhouse.com/topic/{topic_id}",
+    }
+
+def make_event(event_id):
+    """ (int) -> dict """
+    event_id = int(event_id)
+    return {
+        "event_id": event_id,
+        "name": f"Event {event_id}",
+        "description": "An upcoming event",
+        "time_start": "2021-03-01T12:00:00+00:00",
+        "url": f"https://www.joinclubhouse.com/event/{event_id:08x}",
+        "channel": None,
+        "is_member_only": False,
+        "is_expired": False,
+        "club": make_club(event_id % 500) if event_id % 2 else None,
+        "hosts": [make_user(event_id * 10 + i) for i in range(3)],
+    }
+
+def make_channel(index, num_users=50, seed=0):
+    """ (int, int, int) -> dict """
+    rand = random.Random(seed * 1000003 + index)
+    num_speakers = rand.randint(1, min(10, num_users)) if num_users else 0
+    users = [make_user(index * num_users + i, i < num_speakers) for i in range(num_users)]
+    return {
+        "channel_id": 10000000 + index,
+        "channel": f"{rand.getrandbits(32):08x}",
+        "topic": f"Talking about topic #{index} and more",
+        "url": f"https://www.joinclubhouse.com/room/{index:08x}",
+        "is_private": False,
+        "is_social_mode": False,
+        "is_handraise_enabled": True,
+        "num_speakers": num_speakers,
+        "num_all": num_users,
+        "num_other": 0,
+        "club": make_club(index % 500) if index % 2 else None,
+        "users": users,
+    }
+
+def make_channels(num_channels, num_users=50, seed=0):
+    """ (int, int, int) -> dict
+
+    Build a `get_channels()` response.
+    """
+    return {
+        "success": True,
+        "channels": [make_channel(i, num_users, seed) for i in range(num_channels)],
+        "events": [],
+    }
+
+def _page(items_total, query, make_item, default_page_size=50):
+    """ (int, dict, callable, int) -> (list, int)
+
+    Return the items of the requested page and the next page number.
+    """
+    page_size = int(query.get("page_size", default_page_size))
+    page = int(query.get("page", 1))
+    start = (page - 1) * page_size
+    end = min(start + page_size, items_total)
+    items = [make_item(i) for i in range(start, end)]
+    return items, page + 1 if end < items_total else None
+
+
+class MockState:
+    """
+    MockState Class
+
+    Synthetic data served by the mock server.
+
+        num_channels:
+            - number of live channels.
+        users_per_channel:
+            - members of every channel.
+        num_followers:
+            - followers (and twice as few followings) of every user.
+        seed:
+            - seed of the generated data.
+    """
+
+    def __init__(self, num_channels=50, users_per_channel=50, num_followers=1000, num_events=200, num_topics=100, seed=0):
+        """ (MockState, int, int, int, int, int, int) -> NoneType """
+        self.num_followers = num_followers
+        self.num_events = num_events
+        self.num_topics = num_topics
+        self.lock = threading.Lock()
+        self.channels = {}
+        for index in range(num_channels):
+            channel = make_channel(index, users_per_channel, seed)
+            self.channels[channel["channel"]] = channel
+        self.bios = {}
+        self.pings = 0
+        self.invites = set()
+        self.messages = collections.deque(maxlen=10000)
+        self.timetoken = int(time.time() * 1e7)
+        self.published = threading.Condition(self.lock)
+
+    def _publish(self, pubnub_channel, message):
+        """ (MockState, str, dict) -> NoneType
+
+        Publish a PubNub message. Must be called with the lock held.
+        """
+        self.timetoken = max(self.timetoken + 1, int(time.time() * 1e7))
+        self.messages.append((self.timetoken, pubnub_channel, message))
+        self.published.notify_all()
+
+    def publish(self, pubnub_channel, message):
+        """ (MockState, str, dict) -> NoneType """
+        with self.lock:
+            self._publish(pubnub_channel, message)
+
+    def wait_messages(self, pubnub_channels, timetoken, timeout):
+        """ (MockState, set of str, int, float) -> (int, list of tuple)
+
+        Wait up to `timeout` seconds for messages newer than `timetoken` on the given channels.
+        A timetoken of 0 returns the current timetoken right away, like PubNub.
+        """
+        deadline = time.monotonic() + timeout
+        with self.lock:
+            if not timetoken:
+                return self.timetoken, []
+            while True:
+                messages = [
+                    message for message in self.messages
+                    if message[0] > timetoken and message[1] in pubnub_channels
+                ]
+                remaining = deadline - time.monotonic()
+                if messages or remaining <= 0:
+                    return max(timetoken, self.timetoken), messages
+                self.published.wait(remaining)
+
+    def channel_list(self):
+        """ (MockState) -> list of dict """
+        with self.lock:
+            return list(self.channels.values())
+
+    def join(self, channel_name, user_id):
+        """ (MockState, str, int) -> dict """
+        with self.lock:
+            channel = self.channels.get(channel_name)
+            if channel is None:
+                return None
+            if all(user["user_id"] != user_id for user in channel["users"]):
+                user = make_user(user_id)
+                channel["users"].append(user)
+                channel["num_all"] += 1
+                self._publish(f"channel_all.{channel_name}", {
+                    "action": "join_channel", "channel": channel_name, "user_profile": user,
+                })
+            return channel
+
+    def leave(self, channel_name, user_id):
+        """ (MockState, str, int) -> NoneType """
+        with self.lock:
+            channel = self.channels.get(channel_name)
+            if channel is not None:
+                num_users = len(channel["users"])
+                channel["users"] = [user for user in channel["users"] if user["user_id"] != user_id]
+                channel["num_all"] = len(channel["users"])
+                if len(channel["users"]) != num_users:
+                    self._publish(f"channel_all.{channel_name}", {
+                        "action": "leave_channel", "channel": channel_name, "user_id": user_id,
+                    })
+
+    def update_user(self, channel_name, user_id, action, **fields):
+        """ (MockState, str, int, str, ...) -> dict
+
+        Change a member of a channel and publish `action` about it. Return the member or None.
+        """
+        with self.lock:
+            channel = self.channels.get(channel_name)
+            if channel is None:
+                return None
+            for user in channel["users"]:
+                if user["user_id"] == user_id:
+                    user.update(fields)
+                    self._publish(f"channel_all.{channel_name}", {
+                        "action": action, "channel": channel_name, "user_id": user_id, "user_profile": dict(user),
+                    })
+                    return user
+            return None
+
+    def invite(self, channel_name, user_id, from_user_id):
+        """ (MockState, str, int, int) -> NoneType """
+        with self.lock:
+            self.invites.add((channel_name, user_id))
+            self._publish(f"channel_user.{channel_name}.{user_id}", {
+                "action": "invite_speaker", "channel": channel_name,
+                "from_user_id": from_user_id, "from_name": f"User Name {from_user_id}",
+            })
+
+    def end(self, channel_name):
+        """ (MockState, str) -> bool """
+        with self.lock:
+            if self.channels.pop(channel_name, None) is None:
+                return False
+            self._publish(f"channel_all.{channel_name}", {"action": "end_channel", "channel": channel_name})
+            return True
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """
+    MockHandler Class
+
+    Dispatches `/api/<endpoint>` to `endpoint_<endpoint>` methods.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server_version = "clubhouse-mock"
+    disable_nagle_algorithm = True
+
+    # Endpoints that only need to answer {"success": true}
+    GENERIC_ENDPOINTS = frozenset((
+        "add_email", "update_photo", "follow", "unfollow", "block", "unblock", "follow_multiple",
+        "follow_club", "unfollow_club", "update_follow_notifications", "ignore_suggested_follow",
+        "hide_channel", "make_channel_public", "make_channel_social",
+        "block_from_channel", "change_handraise_settings", "update_skintone",
+        "reject_speaker_invite", "mute_speaker",
+        "invite_to_existing_channel", "update_username", "update_name", "update_displayname",
+        "add_user_topic", "remove_user_topic", "record_action_trails", "create_event", "edit_event",
+        "delete_event", "get_release_notes", "get_settings", "get_online_friends",
+        "get_actionable_notifications", "get_suggested_speakers", "get_create_channel_targets",
+    ))
+    PUBLIC_ENDPOINTS = frozenset((
+        "start_phone_number_auth", "call_phone_number_auth", "resend_phone_number_auth",
+        "complete_phone_number_auth", "check_for_update",
+    ))
+
+    def log_message(self, format, *args): # pylint: disable=redefined-builtin
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self): # pylint: disable=invalid-name
+        """ Handle GET requests. """
+        self._dispatch()
+
+    def do_POST(self): # pylint: disable=invalid-name
+        """ Handle POST requests. """
+        self._dispatch()
+
+    def _send(self, status, body, headers=None):
+        """ (MockHandler, int, object, dict) -> NoneType """
+        if isinstance(body, bytes):
+            data = body
+            content_type = "text/html"
+        else:
+            data = json.dumps(body).encode()
+            content_type = "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _dispatch(self):
+        """ (MockHandler) -> NoneType """
+        server = self.server
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw_body = self.rfile.read(length) if length else b""
+        server.count_request()
+
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.uniform(0, server.jitter))
+
+        if url.path.startswith("/v2/subscribe/"):
+            return self._subscribe(url)
+
+        prefix = server.prefix + "/"
+        if not url.path.startswith(prefix):
+            return self._send(404, {"success": False, "error_message": "Not found"})
+        endpoint = url.path[len(prefix):]
+
+        retry_after = server.throttle(self.headers.get("Authorization") or self.client_address[0])
+        if retry_after:
+            return self._send(
+                429, {"success": False, "error_message": "Too many requests"},
+                {"Retry-After": str(max(1, round(retry_after)))}
+            )
+        if server.error_rate and random.random() < server.error_rate:
+            return self._send(random.choice((500, 502, 503)), b"<html><body>Server Error</body></html>")
+
+        if endpoint not in self.PUBLIC_ENDPOINTS and not self.headers.get("Authorization"):
+            return self._send(401, {"detail": "Authentication credentials were not provided."})
+
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        body = {}
+        if raw_body and "json" in (self.headers.get("Content-Type") or ""):
+            try:
+                body = json.loads(raw_body)
+            except ValueError:
+                return self._send(400, {"success": False, "error_message": "Invalid JSON"})
+
+        handler = getattr(self, f"endpoint_{endpoint}", None)
+        if handler is None:
+            if endpoint in self.GENERIC_ENDPOINTS:
+                return self._send(200, {"success": True})
+            return self._send(404, {"success": False, "error_message": f"Unknown endpoint {endpoint}"})
+        return self._send(200, handler(query, body or {}))
+
+    def _subscribe(self, url):
+        """ (MockHandler, SplitResult) -> NoneType
+
+        PubNub subscribe: /v2/subscribe/<sub_key>/<channels>/0?tt=<timetoken>&auth=<token>
+        """
+        server = self.server
+        parts = url.path.split("/")
+        if len(parts) < 6:
+            return self._send(400, {"status": 400, "error": True, "message": "Invalid Arguments"})
+        if not server.pubnub_enabled:
+            return self._send(503, b"<html><body>Service Unavailable</body></html>")
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if not query.get("auth"):
+            return self._send(403, {"status": 403, "error": True, "message": "Forbidden"})
+        pubnub_channels = {unquote(channel) for channel in parts[4].split(",")}
+        timetoken, messages = server.state.wait_messages(
+            pubnub_channels, int(query.get("tt") or 0), server.subscribe_timeout
+        )
+        region = int(query.get("tr") or 1)
+        return self._send(200, {
+            "t": {"t": str(timetoken), "r": region},
+            "m": [
+                {"a": "1", "f": 0, "p": {"t": str(tt), "r": region}, "k": parts[3], "c": channel, "d": message}
+                for tt, channel, message in messages
+            ],
+        })
+
+    def _user_id(self):
+        """ (MockHandler) -> int """
+        try:
+            return int(self.headers.get("CH-UserID"))
+        except (TypeError, ValueError):
+            return 0
+
+    # Authentication
+
+    def endpoint_start_phone_number_auth(self, query, body):
+        return {"success": True, "is_blocked": False, "error_message": None}
+
+    endpoint_call_phone_number_auth = endpoint_start_phone_number_auth
+    endpoint_resend_phone_number_auth = endpoint_start_phone_number_auth
+
+    def endpoint_complete_phone_number_auth(self, query, body):
+        phone_number = "".join(ch for ch in str(body.get("phone_number")) if ch.isdigit())
+        user_id = int(phone_number[-8:] or 1)
+        return {
+            "success": True,
+            "is_waitlisted": False,
+            "is_onboarding": False,
+            "user_profile": {"user_id": user_id, "name": f"User Name {user_id}", "username": f"user{user_id}"},
+            "auth_token": f"mock-{user_id:x}",
+            "access_token": "mock-access",
+            "refresh_token": "mock-refresh",
+        }
+
+    def endpoint_check_for_update(self, query, body):
+        return {"success": True, "has_update": False}
+
+    def endpoint_check_waitlist_status(self, query, body):
+        return {"success": True, "is_waitlisted": False, "is_onboarding": False}
+
+    def endpoint_me(self, query, body):
+        user_id = self._user_id()
+        return {
+            "success": True,
+            "user_profile": {"user_id": user_id, "name": f"User Name {user_id}", "username": f"user{user_id}", "photo_url": None},
+            "num_invites": 0,
+            "has_unread_notifications": False,
+            "notifications_enabled": True,
+            "email": None,
+            "following_ids": [],
+            "blocked_ids": [],
+        }
+
+    # Channels
+
+    def endpoint_get_channels(self, query, body):
+        return {"success": True, "channels": self.server.state.channel_list(), "events": []}
+
+    def _channel_response(self, channel):
+        """ (MockHandler, dict) -> dict """
+        return {"success": True, **channel, "should_leave": False}
+
+    def endpoint_get_channel(self, query, body):
+        channel = self.server.state.channels.get(body.get("channel"))
+        if channel is None:
+            return {"success": False, "error_message": "That room is no longer available"}
+        return self._channel_response(channel)
+
+    def endpoint_join_channel(self, query, body):
+        user_id = self._user_id()
+        channel = self.server.state.join(body.get("channel"), user_id)
+        if channel is None:
+            return {"success": False, "error_message": "That room is no longer available"}
+        return {
+            **self._channel_response(channel),
+            "token": f"mock-agora-{channel['channel']}-{user_id}",
+            "rtm_token": "mock-rtm",
+            "pubnub_token": f"mock-pubnub-{user_id}",
+            "pubnub_origin": self.server.origin,
+            "pubnub_heartbeat_value": 30,
+            "pubnub_heartbeat_interval": 15,
+            "pubnub_enable": True,
+            "agora_native_mute": True,
+        }
+
+    def endpoint_leave_channel(self, query, body):
+        self.server.state.leave(body.get("channel"), self._user_id())
+        return {"success": True}
+
+    def endpoint_active_ping(self, query, body):
+        with self.server.state.lock:
+            self.server.state.pings += 1
+        return {"success": True, "should_leave": False}
+
+    def endpoint_accept_speaker_invite(self, query, body):
+        state = self.server.state
+        channel_name, user_id = body.get("channel"), self._user_id()
+        with state.lock:
+            if (channel_name, user_id) not in state.invites:
+                return {"success": False, "error_message": "You have not been invited to speak"}
+            state.invites.discard((channel_name, user_id))
+        state.update_user(channel_name, user_id, "add_speaker", is_speaker=True, raise_hands=False)
+        return {"success": True}
+
+    def endpoint_invite_speaker(self, query, body):
+        self.server.state.invite(body.get("channel"), int(body.get("user_id") or 0), self._user_id())
+        return {"success": True}
+
+    def endpoint_uninvite_speaker(self, query, body):
+        channel_name, user_id = body.get("channel"), int(body.get("user_id") or 0)
+        self.server.state.update_user(channel_name, user_id, "remove_speaker", is_speaker=False, is_moderator=False)
+        return {"success": True}
+
+    def endpoint_make_moderator(self, query, body):
+        channel_name, user_id = body.get("channel"), int(body.get("user_id") or 0)
+        self.server.state.update_user(channel_name, user_id, "make_moderator", is_speaker=True, is_moderator=True)
+        return {"success": True}
+
+    def endpoint_audience_reply(self, query, body):
+        raise_hands = bool(body.get("raise_hands")) and not body.get("unraise_hands")
+        self.server.state.update_user(
+            body.get("channel"), self._user_id(), "raise_hands" if raise_hands else "unraise_hands",
+            raise_hands=raise_hands
+        )
+        return {"success": True}
+
+    def endpoint_end_channel(self, query, body):
+        if not self.server.state.end(body.get("channel")):
+            return {"success": False, "error_message": "That room is no longer available"}
+        return {"success": True}
+
+    def endpoint_create_channel(self, query, body):
+        state = self.server.state
+        channel = make_channel(len(state.channels) + 1000000, 0)
+        channel["topic"] = body.get("topic") or ""
+        with state.lock:
+            state.channels[channel["channel"]] = channel
+        return self.endpoint_join_channel(query, {"channel": channel["channel"]})
+
+    # Users
+
+    def endpoint_get_profile(self, query, body):
+        user_id = int(body.get("user_id") or 0)
+        profile = make_profile(user_id, self.server.state.num_followers)
+        if user_id in self.server.state.bios:
+            profile["bio"] = self.server.state.bios[user_id]
+        return {"success": True, "user_profile": profile}
+
+    def endpoint_update_bio(self, query, body):
+        self.server.state.bios[self._user_id()] = body.get("bio")
+        return {"success": True}
+
+    def _user_page(self, query, total, offset):
+        """ (MockHandler, dict, int, int) -> dict """
+        user_id = int(query.get("user_id", 0))
+        users, next_page = _page(total, query, lambda i: make_user(user_id * offset + i + 1))
+        return {"success": True, "users": users, "next": next_page, "count": total}
+
+    def endpoint_get_followers(self, query, body):
+        return self._user_page(query, self.server.state.num_followers, 7)
+
+    def endpoint_get_following(self, query, body):
+        return self._user_page(query, self.server.state.num_followers // 2, 11)
+
+    def endpoint_get_mutual_follows(self, query, body):
+        return self._user_page(query, self.server.state.num_followers // 10, 13)
+
+    def endpoint_get_suggested_follows_all(self, query, body):
+        users, next_page = _page(500, query, make_user)
+        return {"success": True, "users": users, "next": next_page, "count": 500}
+
+    def endpoint_search_users(self, query, body):
+        return {"success": True, "users": [make_user(i) for i in range(1, 21)], "next": None, "count": 20}
+
+    def endpoint_get_notifications(self, query, body):
+        def make_notification(index):
+            return {
+                "notification_id": index + 1,
+                "user_profile": make_user(index + 1),
+                "event_id": None,
+                "type": 1,
+                "is_unread": index < 5,
+                "message": "started following you",
+                "time_created": "2021-02-24T12:34:56.789012+00:00",
+            }
+        notifications, next_page = _page(200, query, make_notification, 20)
+        return {"success": True, "notifications": notifications, "next": next_page, "count": 200}
+
+    # Clubs, topics and events
+
+    def endpoint_get_club(self, query, body):
+        return {
+            "success": True,
+            "club": make_club(body.get("club_id") or 0),
+            "is_admin": False,
+            "is_member": False,
+            "is_follower": False,
+            "num_invites": 0,
+            "topics": [],
+        }
+
+    def endpoint_get_club_members(self, query, body):
+        club_id = int(query.get("club_id", 0))
+        users, next_page = _page(1000, query, lambda i: make_user(club_id * 100003 + i))
+        return {"success": True, "users": users, "next": next_page, "count": 1000}
+
+    def endpoint_get_clubs(self, query, body):
+        return {"success": True, "clubs": [make_club(i) for i in range(10)]}
+
+    def endpoint_search_clubs(self, query, body):
+        return {"success": True, "clubs": [make_club(i) for i in range(10)], "next": None, "count": 10}
+
+    def endpoint_get_all_topics(self, query, body):
+        num_topics = self.server.state.num_topics
+        return {
+            "success": True,
+            "topics": [
+                {**make_topic(i), "topics": [make_topic(i * 100 + j) for j in range(1, 10)]}
+                for i in range(1, num_topics // 10 + 1)
+            ],
+        }
+
+    def endpoint_get_topic(self, query, body):
+        return {"success": True, "topic": make_topic(body.get("topic_id") or 0)}
+
+    def endpoint_get_users_for_topic(self, query, body):
+        topic_id = int(query.get("topic_id", 0))
+        users, next_page = _page(300, query, lambda i: make_user(topic_id * 1009 + i), 25)
+        return {"success": True, "users": users, "next": next_page, "count": 300}
+
+    def endpoint_get_clubs_for_topic(self, query, body):
+        topic_id = int(query.get("topic_id", 0))
+        clubs, next_page = _page(100, query, lambda i: make_club(topic_id * 101 + i), 25)
+        return {"success": True, "clubs": clubs, "next": next_page, "count": 100}
+
+    def endpoint_get_events(self, query, body):
+        events, next_page = _page(self.server.state.num_events, query, make_event, 25)
+        return {"success": True, "events": events, "next": next_page}
+
+    def endpoint_get_event(self, query, body):
+        return {"success": True, "event": make_event(body.get("event_id") or 0)}
+
+
+class MockServer(ThreadingHTTPServer):
+    """
+    MockServer Class
+
+    Threaded HTTP server answering like the Clubhouse API.
+
+        latency / jitter:
+            - every request sleeps `latency + uniform(0, jitter)` seconds.
+        error_rate:
+            - probability of answering 500/502/503 with a non-JSON body.
+        rate_limit:
+            - requests per second allowed per token (429 with Retry-After above it). 0 disables it.
+        subscribe_timeout:
+            - seconds a PubNub long-poll waits for messages. Set `pubnub_enabled` to False
+              to make subscribes fail (503), e.g. to test polling fallbacks.
+        state:
+            - `MockState` holding the synthetic data. Extra keyword arguments build one.
+    """
+
+    daemon_threads = True
+    # Many clients open their connections at once; the default backlog of 5 resets some.
+    request_queue_size = 128
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0, rate_limit=0, prefix="/api", state=None, verbose=False, subscribe_timeout=10, **state_options):
+        """ (MockServer, str, int, float, float, float, float, str, MockState, bool, float, ...) -> NoneType """
+        super().__init__((host, port), MockHandler)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.prefix = prefix
+        self.state = state if state else MockState(**state_options)
+        self.verbose = verbose
+        self.subscribe_timeout = subscribe_timeout
+        self.pubnub_enabled = True
+        self.requests = 0
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def origin(self):
+        """ (MockServer) -> str
+
+        Base URL of the server, returned as `pubnub_origin`.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def url(self):
+        """ (MockServer) -> str
+
+        Value to use as `api_url` for the client.
+        """
+        return f"{self.origin}{self.prefix}"
+
+    def count_request(self):
+        """ (MockServer) -> NoneType """
+        with self._lock:
+            self.requests += 1
+
+    def throttle(self, key):
+        """ (MockServer, str) -> float
+
+        Token bucket per client. Return 0 when allowed, otherwise seconds to wait.
+        """
+        if not self.rate_limit:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (self.rate_limit, now))
+            tokens = min(self.rate_limit, tokens + (now - updated) * self.rate_limit)
+            if tokens < 1:
+                self._buckets[key] = (tokens, now)
+                return (1 - tokens) / self.rate_limit
+            self._buckets[key] = (tokens - 1, now)
+            return 0
+
+    def start(self):
+        """ (MockServer) -> MockServer
+
+        Serve on a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ (MockServer) -> NoneType """
+        self.shutdown()
+        self.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    """ Run the mock server from the command line. """
+    parser = argparse.ArgumentParser(description="Local stand-in for the Clubhouse API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a 5xx answer")
+    parser.add_argument("--rate-limit", type=float, default=0, help="requests per second per token")
+    parser.add_argument("--channels", type=int, default=50)
+    parser.add_argument("--users-per-channel", type=int, default=50)
+    parser.add_argument("--followers", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    server = MockServer(
+        args.host, args.port,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, rate_limit=args.rate_limit,
+        verbose=args.verbose, num_channels=args.channels, users_per_channel=args.users_per_channel,
+        num_followers=args.followers, seed=args.seed
+    )
+    print(f"[*] Serving the mock Clubhouse API on {server.url}")
+    print(f"    export CLUBHOUSE_API_URL={server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+models.py
+
+Optional typed models for API responses.
+Models use `__slots__`, so they are a lot smaller than the raw dicts returned by `Clubhouse`.
+Nested fields (users of a channel, club of an event, ...) are converted to models too,
+when the model is built, so no raw dict is kept alive by a model.
+
+>>> channels = Channel.from_list(clubhouse.get_channels()['channels'])
+>>> [user.name for user in channels[0].speakers]
+"""
+
+class _Nested:
+    """
+    Descriptor of a nested field, stored in the `_<name>` slot.
+    Raw dicts (or lists of them) are converted to models when the field is set.
+    """
+
+    __slots__ = ("name", "slot", "model", "many")
+
+    def __init__(self, name, model, many=False):
+        """ (_Nested, str, str, bool) -> NoneType """
+        self.name = name
+        self.slot = "_" + name
+        self.model = model
+        self.many = many
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if value is None and self.many:
+            value = ()
+        return value
+
+    def __set__(self, obj, value):
+        from_dict = _MODELS[self.model].from_dict
+        if self.many and isinstance(value, (list, tuple)):
+            value = tuple(from_dict(item) if isinstance(item, dict) else item for item in value)
+        elif isinstance(value, dict):
+            value = from_dict(value)
+        setattr(obj, self.slot, value)
+
+
+class Model:
+    """
+    Model Class
+
+    Base class of every model. Subclasses list their plain fields in `FIELDS`
+    and nested fields as `_Nested` descriptors.
+    """
+
+    __slots__ = ()
+    FIELDS = ()
+    NESTED = ()
+
+    def __init__(self, **kwargs):
+        """ (Model, ...) -> NoneType """
+        for name in self.FIELDS + self.NESTED:
+            setattr(self, name, kwargs.get(name))
+
+    @classmethod
+    def from_dict(cls, data):
+        """ (type, dict) -> Model
+
+        Build the model from a raw API dict. Unknown keys are dropped.
+        """
+        obj = cls.__new__(cls)
+        get = data.get
+        for name in cls.FIELDS + cls.NESTED:
+            setattr(obj, name, get(name))
+        return obj
+
+    @classmethod
+    def from_list(cls, items):
+        """ (type, list of dict) -> list of Model """
+        from_dict = cls.from_dict
+        return [from_dict(item) for item in items]
+
+    def to_dict(self):
+        """ (Model) -> dict
+
+        Convert the model (and decoded nested models) back to plain dicts.
+        """
+        data = {name: getattr(self, name) for name in self.FIELDS}
+        for name in self.NESTED:
+            value = getattr(self, name)
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, tuple):
+                value = [item.to_dict() for item in value]
+            data[name] = value
+        return data
+
+    def __eq__(self, other):
+        if type(self) is not type(other):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        key = self.FIELDS[0]
+        return f"{type(self).__name__}({key}={getattr(self, key)!r})"
+
+
+class Topic(Model):
+    """ Topic model. """
+
+    FIELDS = ("id", "title", "abbreviated_title", "url")
+    NESTED = ()
+    __slots__ = FIELDS
+
+
+class User(Model):
+    """ User model, used for channel members, profiles and user lists. """
+
+    FIELDS = (
+        "user_id", "name", "username", "photo_url", "first_name", "bio",
+        "is_speaker", "is_moderator", "is_invited_as_speaker", "is_followed_by_speaker",
+        "is_new", "raise_hands", "time_joined_as_speaker", "skintone",
+        "num_followers", "num_following",
+    )
+    NESTED = ()
+    __slots__ = FIELDS
+
+
+class Club(Model):
+    """ Club model. """
+
+    FIELDS = (
+        "club_id", "name", "description", "photo_url", "url", "rules",
+        "num_members", "num_followers", "num_online",
+        "is_follow_allowed", "is_membership_private", "is_community",
+    )
+    NESTED = ("topics",)
+    __slots__ = FIELDS + ("_topics",)
+    topics = _Nested("topics", "Topic", many=True)
+
+
+class Channel(Model):
+    """ Channel model. `users` and `club` are models as well. """
+
+    FIELDS = (
+        "channel_id", "channel", "topic", "url", "is_private", "is_social_mode",
+        "is_handraise_enabled", "num_speakers", "num_all", "num_other",
+    )
+    NESTED = ("club", "users")
+    __slots__ = FIELDS + ("_club", "_users")
+    club = _Nested("club", "Club")
+    users = _Nested("users", "User", many=True)
+
+    @property
+    def speakers(self):
+        """ (Channel) -> list of User """
+        return [user for user in self.users if user.is_speaker or user.is_moderator]
+
+
+class Event(Model):
+    """ Event model. `club` and `hosts` are models as well. """
+
+    FIELDS = (
+        "event_id", "name", "description", "time_start", "url", "channel",
+        "is_member_only", "is_expired",
+    )
+    NESTED = ("club", "hosts")
+    __slots__ = FIELDS + ("_club", "_hosts")
+    club = _Nested("club", "Club")
+    hosts = _Nested("hosts", "User", many=True)
+
+
+_MODELS = {
+    "Topic": Topic,
+    "User": User,
+    "Club": Club,
+    "Channel": Channel,
+    "Event": Event,
+}
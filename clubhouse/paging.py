@@ -0,0 +1,85 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+paging.py
+
+Auto-paginating iterators for paged endpoints.
+Records are yielded lazily and the next page is fetched while the current one is consumed,
+so no more than two pages are held in memory at once.
+"""
+
+def _next_page(result, items, page, page_size):
+    """ (dict, list, int, int) -> int
+
+    Return the next page number, or None on the last page.
+    The server sends `next` (null on the last page); short pages are treated as the last one.
+    """
+    if not result.get("success", True):
+        raise Exception(f"Failed to fetch page {page} ({result.get('error_message')})")
+    if "next" in result:
+        return result["next"]
+    if not items or len(items) < page_size:
+        return None
+    return page + 1
+
+def iter_pages(fetch, items_key, page=1, page_size=50, prefetch=True):
+    """ (callable, str, int, int, bool) -> generator
+
+    Yield every record of `result[items_key]` across pages.
+    `fetch(page)` returns the decoded response of the given page.
+    """
+    from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    future = None
+    try:
+        result = fetch(page)
+        while True:
+            items = result.get(items_key) or []
+            next_page = _next_page(result, items, page, page_size)
+            if next_page is not None and executor:
+                future = executor.submit(fetch, next_page)
+            result = None
+            yield from items
+            del items
+            if next_page is None:
+                return
+            page = next_page
+            if future:
+                result, future = future.result(), None
+            else:
+                result = fetch(page)
+    finally:
+        if future:
+            future.cancel()
+        if executor:
+            executor.shutdown(wait=False)
+
+async def aiter_pages(fetch, items_key, page=1, page_size=50, prefetch=True):
+    """ (coroutine function, str, int, int, bool) -> async generator
+
+    asyncio version of `iter_pages()`. `fetch(page)` returns an awaitable.
+    """
+    import asyncio # pylint: disable=import-outside-toplevel
+    task = None
+    try:
+        result = await fetch(page)
+        while True:
+            items = result.get(items_key) or []
+            next_page = _next_page(result, items, page, page_size)
+            if next_page is not None and prefetch:
+                task = asyncio.ensure_future(fetch(next_page))
+            result = None
+            for item in items:
+                yield item
+            del items
+            if next_page is None:
+                return
+            page = next_page
+            if task:
+                result, task = await task, None
+            else:
+                result = await fetch(page)
+    finally:
+        if task:
+            task.cancel()
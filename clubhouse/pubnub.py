@@ -0,0 +1,286 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+pubnub.py
+
+In-room events over PubNub, instead of polling `get_channel`.
+Clubhouse publishes room events (user joined/left, speaker invites, raised hands,
+end of the room, ...) on PubNub channels. `PubNubSubscriber` long-polls them
+through the PubNub subscribe REST API, and `RoomWatcher` keeps a `RoomState` in sync
+with them, falling back to polling `get_channel` while the stream is down.
+
+>>> channel_info = clubhouse.join_channel(channel)
+>>> watcher = RoomWatcher(clubhouse, channel_info, on_event=print).start()
+>>> watcher.state.speakers
+>>> watcher.stop()
+"""
+
+import random
+import threading
+from urllib.parse import quote, urlencode
+from .transport import RequestsTransport
+from .scheduler import get_scheduler
+from .room import RoomState
+
+DEFAULT_ORIGIN = "ps.pndsn.com"
+
+def room_channels(channel, user_id):
+    """ (str, int) -> list of str
+
+    PubNub channels carrying the events of a room for the given user.
+    """
+    return [
+        f"users.{user_id}",
+        f"channel_user.{channel}.{user_id}",
+        f"channel_all.{channel}",
+    ]
+
+
+class PubNubSubscriber:
+    """
+    PubNubSubscriber Class
+
+    Minimal client of the PubNub subscribe API (v2), on a keep-alive transport.
+
+        sub_key:
+            - PubNub subscribe key (`Clubhouse.PUBNUB_SUB_KEY`).
+        channels:
+            - PubNub channels to listen to.
+        uuid:
+            - PubNub uuid. Clubhouse uses the user_id.
+        auth_key:
+            - `pubnub_token` returned by `join_channel`.
+        origin:
+            - PubNub host, `pubnub_origin` returned by `join_channel` (https unless a scheme is given).
+        heartbeat:
+            - presence timeout in seconds, `pubnub_heartbeat_value` returned by `join_channel`.
+        timeout:
+            - read timeout of a long-poll. PubNub answers empty polls after about 280 seconds.
+    """
+
+    def __init__(self, sub_key, channels, uuid, auth_key=None, origin=None, heartbeat=None, timeout=310, transport=None):
+        """ (PubNubSubscriber, str, list of str, str, str, str, int, int, Transport) -> NoneType """
+        origin = origin or DEFAULT_ORIGIN
+        if "://" not in origin:
+            origin = f"https://{origin}"
+        self.origin = origin.rstrip("/")
+        self.sub_key = sub_key
+        self.channels = list(channels)
+        self.uuid = str(uuid)
+        self.auth_key = auth_key
+        self.heartbeat = heartbeat
+        self.timetoken = "0"
+        self.region = None
+        self.transport = transport if transport else RequestsTransport(pool_maxsize=1, idle_timeout=0, timeout=(5, timeout))
+
+    def _url(self):
+        """ (PubNubSubscriber) -> str """
+        channels = ",".join(quote(channel, safe="") for channel in self.channels)
+        params = {"tt": self.timetoken, "uuid": self.uuid}
+        if self.region is not None:
+            params["tr"] = self.region
+        if self.auth_key:
+            params["auth"] = self.auth_key
+        if self.heartbeat:
+            params["heartbeat"] = self.heartbeat
+        return f"{self.origin}/v2/subscribe/{self.sub_key}/{channels}/0?{urlencode(params)}"
+
+    def poll(self):
+        """ (PubNubSubscriber) -> list of (str, dict)
+
+        Do one long-poll and return the (pubnub channel, message) received.
+        The first poll only fetches the current timetoken and returns nothing.
+        """
+        resp = self.transport.request("GET", self._url())
+        if resp.status_code != 200:
+            raise Exception(f"PubNub subscribe failed with HTTP {resp.status_code}")
+        data = self.transport.decode(resp)
+        timetoken = data["t"]
+        self.timetoken = str(timetoken["t"])
+        self.region = timetoken.get("r")
+        return [(message.get("c"), message.get("d")) for message in data.get("m") or ()]
+
+    def __iter__(self):
+        """ (PubNubSubscriber) -> generator of (str, dict)
+
+        Yield messages forever. Errors are raised; the timetoken is kept,
+        so iterating again resumes without losing buffered messages.
+        """
+        while True:
+            yield from self.poll()
+
+    def close(self):
+        """ (PubNubSubscriber) -> NoneType """
+        self.transport.close()
+
+
+class RoomWatcher:
+    """
+    RoomWatcher Class
+
+    Keep a `RoomState` in sync with the events of a room on a background thread.
+    While the PubNub stream is down, the room is polled with `get_channel` every
+    `poll_interval` seconds, and the stream is retried with exponential backoff.
+
+        client:
+            - authenticated `Clubhouse` instance.
+        channel_info:
+            - `join_channel` response of the room.
+        on_event:
+            - `on_event(event, state)`, called for every event that changed the state.
+              Polls are turned into the same events.
+        on_poll:
+            - `on_poll(state)`, called after every fallback poll with a snapshot of the state.
+
+    Callbacks run after the event is applied and the lock released, so they may
+    block (e.g. `accept_speaker_invite`) without holding up readers of the state.
+    Use `snapshot()` for a copy that does not change while it is read.
+    """
+
+    def __init__(self, client, channel_info, on_event=None, on_poll=None, poll_interval=10, max_backoff=60, scheduler=None):
+        """ (RoomWatcher, Clubhouse, dict, callable, callable, int, int, Scheduler) -> NoneType """
+        self.client = client
+        self.state = RoomState.from_channel(channel_info)
+        self.on_event = on_event
+        self.on_poll = on_poll
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+        self.scheduler = scheduler if scheduler else get_scheduler()
+        self.streaming = False
+        self.user_id = client.HEADERS.get("CH-UserID")
+        self.subscriber = PubNubSubscriber(
+            client.PUBNUB_SUB_KEY,
+            room_channels(self.state.channel, self.user_id),
+            self.user_id,
+            auth_key=channel_info.get("pubnub_token"),
+            origin=channel_info.get("pubnub_origin"),
+            heartbeat=channel_info.get("pubnub_heartbeat_value")
+        )
+        self._lock = threading.RLock()
+        self._stopped = threading.Event()
+        self._poll_task = None
+        self._thread = None
+
+    def start(self):
+        """ (RoomWatcher) -> RoomWatcher """
+        self._thread = threading.Thread(target=self._listen, name=f"room-{self.state.channel}", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """ (RoomWatcher) -> NoneType
+
+        Stop listening. A long-poll in progress is abandoned.
+        """
+        self._stopped.set()
+        self._stop_polling()
+        self.subscriber.close()
+
+    def snapshot(self):
+        """ (RoomWatcher) -> RoomState
+
+        Return a copy of the state that the watcher thread will not change.
+        """
+        with self._lock:
+            return RoomState.from_channel(self.state.to_dict())
+
+    @property
+    def stopped(self):
+        """ (RoomWatcher) -> bool """
+        return self._stopped.is_set()
+
+    def _report(self, event):
+        """ (RoomWatcher, dict) -> NoneType
+
+        Call the callbacks of an applied event. Must be called without the lock held.
+        """
+        if self.on_event is not None:
+            self.on_event(event, self.state)
+        if event.get("action") == "end_channel":
+            self._stopped.set()
+            self._stop_polling()
+
+    def _listen(self):
+        """ (RoomWatcher) -> NoneType
+
+        Stream events, switching to polling while the stream fails.
+        """
+        failures = 0
+        while not self.stopped:
+            try:
+                messages = self.subscriber.poll()
+            except Exception: # pylint: disable=broad-except
+                if self.stopped:
+                    return
+                self.streaming = False
+                self._start_polling()
+                failures += 1
+                delay = min(self.max_backoff, 2 ** failures)
+                self._stopped.wait(random.uniform(delay / 2, delay))
+                continue
+            if not self.streaming:
+                self.streaming = True
+                self._stop_polling()
+                if failures:
+                    # Catch up with what PubNub did not buffer while the stream was down.
+                    self._poll()
+                failures = 0
+            with self._lock:
+                events = [
+                    message for _, message in messages
+                    if isinstance(message, dict) and self.state.apply(message)
+                ]
+            for event in events:
+                if self.stopped:
+                    return
+                self._report(event)
+
+    def _start_polling(self):
+        """ (RoomWatcher) -> NoneType """
+        with self._lock:
+            if self._poll_task is None and not self.stopped:
+                self._poll_task = self.scheduler.every(self.poll_interval, self._poll, jitter=1, delay=0)
+
+    def _stop_polling(self):
+        """ (RoomWatcher) -> NoneType """
+        with self._lock:
+            if self._poll_task is not None:
+                self._poll_task.cancel()
+                self._poll_task = None
+
+    def _poll(self):
+        """ (RoomWatcher) -> bool
+
+        Refresh the state with `get_channel`.
+        """
+        if self.stopped:
+            return False
+        try:
+            channel_info = self.client.get_channel(self.state.channel)
+        except Exception: # pylint: disable=broad-except
+            return True
+        with self._lock:
+            events = self.state.sync(channel_info)
+        for event in events:
+            self._report(event)
+        if self.on_poll is not None:
+            self.on_poll(self.snapshot())
+        return not self.stopped
+
+    def wait(self, timeout=None):
+        """ (RoomWatcher, float) -> bool
+
+        Block until the watcher stops (room ended or `stop()`). Return True if it did.
+        """
+        return self._stopped.wait(timeout)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def __repr__(self):
+        mode = "streaming" if self.streaming else "polling"
+        return f"RoomWatcher({self.state.channel}, {mode}, users={len(self.state)})"
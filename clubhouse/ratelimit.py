@@ -0,0 +1,354 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+ratelimit.py
+
+Client-side throttling and retries.
+Requests are paced by per-endpoint token buckets whose rate adapts to the server
+(additive increase on successful requests that had to wait for a token,
+multiplicative decrease on 429 and `Retry-After`),
+failed idempotent requests are retried with jittered exponential backoff,
+and a global cap bounds the number of requests in flight.
+
+One `RateLimiter` can be shared by several clients, threads and asyncio tasks.
+
+>>> limiter = RateLimiter(rate=5, max_concurrency=8)
+>>> clubhouse = Clubhouse(user_id, user_token, user_device, ratelimit=limiter)
+"""
+
+import sys
+import time
+import random
+import threading
+import collections
+from .endpoints import is_idempotent
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Default `max_rate`, as a multiple of the initial rate of the endpoint.
+MAX_RATE_FACTOR = 4
+
+def retry_exceptions():
+    """ () -> tuple of type
+
+    Exceptions of failed requests worth a retry. asyncio and aiohttp errors
+    cannot be raised before those modules are loaded, so they are looked up
+    when needed instead of importing them here.
+    """
+    exceptions = (OSError,)
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is not None:
+        exceptions += (asyncio.TimeoutError,)
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None:
+        exceptions += (aiohttp.ClientError,)
+    return exceptions
+
+def parse_retry_after(value):
+    """ (str) -> float
+
+    Return the delay of a `Retry-After` header in seconds, or None.
+    Only the delta-seconds form is supported.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """
+    TokenBucket Class
+
+    Thread-safe token bucket with an adjustable rate.
+    `reserve()` takes a token right away and returns how long the caller must wait,
+    so waiting callers are served in order whether they sleep in a thread or a task.
+    """
+
+    def __init__(self, rate, burst, min_rate, max_rate):
+        """ (TokenBucket, float, int, float, float) -> NoneType """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.decreased = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """ (TokenBucket) -> float
+
+        Take one token and return the seconds to wait before using it.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.blocked_until - now)
+
+    def increase(self, step):
+        """ (TokenBucket, float) -> NoneType """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def decrease(self, factor, retry_after=None):
+        """ (TokenBucket, float, float) -> NoneType
+
+        Slow down after a 429, and stop sending for `retry_after` seconds if given.
+        Requests already in flight at the previous rate are answered with 429s as well,
+        so the rate is decreased at most once per period of the rate.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+            if now - self.decreased < 1 / self.rate:
+                return
+            self.decreased = now
+            self.rate = max(self.min_rate, self.rate * factor)
+            self.tokens = min(self.tokens, 0.0)
+
+
+class ConcurrencyLimit:
+    """
+    ConcurrencyLimit Class
+
+    Counting semaphore usable from threads (`acquire()`) and asyncio tasks (`await aacquire()`) at once.
+    Waiters are woken up in arrival order, whichever event loop or thread they are waiting on.
+    """
+
+    def __init__(self, limit):
+        """ (ConcurrencyLimit, int) -> NoneType """
+        self.limit = limit
+        self.active = 0
+        self._waiters = collections.deque()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """ (ConcurrencyLimit) -> NoneType """
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self):
+        """ (ConcurrencyLimit) -> NoneType """
+        import asyncio # pylint: disable=import-outside-toplevel
+        with self._lock:
+            if self.active < self.limit and not self._waiters:
+                self.active += 1
+                return
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiters.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if (loop, future) in self._waiters:
+                    self._waiters.remove((loop, future))
+                    raise
+            # The slot was handed over while cancelling; pass it on.
+            self.release()
+            raise
+
+    def release(self):
+        """ (ConcurrencyLimit) -> NoneType
+
+        Free a slot, or hand it over to the oldest waiter.
+        """
+        with self._lock:
+            if not self._waiters:
+                self.active -= 1
+                return
+            waiter = self._waiters.popleft()
+        if isinstance(waiter, threading.Event):
+            waiter.set()
+        else:
+            loop, future = waiter
+            loop.call_soon_threadsafe(_wake, future)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.aacquire()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+def _wake(future):
+    """ (asyncio.Future) -> NoneType """
+    if not future.done():
+        future.set_result(None)
+
+
+class RateLimiter:
+    """
+    RateLimiter Class
+
+    Paces, caps and retries requests of every client it is passed to.
+
+        rate:
+            - initial requests per second of each endpoint.
+        burst:
+            - requests an endpoint may send at once after being idle.
+        rates:
+            - {endpoint: requests per second} overriding `rate`.
+        min_rate / max_rate:
+            - bounds of the adaptive rate. `max_rate` defaults to `MAX_RATE_FACTOR`
+              times the initial rate of each endpoint.
+        increase:
+            - requests per second added after a successful response to a request
+              that was held back by its bucket. Below the rate, it stays unchanged.
+        decrease:
+            - factor applied to the rate after a 429.
+        max_concurrency:
+            - requests in flight at once, over all endpoints.
+        retries:
+            - retries of a failed request. 429s are retried for every request,
+              5xx and connection errors only for idempotent ones.
+        backoff / max_backoff:
+            - base and cap in seconds of the jittered exponential backoff.
+    """
+
+    def __init__(self, rate=5.0, burst=10, rates=None, min_rate=0.2, max_rate=None, increase=0.2,
+                 decrease=0.5, max_concurrency=16, retries=3, backoff=0.5, max_backoff=30.0):
+        """ (RateLimiter, float, int, dict, float, float, float, float, int, int, float, float) -> NoneType """
+        self.rate = rate
+        self.burst = burst
+        self.rates = dict(rates or {})
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.concurrency = ConcurrencyLimit(max_concurrency)
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, endpoint):
+        """ (RateLimiter, str) -> TokenBucket """
+        bucket = self._buckets.get(endpoint)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(endpoint)
+                if bucket is None:
+                    rate = self.rates.get(endpoint, self.rate)
+                    max_rate = max(rate, self.max_rate) if self.max_rate else rate * MAX_RATE_FACTOR
+                    bucket = self._buckets[endpoint] = TokenBucket(rate, self.burst, self.min_rate, max_rate)
+        return bucket
+
+    def rates_snapshot(self):
+        """ (RateLimiter) -> dict
+
+        Return the current rate of every endpoint used so far.
+        """
+        with self._lock:
+            return {endpoint: bucket.rate for endpoint, bucket in self._buckets.items()}
+
+    def _backoff(self, attempt):
+        """ (RateLimiter, int) -> float """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def _retry_delay(self, endpoint, method, resp, attempt, retry, throttled):
+        """ (RateLimiter, str, str, Response, int, bool, bool) -> float
+
+        Adapt the rate to a response and return the delay before retrying it, or None.
+        The rate is only raised when the request had to wait for its bucket (`throttled`),
+        so a client sending below the rate does not grow it without ever testing it.
+        """
+        bucket = self.bucket(endpoint)
+        status = resp.status_code
+        if status == 429:
+            retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+            bucket.decrease(self.decrease, retry_after)
+            if not retry or attempt >= self.retries:
+                return None
+            if retry_after is not None:
+                return retry_after + random.uniform(0, self.backoff)
+            return self._backoff(attempt)
+        if status < 400:
+            if throttled:
+                bucket.increase(self.increase)
+            return None
+        if status in RETRY_STATUSES and retry and attempt < self.retries and is_idempotent(method, endpoint):
+            return self._backoff(attempt)
+        return None
+
+    def _error_delay(self, endpoint, method, attempt, retry):
+        """ (RateLimiter, str, str, int, bool) -> float """
+        if retry and attempt < self.retries and is_idempotent(method, endpoint):
+            return self._backoff(attempt)
+        return None
+
+    def run(self, endpoint, method, send, on_retry=None, retry=True):
+        """ (RateLimiter, str, str, callable, callable, bool) -> Response
+
+        Call `send()` within the limits, retrying it when possible.
+        `on_retry(endpoint)` is called before every retry.
+        """
+        attempt = 0
+        while True:
+            wait = self.bucket(endpoint).reserve()
+            if wait > 0:
+                time.sleep(wait)
+            with self.concurrency:
+                try:
+                    resp = send()
+                except retry_exceptions():
+                    delay = self._error_delay(endpoint, method, attempt, retry)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._retry_delay(endpoint, method, resp, attempt, retry, wait > 0)
+                    if delay is None:
+                        return resp
+            attempt += 1
+            if on_retry is not None:
+                on_retry(endpoint)
+            time.sleep(delay)
+
+    async def arun(self, endpoint, method, send, on_retry=None, retry=True):
+        """ (RateLimiter, str, str, callable, callable, bool) -> Response
+
+        asyncio version of `run()`. `send()` returns a coroutine.
+        """
+        import asyncio # pylint: disable=import-outside-toplevel
+        attempt = 0
+        while True:
+            wait = self.bucket(endpoint).reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self.concurrency:
+                try:
+                    resp = await send()
+                except retry_exceptions():
+                    delay = self._error_delay(endpoint, method, attempt, retry)
+                    if delay is None:
+                        raise
+                else:
+                    delay = self._retry_delay(endpoint, method, resp, attempt, retry, wait > 0)
+                    if delay is None:
+                        return resp
+            attempt += 1
+            if on_retry is not None:
+                on_retry(endpoint)
+            await asyncio.sleep(delay)
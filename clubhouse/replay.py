@@ -0,0 +1,270 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+replay.py
+
+Record real request/response pairs and replay them without any network access.
+Recordings are append-only JSON lines, one exchange per line:
+
+    {"method":"POST","endpoint":"get_channel","query":null,"body":{...},"status":200,"latency":0.081,"response":{...}}
+
+Request headers (Authorization, CH-UserID, CH-DeviceId, Cookie) are never written and
+secret fields of request and response bodies (account and room tokens, phone numbers,
+emails, ...) are redacted at any depth, so recordings can be shared.
+
+>>> clubhouse = Clubhouse(user_id, user_token, user_device, transport=RecordingTransport(RequestsTransport(), "session.jsonl"))
+>>> clubhouse = Clubhouse(user_id, user_token, user_device, transport=ReplayTransport("session.jsonl", speed=0))
+"""
+
+import json
+import time
+import asyncio
+import threading
+import collections
+from urllib.parse import urlsplit
+from .transport import Transport, Response
+from .codec import get_codec
+from .endpoints import secret_keys
+
+REDACTED = "(redacted)"
+# Anywhere in request and response bodies: the secret parameters of the endpoint table
+# as sent on the wire, and the secrets found in responses.
+REDACTED_FIELDS = secret_keys() | frozenset((
+    # Credentials of the account
+    "auth_token", "access_token", "refresh_token",
+    # Credentials of a room (`join_channel`): Agora, Agora RTM and PubNub
+    "token", "rtm_token", "pubnub_token",
+    # Contact details (`me`, profiles, contacts)
+    "phone_number", "email",
+))
+RECORDED_RESPONSE_HEADERS = ("Content-Type", "ETag", "Retry-After")
+
+def _split_url(url):
+    """ (str) -> (str, str)
+
+    Return the endpoint (last path component) and the query string of a request URL.
+    """
+    parts = urlsplit(url)
+    return parts.path.rsplit("/", 1)[-1], parts.query or None
+
+def _redact(value):
+    """ (object) -> object
+
+    Return a copy of a JSON value with every secret field replaced, at any depth.
+    """
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in REDACTED_FIELDS and item else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact(item) for item in value]
+    return value
+
+
+class RecordingTransport(Transport):
+    """
+    RecordingTransport Class
+
+    Wrap another transport and append every exchange to `path`.
+    Works with both `RequestsTransport` and `AiohttpTransport`.
+
+        inner:
+            - the transport doing the actual requests.
+        path:
+            - JSON lines file the exchanges are appended to.
+    """
+
+    def __init__(self, inner, path):
+        """ (RecordingTransport, Transport, str) -> NoneType """
+        self.inner = inner
+        self.path = path
+        self.codec = inner.codec
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def encode(self, value):
+        """ (RecordingTransport, object) -> bytes """
+        return self.inner.encode(value)
+
+    def decode(self, response):
+        """ (RecordingTransport, Response) -> object """
+        return self.inner.decode(response)
+
+    def request_size(self, response):
+        """ (RecordingTransport, Response) -> int """
+        return self.inner.request_size(response)
+
+    def request(self, method, url, headers=None, json=None, files=None):
+        """ (RecordingTransport, str, str, dict, dict, dict) -> Response """
+        start = time.perf_counter()
+        resp = self.inner.request(method, url, headers=headers, json=json, files=files)
+        if asyncio.iscoroutine(resp):
+            return self._record_async(resp, start, method, url, headers, json, files)
+        self.record(method, url, headers, json, files, resp, time.perf_counter() - start)
+        return resp
+
+    async def _record_async(self, coro, start, method, url, headers, json, files):
+        """ (RecordingTransport, coroutine, float, ...) -> Response """
+        resp = await coro
+        self.record(method, url, headers, json, files, resp, time.perf_counter() - start)
+        return resp
+
+    def record(self, method, url, headers, json, files, resp, latency):
+        """ (RecordingTransport, str, str, dict, dict, dict, Response, float) -> NoneType
+
+        Append one redacted exchange to the recording. `headers` are left out on purpose.
+        """
+        endpoint, query = _split_url(url)
+        entry = {
+            "method": method,
+            "endpoint": endpoint,
+            "query": query,
+            "body": _redact(json),
+            "status": resp.status_code,
+            "latency": round(latency, 4),
+        }
+        if files:
+            entry["files"] = sorted(files)
+        entry["response_headers"] = {
+            key: resp.headers[key] for key in RECORDED_RESPONSE_HEADERS if key in resp.headers
+        }
+        try:
+            entry["response"] = _redact(self.inner.decode(resp))
+        except ValueError:
+            entry["content"] = resp.content.decode("utf-8", "replace")
+        line = get_codec().dumps(entry).decode("utf-8")
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        """ (RecordingTransport) -> NoneType
+
+        Close the recording and the wrapped transport.
+        """
+        with self._lock:
+            self._file.close()
+        return self.inner.close()
+
+
+class ReplayTransport(Transport):
+    """
+    ReplayTransport Class
+
+    Serve the exchanges of a recording without any network access.
+    Requests are matched on method, endpoint, query and body first, then on method and endpoint only.
+    Matching exchanges are served in recorded order and start over once exhausted,
+    so a recording can be replayed as many times as needed.
+
+        path:
+            - recording written by `RecordingTransport`.
+        speed:
+            - 1 replays at the recorded latency, 10 ten times faster, 0 without any delay.
+        codec:
+            - JSON backend name or `Codec`. Defaults to the fastest installed one.
+    """
+
+    def __init__(self, path, speed=1.0, codec=None):
+        """ (ReplayTransport, str, float, Codec) -> NoneType """
+        self.set_codec(codec)
+        self.path = path
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._exact = collections.defaultdict(list)
+        self._loose = collections.defaultdict(list)
+        self._served = collections.Counter()
+        self.load(path)
+
+    @staticmethod
+    def _key(method, endpoint, query, body):
+        """ (str, str, str, dict) -> tuple """
+        return (method, endpoint, query, json.dumps(_redact(body), sort_keys=True, default=str) if body is not None else None)
+
+    def load(self, path):
+        """ (ReplayTransport, str) -> int
+
+        Load a recording and return the number of exchanges read.
+        """
+        loads = get_codec().loads
+        count = 0
+        with open(path, "rb") as recording:
+            for line in recording:
+                if not line.strip():
+                    continue
+                entry = loads(line)
+                if "response" in entry:
+                    content = self.codec.dumps(entry["response"])
+                else:
+                    content = entry.get("content", "").encode("utf-8")
+                exchange = (entry["status"], entry.get("response_headers", {}), content, entry.get("latency", 0.0))
+                key = self._key(entry["method"], entry["endpoint"], entry.get("query"), entry.get("body"))
+                self._exact[key].append(exchange)
+                self._loose[entry["method"], entry["endpoint"]].append(exchange)
+                count += 1
+        return count
+
+    def _next(self, method, url, json):
+        """ (ReplayTransport, str, str, dict) -> tuple
+
+        Return the next recorded (status, headers, content, latency) for a request.
+        """
+        endpoint, query = _split_url(url)
+        key = self._key(method, endpoint, query, json)
+        if key not in self._exact:
+            key = (method, endpoint)
+            if key not in self._loose:
+                raise Exception(f"No recorded response for {method} {endpoint}")
+            exchanges = self._loose[key]
+        else:
+            exchanges = self._exact[key]
+        with self._lock:
+            index = self._served[key] % len(exchanges)
+            self._served[key] += 1
+        return exchanges[index]
+
+    def _delay(self, latency):
+        """ (ReplayTransport, float) -> float """
+        return latency / self.speed if self.speed else 0.0
+
+    def request(self, method, url, headers=None, json=None, files=None):
+        """ (ReplayTransport, str, str, dict, dict, dict) -> Response """
+        status, response_headers, content, latency = self._next(method, url, json)
+        delay = self._delay(latency)
+        if delay:
+            time.sleep(delay)
+        return Response(status, dict(response_headers), content)
+
+    def rewind(self):
+        """ (ReplayTransport) -> NoneType
+
+        Serve every exchange from the beginning again.
+        """
+        with self._lock:
+            self._served.clear()
+
+
+class AsyncReplayTransport(ReplayTransport):
+    """
+    AsyncReplayTransport Class
+
+    `ReplayTransport` for `AsyncClubhouse`. `request()` and `close()` are coroutines here.
+    """
+
+    async def request(self, method, url, headers=None, json=None, files=None):
+        """ (AsyncReplayTransport, str, str, dict, dict, dict) -> Response """
+        status, response_headers, content, latency = self._next(method, url, json)
+        delay = self._delay(latency)
+        if delay:
+            await asyncio.sleep(delay)
+        return Response(status, dict(response_headers), content)
+
+    async def close(self):
+        """ (AsyncReplayTransport) -> NoneType """
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
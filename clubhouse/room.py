@@ -0,0 +1,270 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+room.py
+
+Local model of a room, kept up to date from in-room events
+(see `clubhouse.pubnub`) or from `get_channel` polls.
+
+Events are the dicts sent over PubNub, such as
+    {"action": "join_channel", "channel": "xxxx", "user_profile": {...}}
+    {"action": "leave_channel", "channel": "xxxx", "user_id": 1234}
+"""
+
+import itertools
+
+def is_room_gone(channel_info):
+    """ (dict) -> bool
+
+    True when a failed `get_channel` means the room is gone (404, or the server
+    saying so), rather than a transient failure such as a 5xx or a 429.
+    """
+    if channel_info.get("success", True):
+        return False
+    if channel_info.get("status_code") == 404:
+        return True
+    return "no longer available" in str(channel_info.get("error_message") or "")
+
+
+class RoomState:
+    """
+    RoomState Class
+
+    Members of one room, keyed by user_id, in the order of the room.
+    Speakers, moderators and hand-raisers are kept in secondary indexes,
+    so every event is applied in O(1) and no query rescans the whole room.
+
+    `apply()` updates it from a single event and `sync()` from a full `get_channel` response.
+    Treat `users` and the user dicts as read-only; change them through `apply()`.
+    """
+
+    def __init__(self, channel, channel_id=None, topic=None, club=None, users=()):
+        """ (RoomState, str, int, str, dict, list of dict) -> NoneType """
+        self.channel = channel
+        self.channel_id = channel_id
+        self.topic = topic
+        self.club = club
+        self.invited_by = None
+        self.ended = False
+        self._reset(users)
+
+    def _reset(self, users):
+        """ (RoomState, list of dict) -> NoneType """
+        self.users = {}
+        # dicts are used as insertion-ordered sets
+        self._speakers = {}
+        self._moderators = {}
+        self._hand_raisers = {}
+        for user in users:
+            self._add(dict(user))
+
+    def _index(self, user_id, user):
+        """ (RoomState, int, dict) -> NoneType
+
+        Put the user in the indexes matching its flags, and out of the others.
+        """
+        for index, flag in ((self._speakers, "is_speaker"), (self._moderators, "is_moderator"), (self._hand_raisers, "raise_hands")):
+            if user.get(flag):
+                index[user_id] = None
+            else:
+                index.pop(user_id, None)
+
+    def _add(self, user):
+        """ (RoomState, dict) -> int """
+        user_id = int(user["user_id"])
+        self.users[user_id] = user
+        self._index(user_id, user)
+        return user_id
+
+    def _remove(self, user_id):
+        """ (RoomState, int) -> dict """
+        user = self.users.pop(user_id, None)
+        if user is not None:
+            self._speakers.pop(user_id, None)
+            self._moderators.pop(user_id, None)
+            self._hand_raisers.pop(user_id, None)
+        return user
+
+    @classmethod
+    def from_channel(cls, channel_info):
+        """ (type, dict) -> RoomState
+
+        Build the state from a `join_channel` or `get_channel` response.
+        """
+        return cls(
+            channel_info["channel"],
+            channel_info.get("channel_id"),
+            channel_info.get("topic"),
+            channel_info.get("club"),
+            channel_info.get("users") or ()
+        )
+
+    def __len__(self):
+        return len(self.users)
+
+    def __contains__(self, user_id):
+        return int(user_id) in self.users
+
+    def get(self, user_id):
+        """ (RoomState, int) -> dict """
+        return self.users.get(int(user_id))
+
+    @property
+    def speakers(self):
+        """ (RoomState) -> list of dict """
+        users = self.users
+        return [users[user_id] for user_id in self._speakers]
+
+    @property
+    def moderators(self):
+        """ (RoomState) -> list of dict """
+        users = self.users
+        return [users[user_id] for user_id in self._moderators]
+
+    @property
+    def hand_raisers(self):
+        """ (RoomState) -> list of dict """
+        users = self.users
+        return [users[user_id] for user_id in self._hand_raisers]
+
+    @property
+    def num_speakers(self):
+        """ (RoomState) -> int """
+        return len(self._speakers)
+
+    def is_speaker(self, user_id):
+        """ (RoomState, int) -> bool """
+        return int(user_id) in self._speakers
+
+    def is_moderator(self, user_id):
+        """ (RoomState, int) -> bool """
+        return int(user_id) in self._moderators
+
+    def has_raised_hand(self, user_id):
+        """ (RoomState, int) -> bool """
+        return int(user_id) in self._hand_raisers
+
+    def top(self, count):
+        """ (RoomState, int) -> list of dict
+
+        Return the first `count` members, speakers first, like the room screen of the app.
+        Costs O(count + number of speakers), whatever the size of the audience.
+        """
+        users = self.users
+        result = [users[user_id] for user_id in itertools.islice(self._speakers, count)]
+        if len(result) < count:
+            speakers = self._speakers
+            for user_id, user in users.items():
+                if user_id not in speakers:
+                    result.append(user)
+                    if len(result) >= count:
+                        break
+        return result
+
+    def to_dict(self):
+        """ (RoomState) -> dict
+
+        Return the state in the form of a `get_channel` response.
+        """
+        return {
+            "success": True,
+            "channel": self.channel,
+            "channel_id": self.channel_id,
+            "topic": self.topic,
+            "club": self.club,
+            "users": list(self.users.values()),
+        }
+
+    @staticmethod
+    def _user_id(event):
+        """ (dict) -> int """
+        user_id = event.get("user_id")
+        if user_id is None:
+            user_id = (event.get("user_profile") or {}).get("user_id")
+        return int(user_id) if user_id is not None else None
+
+    def _update(self, event, **fields):
+        """ (RoomState, dict, ...) -> bool
+
+        Set fields of the user of an event, adding the user if the event has a profile.
+        """
+        user_id = self._user_id(event)
+        user = self.users.get(user_id)
+        if user is None:
+            profile = event.get("user_profile")
+            if not profile:
+                return False
+            user = dict(profile)
+            self._add(user)
+        changed = any(user.get(key) != value for key, value in fields.items())
+        user.update(fields)
+        self._index(user_id, user)
+        return changed
+
+    def apply(self, event):
+        """ (RoomState, dict) -> bool
+
+        Apply one event. Return True when it changed the state.
+        """
+        action = event.get("action")
+        if action == "join_channel":
+            user_id = self._user_id(event)
+            if user_id is None or user_id in self.users:
+                return False
+            self._add(dict(event.get("user_profile") or {"user_id": user_id}))
+            return True
+        if action == "leave_channel":
+            return self._remove(self._user_id(event)) is not None
+        if action == "add_speaker":
+            return self._update(event, is_speaker=True, raise_hands=False)
+        if action == "remove_speaker":
+            return self._update(event, is_speaker=False, is_moderator=False)
+        if action == "make_moderator":
+            return self._update(event, is_speaker=True, is_moderator=True)
+        if action == "raise_hands":
+            return self._update(event, raise_hands=True)
+        if action == "unraise_hands":
+            return self._update(event, raise_hands=False)
+        if action == "invite_speaker":
+            self.invited_by = event.get("from_user_id")
+            return True
+        if action == "uninvite_speaker":
+            self.invited_by = None
+            return True
+        if action == "end_channel":
+            self.ended = True
+            return True
+        return False
+
+    def sync(self, channel_info):
+        """ (RoomState, dict) -> list of dict
+
+        Replace the state with a `get_channel` response and return the events
+        that explain the difference, so polling and streaming look the same to callers.
+        A failed response only ends the room when the room is gone (`is_room_gone()`);
+        other failures leave the state as it is.
+        """
+        if not channel_info.get("success", True):
+            if self.ended or not is_room_gone(channel_info):
+                return []
+            self.ended = True
+            return [{"action": "end_channel", "channel": self.channel}]
+        users = {int(user["user_id"]): user for user in channel_info.get("users") or ()}
+        events = []
+        for user_id in self.users.keys() - users.keys():
+            events.append({"action": "leave_channel", "channel": self.channel, "user_id": user_id})
+        for user_id, user in users.items():
+            old = self.users.get(user_id)
+            if old is None:
+                events.append({"action": "join_channel", "channel": self.channel, "user_profile": user})
+            elif user.get("is_moderator") and not old.get("is_moderator"):
+                events.append({"action": "make_moderator", "channel": self.channel, "user_id": user_id})
+            elif user.get("is_speaker") and not old.get("is_speaker"):
+                events.append({"action": "add_speaker", "channel": self.channel, "user_id": user_id})
+            elif old.get("is_speaker") and not user.get("is_speaker"):
+                events.append({"action": "remove_speaker", "channel": self.channel, "user_id": user_id})
+        self.topic = channel_info.get("topic", self.topic)
+        self.club = channel_info.get("club", self.club)
+        self._reset(users.values())
+        return events
@@ -0,0 +1,136 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+rtc.py
+
+Agora voice engine, brought up lazily.
+Loading the Agora SDK and initialising its engine takes a noticeable time,
+so nothing happens until the first `start()` or `join()`. The engine is then
+initialised on a background thread, overlapped with the HTTP calls that
+precede the voice connection (`join_channel`, `active_ping`).
+Calls to the engine run in order on that same thread.
+
+>>> rtc = RtcEngine(Clubhouse.AGORA_KEY)
+>>> rtc.start()
+>>> channel_info = clubhouse.join_channel(channel)
+>>> rtc.join(channel_info["token"], channel, user_id)
+>>> rtc.leave()
+"""
+
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+
+# 0xFFFFFFFE excludes Chinese servers from Agora's servers.
+AREA_CODE_MASK = 0xFFFFFFFE
+
+def is_available():
+    """ () -> bool
+
+    True when the Agora SDK (agorartc) is installed. Does not import it.
+    """
+    return importlib.util.find_spec("agorartc") is not None
+
+
+class RtcEngine:
+    """
+    RtcEngine Class
+
+    Agora `RtcEngineBridge` initialised on first use, on a background thread.
+
+        app_id:
+            - Agora app id (`Clubhouse.AGORA_KEY`).
+        high_quality:
+            - use the high quality stereo audio profile.
+
+    Every method returns a `concurrent.futures.Future` and never blocks,
+    except `close()`.
+    """
+
+    def __init__(self, app_id, high_quality=True):
+        """ (RtcEngine, str, bool) -> NoneType """
+        self.app_id = app_id
+        self.high_quality = high_quality
+        self.engine = None
+        self._handler = None
+        self._started = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self):
+        """ (RtcEngine) -> bool """
+        return self._started is not None
+
+    def start(self):
+        """ (RtcEngine) -> Future
+
+        Start initialising the engine, once. The future is True when the
+        audio profile was applied, and fails with ImportError when the Agora SDK
+        is not installed.
+        """
+        with self._lock:
+            if self._started is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rtc")
+                self._started = self._executor.submit(self._initialize)
+            return self._started
+
+    def _initialize(self):
+        """ (RtcEngine) -> bool """
+        import agorartc # pylint: disable=import-outside-toplevel
+        engine = agorartc.createRtcEngineBridge()
+        handler = agorartc.RtcEngineEventHandlerBase()
+        engine.initEventHandler(handler)
+        engine.initialize(self.app_id, None, agorartc.AREA_CODE_GLOB & AREA_CODE_MASK)
+        self._handler = handler
+        self.engine = engine
+        if not self.high_quality:
+            return True
+        return engine.setAudioProfile(
+            agorartc.AUDIO_PROFILE_MUSIC_HIGH_QUALITY_STEREO,
+            agorartc.AUDIO_SCENARIO_GAME_STREAMING
+        ) >= 0
+
+    def _call(self, name, *args):
+        """ (RtcEngine, str, ...) -> object
+
+        Call an engine method. Runs on the engine thread, after the initialisation.
+        """
+        if self.engine is None:
+            # Initialisation failed; its error is the useful one.
+            self._started.result()
+        return getattr(self.engine, name)(*args)
+
+    def join(self, token, channel, user_id):
+        """ (RtcEngine, str, str, int) -> Future
+
+        Join the voice channel of a room, starting the engine if needed.
+        `token` is the `token` returned by `join_channel`.
+        """
+        self.start()
+        return self._executor.submit(self._call, "joinChannel", token, channel, "", int(user_id))
+
+    def leave(self):
+        """ (RtcEngine) -> Future
+
+        Leave the current voice channel. Does nothing if the engine was never started.
+        """
+        if not self.started:
+            return None
+        return self._executor.submit(self._call, "leaveChannel")
+
+    def close(self):
+        """ (RtcEngine) -> NoneType
+
+        Wait for pending calls and release the engine.
+        """
+        with self._lock:
+            executor, self._executor, self._started = self._executor, None, None
+        if executor is None:
+            return
+        release = getattr(self.engine, "release", None)
+        if release is not None:
+            executor.submit(release)
+        executor.shutdown(wait=True)
+        self.engine = None
@@ -0,0 +1,207 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+scheduler.py
+
+Scheduler for periodic tasks such as `active_ping` or speaker permission polling.
+Every task lives in one heap served by one timer thread, which hands due tasks
+to a small bounded pool of workers. Keeping presence in a thousand rooms costs
+a thousand heap entries and a few threads instead of a thousand threads, and a
+slow request does not hold up the tasks due after it.
+
+>>> task = get_scheduler().every(30, clubhouse.active_ping, channel, jitter=2)
+>>> task.cancel()
+"""
+
+import time
+import heapq
+import random
+import itertools
+import threading
+import traceback
+
+class Task:
+    """
+    Task Class
+
+    Handle of a scheduled call, returned by `Scheduler.every()` and `Scheduler.after()`.
+    """
+
+    __slots__ = ("func", "args", "kwargs", "interval", "jitter", "due", "runs", "cancelled")
+
+    def __init__(self, func, args, kwargs, interval, jitter, due):
+        """ (Task, callable, tuple, dict, float, float, float) -> NoneType """
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.interval = interval
+        self.jitter = jitter
+        self.due = due
+        self.runs = 0
+        self.cancelled = False
+
+    def cancel(self):
+        """ (Task) -> NoneType
+
+        Stop the task. A run already in progress is not interrupted.
+        """
+        self.cancelled = True
+
+    def __repr__(self):
+        name = getattr(self.func, "__name__", repr(self.func))
+        return f"Task({name}, interval={self.interval}, runs={self.runs}, cancelled={self.cancelled})"
+
+
+class Scheduler:
+    """
+    Scheduler Class
+
+    Heap-based scheduler. A daemon timer thread waits for the earliest due task
+    and runs it on a pool of up to `max_workers` threads.
+
+    Periodic tasks are rescheduled from their previous due time rather than from
+    the end of their run, so they do not drift. When a run was late by more than
+    a whole interval, the missed runs are skipped instead of being fired in a burst.
+    Jitter is added to each run separately and never accumulates.
+    A task is never run again before its previous run has returned.
+
+    Tasks may block (HTTP requests, rate limiting); up to `max_workers` of them
+    run at once, and the others wait for a free worker.
+    """
+
+    def __init__(self, name="clubhouse-scheduler", max_workers=16):
+        """ (Scheduler, str, int) -> NoneType """
+        self.name = name
+        self.max_workers = max_workers
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._executor = None
+        self._stopped = False
+
+    def __len__(self):
+        with self._condition:
+            return sum(1 for _, _, task in self._heap if not task.cancelled)
+
+    def every(self, interval, func, *args, jitter=0.0, delay=None, **kwargs):
+        """ (Scheduler, float, callable, ..., float, float, ...) -> Task
+
+        Call `func(*args, **kwargs)` every `interval` seconds, starting after `delay`
+        (one interval by default), until it returns False or the task is cancelled.
+        Each run is moved by a random offset of up to `jitter` seconds either way.
+        """
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        due = time.monotonic() + (interval if delay is None else delay)
+        task = Task(func, args, kwargs, interval, jitter, due)
+        self._push(task)
+        return task
+
+    def after(self, delay, func, *args, **kwargs):
+        """ (Scheduler, float, callable, ...) -> Task
+
+        Call `func(*args, **kwargs)` once after `delay` seconds.
+        """
+        task = Task(func, args, kwargs, None, 0.0, time.monotonic() + delay)
+        self._push(task)
+        return task
+
+    def _push(self, task):
+        """ (Scheduler, Task) -> NoneType """
+        when = task.due
+        if task.jitter:
+            when += random.uniform(-task.jitter, task.jitter)
+        with self._condition:
+            if self._stopped:
+                raise RuntimeError("Scheduler is stopped")
+            heapq.heappush(self._heap, (when, next(self._counter), task))
+            if self._thread is None:
+                from concurrent.futures import ThreadPoolExecutor # pylint: disable=import-outside-toplevel
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is task:
+                self._condition.notify()
+
+    def _run(self):
+        """ (Scheduler) -> NoneType
+
+        Timer loop: sleep until the earliest task is due and hand it to a worker,
+        which reschedules it when the run returns.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    if self._stopped:
+                        return
+                    if self._heap:
+                        when, _, task = self._heap[0]
+                        if task.cancelled:
+                            heapq.heappop(self._heap)
+                            continue
+                        timeout = when - time.monotonic()
+                        if timeout <= 0:
+                            heapq.heappop(self._heap)
+                            break
+                        self._condition.wait(timeout)
+                    else:
+                        self._condition.wait()
+                executor = self._executor
+            try:
+                executor.submit(self._execute, task)
+            except RuntimeError:
+                # Stopped meanwhile
+                return
+
+    def _execute(self, task):
+        """ (Scheduler, Task) -> NoneType """
+        try:
+            ret = task.func(*task.args, **task.kwargs)
+        except Exception: # pylint: disable=broad-except
+            traceback.print_exc()
+            ret = None
+        task.runs += 1
+        if task.interval is None or ret is False:
+            task.cancelled = True
+        if task.cancelled:
+            return
+        now = time.monotonic()
+        task.due += task.interval
+        if task.due <= now:
+            task.due += ((now - task.due) // task.interval + 1) * task.interval
+        try:
+            self._push(task)
+        except RuntimeError:
+            pass
+
+    def stop(self):
+        """ (Scheduler) -> NoneType
+
+        Drop every task and stop the threads. Runs in progress are not interrupted.
+        """
+        with self._condition:
+            self._stopped = True
+            for _, _, task in self._heap:
+                task.cancelled = True
+            self._heap.clear()
+            self._condition.notify()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+def get_scheduler():
+    """ () -> Scheduler
+
+    Return the scheduler shared by the whole process.
+    """
+    global _SCHEDULER # pylint: disable=global-statement
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = Scheduler()
+        return _SCHEDULER
@@ -0,0 +1,165 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+singleflight.py
+
+Request coalescing: concurrent identical reads share one request in flight.
+While a `get_channel(channel)` is on its way, every other caller asking for
+the same channel waits for it and receives the same response instead of sending
+its own. Calls from threads and from asyncio tasks are coalesced together.
+
+Only idempotent requests are coalesced, and nothing is kept once the request
+is finished: unlike a cache, a later call always sends a new request.
+
+>>> clubhouse = Clubhouse(user_id, user_token, user_device, singleflight=SingleFlight())
+"""
+
+import asyncio
+import threading
+import collections
+
+class _Call:
+    """ One request in flight and the callers waiting for it. """
+
+    __slots__ = ("event", "waiters", "value", "error")
+
+    def __init__(self):
+        """ (_Call) -> NoneType """
+        self.event = threading.Event()
+        self.waiters = []
+        self.value = None
+        self.error = None
+
+
+def _settle(future, value, error):
+    """ (asyncio.Future, object, BaseException) -> NoneType """
+    if future.done():
+        return
+    if isinstance(error, asyncio.CancelledError):
+        future.cancel()
+    elif error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(value)
+
+
+class SingleFlight:
+    """
+    SingleFlight Class
+
+    Thread-safe table of the calls in flight, keyed by request.
+    Keys are tuples starting with the endpoint, like cache keys.
+    One instance can be shared by several clients, sync and async.
+
+    `requests` counts the calls that sent a request, and `collapsed` the calls
+    that shared the request of another one, per endpoint. Keys themselves are
+    not kept, as they hold request bodies and would pile up.
+    """
+
+    def __init__(self):
+        """ (SingleFlight) -> NoneType """
+        self.requests = 0
+        self.collapsed = collections.Counter()
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._inflight)
+
+    def _join(self, key):
+        """ (SingleFlight, tuple) -> (_Call, bool)
+
+        Return the call in flight for `key` and False, or a new call and True.
+        Must be called with the lock held.
+        """
+        call = self._inflight.get(key)
+        if call is not None:
+            self.collapsed[key[0]] += 1
+            return call, False
+        call = self._inflight[key] = _Call()
+        self.requests += 1
+        return call, True
+
+    def _finish(self, key, call, value, error):
+        """ (SingleFlight, tuple, _Call, object, BaseException) -> NoneType
+
+        Hand the outcome of a call to every caller waiting for it.
+        """
+        with self._lock:
+            if self._inflight.get(key) is call:
+                del self._inflight[key]
+            call.value = value
+            call.error = error
+            waiters, call.waiters = call.waiters, None
+        call.event.set()
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_settle, future, value, error)
+
+    def do(self, key, func):
+        """ (SingleFlight, tuple, callable) -> (object, bool)
+
+        Call `func()` unless a call with the same key is in flight, in which case
+        wait for that one. Return the result and whether it was shared.
+        An exception raised by the call is raised in every caller sharing it.
+        """
+        with self._lock:
+            call, leader = self._join(key)
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value, True
+        try:
+            value = func()
+        except BaseException as exc:
+            self._finish(key, call, None, exc)
+            raise
+        self._finish(key, call, value, None)
+        return value, False
+
+    async def ado(self, key, func):
+        """ (SingleFlight, tuple, callable) -> (object, bool)
+
+        asyncio version of `do()`. `func()` returns a coroutine.
+        The shared request runs in a task of its own, so cancelling the caller
+        that started it does not cancel it for the others.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call, leader = self._join(key)
+            if not leader:
+                future = loop.create_future()
+                call.waiters.append((loop, future))
+        if not leader:
+            return await future, True
+        task = asyncio.ensure_future(func())
+
+        def done(task):
+            if task.cancelled():
+                self._finish(key, call, None, asyncio.CancelledError())
+            else:
+                self._finish(key, call, None if task.exception() else task.result(), task.exception())
+
+        task.add_done_callback(done)
+        return await asyncio.shield(task), False
+
+    def stats(self, top=None):
+        """ (SingleFlight, int) -> dict
+
+        Return the number of requests sent, of calls collapsed,
+        and the (endpoint, calls collapsed) of the `top` most collapsed endpoints.
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "collapsed": sum(self.collapsed.values()),
+                "endpoints": self.collapsed.most_common(top),
+            }
+
+    def reset(self):
+        """ (SingleFlight) -> NoneType """
+        with self._lock:
+            self.requests = 0
+            self.collapsed.clear()
@@ -0,0 +1,170 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+store.py
+
+SQLite-backed response cache that survives restarts.
+Responses older than their TTL are still served (stale-while-revalidate)
+while the client refreshes them in the background.
+"""
+
+import os
+import sys
+import json
+import time
+import sqlite3
+from .cache import MISS, ResponseCache
+
+def default_cache_path(filename="cache.sqlite3"):
+    """ (str) -> str
+
+    Return the path of the cache file under the user's config directory.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    return os.path.join(base, "clubhouse-py", filename)
+
+
+class PersistentCache(ResponseCache):
+    """
+    PersistentCache Class
+
+    Same interface as `ResponseCache`, stored in a SQLite file.
+    TTLs are the `ttl`s of the endpoint table, like those of `ResponseCache`.
+
+        path:
+            - location of the database. Defaults to `default_cache_path()`.
+        namespace:
+            - keeps responses of different accounts apart (e.g. the user_id).
+        max_stale:
+            - seconds a response may be served after its TTL expired while it is being refreshed.
+    """
+
+    def __init__(self, path=None, namespace="", maxsize=20000, ttls=None, invalidates=None, max_stale=7 * 86400):
+        """ (PersistentCache, str, str, int, dict, dict, int) -> NoneType """
+        super().__init__(maxsize=maxsize, ttls=ttls, invalidates=invalidates)
+        self.path = path if path else default_cache_path()
+        self.namespace = str(namespace)
+        self.max_stale = max_stale
+        self.stale_hits = {}
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, endpoint TEXT NOT NULL, value TEXT NOT NULL,"
+            " etag TEXT, stored REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def _dump_key(self, key):
+        """ (PersistentCache, tuple) -> str """
+        return json.dumps([self.namespace, *key])
+
+    def lookup(self, key):
+        """ (PersistentCache, tuple) -> (dict, bool)
+
+        Return the cached response and whether it is still fresh.
+        Responses past their TTL but within `max_stale` are returned as not fresh.
+        """
+        endpoint = key[0]
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, stored FROM responses WHERE key = ?", (self._dump_key(key),)
+            ).fetchone()
+            if row is not None:
+                age = now - row[1]
+                ttl = self.ttls[endpoint]
+                if age <= ttl + self.max_stale:
+                    self._db.execute(
+                        "UPDATE responses SET accessed = ? WHERE key = ?", (now, self._dump_key(key))
+                    )
+                    counter = self.hits if age <= ttl else self.stale_hits
+                    counter[endpoint] = counter.get(endpoint, 0) + 1
+                    return json.loads(row[0]), age <= ttl
+            self.misses[endpoint] = self.misses.get(endpoint, 0) + 1
+            return MISS, False
+
+    def get(self, key):
+        """ (PersistentCache, tuple) -> dict
+
+        Return the cached response only if it is still fresh, otherwise `MISS`.
+        """
+        value, fresh = self.lookup(key)
+        return value if fresh else MISS
+
+    def etag(self, key):
+        """ (PersistentCache, tuple) -> str """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag FROM responses WHERE key = ?", (self._dump_key(key),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def touch(self, key):
+        """ (PersistentCache, tuple) -> NoneType
+
+        Mark a response as fresh again (e.g. after `304 Not Modified`).
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET stored = ? WHERE key = ?", (time.time(), self._dump_key(key))
+            )
+
+    def set(self, key, value, etag=None):
+        """ (PersistentCache, tuple, dict, str) -> NoneType """
+        if not isinstance(value, dict) or not value.get("success", True):
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, value, etag, stored, accessed)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (self._dump_key(key), key[0], json.dumps(value), etag, now, now)
+            )
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.maxsize:
+                self._db.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY accessed LIMIT ?)",
+                    (count - self.maxsize,)
+                )
+
+    def invalidate(self, endpoint=None, key=None):
+        """ (PersistentCache, str, tuple) -> int """
+        with self._lock:
+            if key is not None:
+                cursor = self._db.execute("DELETE FROM responses WHERE key = ?", (self._dump_key(key),))
+            elif endpoint is not None:
+                cursor = self._db.execute(
+                    "DELETE FROM responses WHERE endpoint = ? AND key LIKE ?",
+                    (endpoint, json.dumps([self.namespace])[:-1] + ",%")
+                )
+            else:
+                cursor = self._db.execute(
+                    "DELETE FROM responses WHERE key LIKE ?", (json.dumps([self.namespace])[:-1] + ",%",)
+                )
+            return cursor.rowcount
+
+    def stats(self):
+        """ (PersistentCache) -> dict """
+        stats = super().stats()
+        with self._lock:
+            for endpoint, count in self.stale_hits.items():
+                stats.setdefault(endpoint, {"hits": 0, "misses": 0})["stale_hits"] = count
+        return stats
+
+    def close(self):
+        """ (PersistentCache) -> NoneType """
+        with self._lock:
+            self._db.close()
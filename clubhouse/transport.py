@@ -0,0 +1,268 @@
+#!/usr/bin/python -u
+#-*- coding: utf-8 -*-
+
+"""
+transport.py
+
+HTTP transports used by the Clubhouse client.
+A transport owns the connection pool, so every request made by the client
+reuses keep-alive connections instead of doing a fresh TCP/TLS handshake.
+
+`requests` and `aiohttp` take far longer to import than the rest of the library,
+so they are only imported when a transport sends its first request.
+"""
+
+import time
+import threading
+import importlib.util
+from .codec import Codec, get_codec
+
+AIOHTTP_REQUIRED = "aiohttp is required for the asyncio client. (pip3 install aiohttp)"
+
+def _import_aiohttp():
+    """ () -> module """
+    try:
+        import aiohttp # pylint: disable=import-outside-toplevel
+    except ImportError:
+        raise ImportError(AIOHTTP_REQUIRED) from None
+    return aiohttp
+
+class Response:
+    """
+    Response Class
+
+    Minimal response object returned by transports that do not use `requests`.
+    """
+
+    def __init__(self, status_code, headers, content, request_size=0):
+        """ (Response, int, dict, bytes, int) -> NoneType """
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.request_size = request_size
+
+    def json(self):
+        """ (Response) -> dict """
+        return get_codec().loads(self.content)
+
+class Transport:
+    """
+    Transport Class
+
+    Base class of every transport. Subclasses only need to implement `request()`
+    and return an object with `status_code`, `headers`, `content` and `json()`.
+    Request bodies and responses are encoded/decoded with `self.codec`
+    (see `clubhouse.codec`), which defaults to the fastest installed JSON backend.
+    """
+
+    codec = None
+
+    def set_codec(self, codec=None):
+        """ (Transport, Codec or str) -> NoneType
+
+        Select the JSON backend by name ("orjson", "msgspec", "json") or as a `Codec`.
+        """
+        self.codec = codec if isinstance(codec, Codec) else get_codec(codec)
+
+    def encode(self, value):
+        """ (Transport, object) -> bytes """
+        if self.codec is None:
+            self.set_codec()
+        return self.codec.dumps(value)
+
+    def decode(self, response):
+        """ (Transport, Response) -> object """
+        if self.codec is None:
+            self.set_codec()
+        return self.codec.loads(response.content)
+
+    def request(self, method, url, headers=None, json=None, files=None):
+        """ (Transport, str, str, dict, dict, dict) -> Response
+
+        Send a single request.
+        """
+        raise NotImplementedError("Not Implemented!")
+
+    def request_size(self, response):
+        """ (Transport, Response) -> int
+
+        Number of body bytes sent for the request of `response`.
+        """
+        return getattr(response, "request_size", 0)
+
+    def get(self, url, **kwargs):
+        """ (Transport, str, ...) -> Response """
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        """ (Transport, str, ...) -> Response """
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        """ (Transport) -> NoneType
+
+        Release every pooled connection.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RequestsTransport(Transport):
+    """
+    RequestsTransport Class
+
+    Keep-alive transport backed by a pooled `requests.Session`.
+
+        pool_connections:
+            - number of per-host connection pools to keep.
+        pool_maxsize:
+            - maximum number of connections kept alive per host.
+        pool_block:
+            - block instead of opening extra connections once the pool is full.
+        idle_timeout:
+            - seconds a pool may stay unused before it is dropped and rebuilt.
+              Servers close idle keep-alive connections on their own,
+              so reusing them after a long pause only costs a failed request.
+        timeout:
+            - (connect, read) timeout passed to every request.
+        codec:
+            - JSON backend name or `Codec`. Defaults to the fastest installed one.
+    """
+
+    def __init__(self, pool_connections=4, pool_maxsize=16, pool_block=False, idle_timeout=60, timeout=(5, 30), codec=None):
+        """ (RequestsTransport, int, int, bool, int, tuple, Codec) -> NoneType """
+        self.set_codec(codec)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._last_used = time.monotonic()
+        self._session = None
+
+    def _create_session(self):
+        """ (RequestsTransport) -> requests.Session """
+        import requests.adapters # pylint: disable=import-outside-toplevel
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get_session(self):
+        """ (RequestsTransport) -> requests.Session
+
+        Return the pooled session, creating it on first use and rebuilding it after an idle period.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._session is None:
+                self._session = self._create_session()
+            elif self.idle_timeout and now - self._last_used > self.idle_timeout:
+                self._session.close()
+                self._session = self._create_session()
+            self._last_used = now
+            return self._session
+
+    def request(self, method, url, headers=None, json=None, files=None):
+        """ (RequestsTransport, str, str, dict, dict, dict) -> requests.Response """
+        data = self.codec.dumps(json) if json is not None else None
+        return self._get_session().request(
+            method, url, headers=headers, data=data, files=files, timeout=self.timeout
+        )
+
+    def request_size(self, response):
+        """ (RequestsTransport, requests.Response) -> int """
+        body = response.request.body
+        return len(body) if body else 0
+
+    def close(self):
+        """ (RequestsTransport) -> NoneType """
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class AiohttpTransport(Transport):
+    """
+    AiohttpTransport Class
+
+    Keep-alive transport for `AsyncClubhouse`, backed by one shared `aiohttp.ClientSession`.
+    `request()` is a coroutine here.
+
+        limit:
+            - total number of simultaneous connections.
+        limit_per_host:
+            - simultaneous connections to the same host.
+        keepalive_timeout:
+            - seconds an idle connection is kept in the pool.
+        timeout:
+            - total timeout of a request in seconds.
+        codec:
+            - JSON backend name or `Codec`. Defaults to the fastest installed one.
+    """
+
+    def __init__(self, limit=1000, limit_per_host=0, keepalive_timeout=60, timeout=30, codec=None):
+        """ (AiohttpTransport, int, int, int, int, Codec) -> NoneType """
+        if importlib.util.find_spec("aiohttp") is None:
+            raise ImportError(AIOHTTP_REQUIRED)
+        self.set_codec(codec)
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self._session = None
+
+    def _get_session(self):
+        """ (AiohttpTransport) -> aiohttp.ClientSession
+
+        The session is bound to the running event loop, so it is created on first use.
+        """
+        if self._session is None or self._session.closed:
+            aiohttp = _import_aiohttp()
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def request(self, method, url, headers=None, json=None, files=None):
+        """ (AiohttpTransport, str, str, dict, dict, dict) -> Response """
+        data = None
+        session = self._get_session()
+        if files:
+            data = _import_aiohttp().FormData()
+            for name, (filename, fileobj, content_type) in files.items():
+                data.add_field(name, fileobj, filename=filename, content_type=content_type)
+        elif json is not None:
+            data = self.codec.dumps(json)
+        async with session.request(method, url, headers=headers, data=data) as resp:
+            content = await resp.read()
+            return Response(resp.status, dict(resp.headers), content, len(data) if isinstance(data, bytes) else 0)
+
+    async def close(self):
+        """ (AiohttpTransport) -> NoneType """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -15,7 +15,7 @@ with open("README.md", "r") as fh:
 
 setup(
     name="clubhouse-py",
-    packages=["clubhouse"],
+    packages=["clubhouse", "clubhouse.cli"],
     version="304.0.1",
     license="MIT",
     description=("Clubhouse API written in Python. Standalone client included." +
@@ -34,6 +34,15 @@ setup(
         "clubhouse-lib",
     ],
     install_requires=_requires_from_file("requirements.txt"),
+    entry_points={
+        "console_scripts": ["clubhouse=clubhouse.cli:main"],
+    },
+    extras_require={
+        "async": ["aiohttp"],
+        "fast": ["orjson"],
+        "otel": ["opentelemetry-api"],
+        "parquet": ["pyarrow"],
+    },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",